@@ -0,0 +1,107 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import PlainTextResponse
+from app.core.deps import get_profiler, get_loop_monitor, get_swapi_service
+from app.middleware.authorization import Authorization
+from app.schemas.sw.sw_resouce import SWResource
+from app.services.starwars_service import StarWarsService
+from app.utils.profiler import SamplingProfiler, LoopMonitor
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    responses={
+        401: {"description": "Not authenticated"},
+        403: {"description": "Acesso negado: apenas administradores."},
+    },
+    dependencies=[Depends(Authorization(["admin"]))]
+)
+
+CAPTURES = Literal["stalls", "slow-requests"]
+
+
+def _collapsed(body: str, filename: str) -> PlainTextResponse:
+    return PlainTextResponse(body, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@router.post(
+    "/profiler/start",
+    summary="Iniciar o Profiler",
+    description=(
+        "Liga o profiler estatístico neste worker pela janela pedida: a pilha de todas as threads é amostrada "
+        "a cada `interval_ms`. O resultado sai em `GET /admin/profiler/profile`."
+    ),
+    responses={409: {"description": "Já existe uma sessão em andamento."}}
+)
+async def start_profiler(
+    seconds: float = Query(30, gt=0, description="Duração da sessão (limitada por PROFILER_MAX_SECONDS)."),
+    interval_ms: float = Query(10, ge=1, le=1000, description="Intervalo entre amostras, em milissegundos."),
+    profiler: SamplingProfiler = Depends(get_profiler)
+):
+    try:
+        profiler.start(seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profiler.status()
+
+
+@router.post("/profiler/stop", summary="Parar o Profiler", description="Encerra a sessão antes do fim da janela.")
+async def stop_profiler(profiler: SamplingProfiler = Depends(get_profiler)):
+    profiler.stop()
+    return profiler.status()
+
+
+@router.get("/profiler", summary="Status do Profiler")
+async def profiler_status(profiler: SamplingProfiler = Depends(get_profiler)):
+    return profiler.status()
+
+
+@router.get(
+    "/profiler/profile",
+    summary="Baixar o Perfil",
+    description="Pilhas da última sessão no formato collapsed (flamegraph.pl, speedscope), uma linha por pilha com a contagem.",
+    response_class=PlainTextResponse
+)
+async def download_profile(profiler: SamplingProfiler = Depends(get_profiler)):
+    return _collapsed(profiler.collapsed(), "profile.folded")
+
+
+@router.get(
+    "/diagnostics/{kind}",
+    summary="Travamentos e Requisições Lentas",
+    description=(
+        "Últimas capturas automáticas deste worker: `stalls` (event loop preso acima de LOOP_STALL_THRESHOLD) "
+        "ou `slow-requests` (acima de SLOW_REQUEST_THRESHOLD), com as pilhas mais amostradas. "
+        "Com `format=collapsed` baixa todas as pilhas no formato do flamegraph."
+    ),
+    responses={404: {"description": "Diagnóstico desligado (DIAGNOSTICS_ENABLED=false)."}}
+)
+async def diagnostics(
+    kind: CAPTURES,
+    format: Literal["json", "collapsed"] = Query("json", description="`collapsed` para o formato do flamegraph."),
+    monitor: Optional[LoopMonitor] = Depends(get_loop_monitor)
+):
+    if monitor is None:
+        raise HTTPException(status_code=404, detail="Diagnóstico desligado neste worker.")
+    report_kind = "stalls" if kind == "stalls" else "slow_requests"
+    if format == "collapsed":
+        return _collapsed(monitor.collapsed(report_kind), f"{kind}.folded")
+    return monitor.report(report_kind)
+
+
+@router.delete(
+    "/cache/details/{resource}/{id}",
+    summary="Descartar Detalhes do Cache",
+    description=(
+        "Remove os detalhes do recurso do Redis, junto com a resposta pronta derivada deles, e avisa os demais "
+        "workers pelo canal `cache:invalidate` para descartarem o L1. A próxima leitura busca de novo na SWAPI."
+    ),
+    status_code=204
+)
+async def invalidate_details(
+    resource: SWResource,
+    id: str,
+    service: StarWarsService = Depends(get_swapi_service)
+):
+    await service.invalidate_details(resource, id)
+    return Response(status_code=204)
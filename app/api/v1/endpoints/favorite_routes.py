@@ -1,15 +1,20 @@
-from typing import Optional
+from typing import Optional, Literal
 from fastapi import APIRouter, Depends, Response, Query, Body, status
+from fastapi.responses import StreamingResponse
 
 from app.core.deps import get_firestore_repository, get_swapi_service
 from app.middleware.authorization import Authorization
 from app.repository.firestore_repository import FirestoreRepository
-from app.schemas.favorites.sw_favorites import SWFavoriteCreate, SWFavoriteRequestCreate, SWFavoriteRead, SWFavorite
+from app.schemas.favorites.sw_favorites import SWFavorite, SWFavoriteCreate, SWFavoriteRequestCreate, SWFavoriteRead, SWFavoritePage
 from app.schemas.sw.sw_resouce import SWResource
 from app.services.favorite_service import FavoriteService
 from app.services.starwars_service import StarWarsService
+from app.utils.ndjson import ndjson_stream
 
 
+# Instância única: o FastAPI reaproveita o resultado entre o router e os endpoints na mesma requisição
+require_user = Authorization(["common", 'admin'])
+
 router = APIRouter(
     prefix="/favorite",
     tags=["Favorite"],
@@ -23,8 +28,31 @@ router = APIRouter(
         503: {"description": "Serviço Indisponível: Circuito aberto. As chamadas foram bloqueadas temporariamente."},
         504: {"description": "Gateway Timeout: A SWAPI demorou demais para responder (mesmo após retentativas)."}
     },
-    dependencies=[Depends(Authorization(["common", 'admin']))]
+    dependencies=[Depends(require_user)]
+)
+
+# Declarada antes de /{favorite_id} para "export" não ser lido como ID
+@router.get(
+    "/export",
+    summary="Exportar Favoritos",
+    description=(
+        "Envia todos os favoritos do usuário autenticado em NDJSON (um objeto JSON por linha), sem paginação. "
+        "Os documentos são lidos do stream do Firestore conforme o cliente consome a resposta. "
+        "Se a leitura falhar no meio, a última linha traz `error` e `status_code`."
+    ),
+    response_description="Stream NDJSON com os favoritos.",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}}
 )
+async def export_favorites(
+    repository: FirestoreRepository = Depends(get_firestore_repository),
+    user: str = Depends(require_user),
+    resource: Optional[SWResource] = Query(None, description="Filtra por tipo de recurso (ex: people, films)")
+):
+    service = FavoriteService(repository)
+    filters = [("resource", "==", resource.value)] if resource else []
+    return StreamingResponse(ndjson_stream(service.export_favorites(user['sub'], filters), SWFavorite), media_type="application/x-ndjson")
+
 
 @router.get(
     "/{favorite_id}",
@@ -37,7 +65,7 @@ async def get_favorite(
     favorite_id: str,
     repository: FirestoreRepository = Depends(get_firestore_repository),
     sw_service: StarWarsService = Depends(get_swapi_service),
-    user: str = Depends(Authorization(["common", 'admin']))
+    user: str = Depends(require_user)
 ):
     service = FavoriteService(repository, sw_service)
     return await service.get_favorite_id(user['sub'], favorite_id)
@@ -46,23 +74,31 @@ async def get_favorite(
 @router.get(
     "/",
     summary="Listar Favoritos",
-    description="Lista os favoritos do usuário autenticado, com suporte a filtros e paginação.",
-    response_description="Lista de favoritos retornada com sucesso.",
-    response_model=list[SWFavorite]
+    description=(
+        "Lista os favoritos do usuário autenticado, com suporte a filtros e paginação por cursor. "
+        "Com `expand=details` cada favorito vem com os detalhes da SWAPI, buscados em lote para a página inteira."
+    ),
+    response_description="Página de favoritos; use `next_cursor` para buscar a próxima enquanto `has_more` for verdadeiro.",
+    response_model=SWFavoritePage,
+    response_model_exclude_unset=True
 )
 async def list_favorites(
     repository: FirestoreRepository = Depends(get_firestore_repository),
     sw_service: StarWarsService = Depends(get_swapi_service),
-    user: str = Depends(Authorization(["common", 'admin'])),
+    user: str = Depends(require_user),
     resource: Optional[SWResource] = Query(None, description="Filtra por tipo de recurso (ex: people, films)"),
     limit: int = Query(10, ge=1, le=100, description="Número máximo de favoritos a serem retornados."),
-    last_id: Optional[str] = Query(None, description="ID do último favorito da página anterior para paginação.")
+    cursor: Optional[str] = Query(None, description="Valor de `next_cursor` retornado pela página anterior."),
+    last_id: Optional[str] = Query(None, description="ID do último favorito da página anterior (obsoleto: prefira `cursor`).", deprecated=True),
+    expand: Optional[Literal["details"]] = Query(None, description="Use `details` para incluir os detalhes da SWAPI de cada favorito.")
 ):
     service = FavoriteService(repository, sw_service)
     filters = []
     if resource:
         filters.append(("resource", "==", resource.value))
-    return await service.list_favorites(user['sub'], filters=filters, limit=limit, last_id=last_id)
+    return await service.list_favorites(
+        user['sub'], filters=filters, limit=limit, last_id=last_id, expand_details=expand == "details", cursor=cursor
+    )
 
 @router.post(
     "/",
@@ -74,7 +110,7 @@ async def list_favorites(
 async def add_favorite(
     favorite_create: SWFavoriteRequestCreate = Body(..., description="Dados do recurso a ser adicionado aos favoritos."),
     repository: FirestoreRepository = Depends(get_firestore_repository),
-    user: str = Depends(Authorization(["common", 'admin']))
+    user: str = Depends(require_user)
 ):
     service = FavoriteService(repository)
     favorite_create_data: SWFavoriteCreate = SWFavoriteCreate(**favorite_create.model_dump(), user_id=user['sub'])
@@ -94,7 +130,7 @@ async def add_favorite(
 async def remove_favorite(
     favorite_id: str,
     repository: FirestoreRepository = Depends(get_firestore_repository),
-    user: str = Depends(Authorization(["common", 'admin']))
+    user: str = Depends(require_user)
 ):
     service = FavoriteService(repository)
     return await service.remove_favorite(favorite_id, user['sub'])
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, Response, Query, Body, status
+from fastapi import APIRouter, Depends, Response, Query, Body, HTTPException, status
 from typing import List, Optional
-from fastapi.responses import JSONResponse
-from app.core.deps import get_redis
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.core.deps import get_swapi_service
 from app.services.starwars_service import StarWarsService
-from app.integration.SwapiClient import SwapiClient
 from app.schemas.sw.sw_resouce import SWResource  
 from app.schemas.sw.sw import SWPeopleRead, SWFilmsRead, SWPlanetsRead, SWSpeciesRead, SWStarshipsRead, SWVehiclesRead, SWAnyDetailsRead
+from app.schemas.sw.sw import SWDetailsBatchRequest, SWDetailsBatchItem, DETAILS_MODELS, RESOURCE_MODELS
+from app.utils.ndjson import ndjson_stream
 
 router = APIRouter(
     prefix="/sw",
@@ -20,7 +21,11 @@ router = APIRouter(
     }
 )
 
-swapi_client = SwapiClient()
+def _json_response(cached: tuple[str, bytes]) -> Response:
+    # Bytes já validados e serializados pelo service: o FastAPI não passa pelo response_model de novo
+    etag, body = cached
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
 
 @router.get(
     "/people",
@@ -36,10 +41,9 @@ swapi_client = SwapiClient()
 async def get_people(
     name: Optional[str] = Query(None, alias="search", description="Nome do personagem para pesquisa (ex: Luke)"),
     page: Optional[int] = Query(None, ge=1, description="Número da página para paginação"),
-    redis=Depends(get_redis)
+    service: StarWarsService = Depends(get_swapi_service)
 ):
-    service = StarWarsService(swapi_client, redis)
-    return await service.get_resources("people", name=name, page=page)
+    return _json_response(await service.get_resources_response("people", SWPeopleRead, name=name, page=page))
 
 
 
@@ -53,10 +57,9 @@ async def get_people(
 async def get_films(
     name: Optional[str] = Query(None, alias="search", description="Título do filme para pesquisa"),
     page: Optional[int] = Query(None, ge=1, description="Número da página para paginação"),
-    redis=Depends(get_redis)
+    service: StarWarsService = Depends(get_swapi_service)
 ):
-    service = StarWarsService(swapi_client, redis)
-    return await service.get_resources("films", name=name, page=page)
+    return _json_response(await service.get_resources_response("films", SWFilmsRead, name=name, page=page))
 
 @router.get(
     "/planets",
@@ -68,10 +71,9 @@ async def get_films(
 async def get_planets(
     name: Optional[str] = Query(None, alias="search", description="Nome do planeta para pesquisa"),
     page: Optional[int] = Query(None, ge=1, description="Número da página para paginação"),
-    redis=Depends(get_redis)
+    service: StarWarsService = Depends(get_swapi_service)
 ):
-    service = StarWarsService(swapi_client, redis)
-    return await service.get_resources("planets", name=name, page=page)
+    return _json_response(await service.get_resources_response("planets", SWPlanetsRead, name=name, page=page))
 
 
 @router.get(
@@ -84,10 +86,9 @@ async def get_planets(
 async def get_species(
     name: Optional[str] = Query(None, alias="search", description="Nome da espécie para pesquisa"),
     page: Optional[int] = Query(None, ge=1, description="Número da página para paginação"),
-    redis=Depends(get_redis)
+    service: StarWarsService = Depends(get_swapi_service)
 ):
-    service = StarWarsService(swapi_client, redis)
-    return await service.get_resources("species", name=name, page=page)
+    return _json_response(await service.get_resources_response("species", SWSpeciesRead, name=name, page=page))
 
 
 @router.get(
@@ -100,10 +101,9 @@ async def get_species(
 async def get_starships(
     name: Optional[str] = Query(None, alias="search", description="Nome da nave para pesquisa"),
     page: Optional[int] = Query(None, ge=1, description="Número da página para paginação"),
-    redis=Depends(get_redis)
+    service: StarWarsService = Depends(get_swapi_service)
 ):
-    service = StarWarsService(swapi_client, redis)
-    return await service.get_resources("starships", name=name, page=page)
+    return _json_response(await service.get_resources_response("starships", SWStarshipsRead, name=name, page=page))
 
 
 @router.get(
@@ -116,10 +116,55 @@ async def get_starships(
 async def get_vehicles(
     name: Optional[str] = Query(None, alias="search", description="Nome do veículo para pesquisa"),
     page: Optional[int] = Query(None, ge=1, description="Número da página para paginação"),
-    redis=Depends(get_redis)
+    service: StarWarsService = Depends(get_swapi_service)
+):
+    return _json_response(await service.get_resources_response("vehicles", SWVehiclesRead, name=name, page=page))
+
+@router.get(
+    "/{resource}/all",
+    summary="Exportar Coleção Inteira",
+    description=(
+        "Envia todos os itens do recurso em NDJSON (um objeto JSON por linha), sem paginação no cliente. "
+        "As páginas da SWAPI são buscadas algumas à frente do envio e cada uma passa pelo cache. "
+        "Se a SWAPI falhar no meio do envio, a última linha traz `error` e `status_code`."
+    ),
+    response_description="Stream NDJSON com os itens no mesmo formato da listagem.",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}}
+)
+async def stream_all(
+    resource: SWResource,
+    service: StarWarsService = Depends(get_swapi_service)
+):
+    pages = await service.stream_resources(resource.value)
+    return StreamingResponse(ndjson_stream(pages, RESOURCE_MODELS[resource]), media_type="application/x-ndjson")
+
+@router.post(
+    "/details/batch",
+    summary="Obter Detalhes em Lote",
+    description=(
+        "Busca os detalhes enriquecidos de vários recursos em uma única requisição (até 100 itens). "
+        "Itens repetidos são resolvidos uma vez só e a falha de um item não derruba os demais: "
+        "ele volta com `status_code` e `error` preenchidos."
+    ),
+    response_description="Detalhes de cada item, na mesma ordem do pedido.",
+    response_model=list[SWDetailsBatchItem]
+)
+async def get_details_batch(
+    body: SWDetailsBatchRequest = Body(..., description="Lista de pares recurso/id."),
+    service: StarWarsService = Depends(get_swapi_service)
 ):
-    service = StarWarsService(swapi_client, redis)
-    return await service.get_resources("vehicles", name=name, page=page)
+    results = await service.get_details_many([(item.resource, item.id) for item in body.items])
+    response = []
+    for item in body.items:
+        result = results[(item.resource.value, item.id)]
+        if isinstance(result, HTTPException):
+            response.append(SWDetailsBatchItem(
+                resource=item.resource, id=item.id, status_code=result.status_code, error=str(result.detail)
+            ))
+        else:
+            response.append(SWDetailsBatchItem(resource=item.resource, id=item.id, details=result))
+    return response
 
 @router.get(
     "/details/{resource}/{id}",
@@ -131,7 +176,7 @@ async def get_vehicles(
 async def get_details(
     resource: SWResource,
     id: str,
-    redis=Depends(get_redis)
+    service: StarWarsService = Depends(get_swapi_service)
 ):
-    service = StarWarsService(swapi_client, redis)
-    return await service.get_details(resource, id)
\ No newline at end of file
+    # Modelo escolhido pelo recurso da rota: validação direta, sem testar as seis variantes
+    return _json_response(await service.get_details_response(resource, id, DETAILS_MODELS[resource]))
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Literal
+from typing import Literal, Optional
 
 class Settings(BaseSettings):
 
@@ -10,8 +10,86 @@ class Settings(BaseSettings):
     REDIS: str
     JWT_SECRET_KEY: str
     ALGORITHM: str = "HS256"
+    # Chaves PEM para algoritmos assimétricos (RS256, ES256...); HS* usa JWT_SECRET_KEY
+    JWT_PRIVATE_KEY: Optional[str] = None
+    JWT_PUBLIC_KEY: Optional[str] = None
+    JWT_CACHE_SIZE: int = 10000
+    # Assina os cursores de paginação; sem ela a chave é derivada de JWT_SECRET_KEY (nunca a mesma chave dos tokens)
+    CURSOR_SECRET_KEY: Optional[str] = None
+    USER_CACHE_TTL: int = 300 # cache dos perfis de usuário no Redis (segundos)
+
+    # Pool de threads do bcrypt (hash/verificação de senha fora do event loop)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
     SWAPI_BASE: str
-    
+
+    # Pool HTTP compartilhado com a SWAPI
+    SWAPI_TIMEOUT: float = 10.0
+    SWAPI_MAX_CONNECTIONS: int = 100
+    SWAPI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    SWAPI_KEEPALIVE_EXPIRY: float = 30.0
+    SWAPI_HTTP2: bool = False
+    SWAPI_MAX_CONCURRENCY_PER_HOST: int = 20
+
+    # Limite adaptativo de concorrência (AIMD pela latência) e token bucket global no Redis
+    SWAPI_MAX_CONCURRENCY: int = 50
+    SWAPI_MIN_CONCURRENCY_PER_HOST: int = 2
+    SWAPI_LATENCY_TOLERANCE: float = 2.0
+    SWAPI_RATE_LIMIT: float = 0 # chamadas por segundo somando os workers; 0 desliga
+    SWAPI_RATE_BURST: int = 20
+
+    # Orçamento de tempo por requisição (retries e buscas aninhadas inclusos) e hedged requests
+    SWAPI_REQUEST_BUDGET: float = 10.0
+    SWAPI_HEDGE: bool = False
+    SWAPI_HEDGE_MIN_DELAY: float = 0.05
+    # Páginas buscadas à frente ao exportar uma coleção inteira (GET /sw/{resource}/all)
+    SWAPI_STREAM_PREFETCH: int = 4
+
+    # Lock no Redis para que apenas um worker recarregue cada chave do cache
+    SWAPI_DISTRIBUTED_LOCK: bool = False
+
+    # Circuit breaker da SWAPI (janela deslizante + half-open)
+    CIRCUIT_WINDOW_SECONDS: int = 30
+    CIRCUIT_MIN_REQUESTS: int = 5
+    CIRCUIT_FAILURE_RATE: float = 0.5
+    CIRCUIT_SLOW_CALL_SECONDS: float = 5.0
+    CIRCUIT_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_OPEN_SECONDS: int = 60
+    CIRCUIT_HALF_OPEN_PROBES: int = 3
+    CIRCUIT_LOCAL_REFRESH: float = 1.0
+
+    # Formato dos valores no Redis: legacy (JSON em texto), json (orjson se instalado) ou msgpack
+    CACHE_CODEC: Literal["legacy", "json", "msgpack"] = "json"
+    CACHE_COMPRESSION: Literal["none", "zlib", "zstd", "lz4"] = "zlib"
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024
+    RESPONSE_CACHE_TTL: int = 300 # respostas /sw/* já serializadas (limitado ao TTL dos dados)
+
+    # Cache L1 em memória na frente do Redis
+    LOCAL_CACHE_MAX_SIZE: int = 1024
+    LOCAL_CACHE_TTL: float = 300
+
+    # Janelas (em segundos, após o TTL do cache) para servir dados velhos da SWAPI
+    CACHE_STALE_WHILE_REVALIDATE: int = 600
+    CACHE_STALE_IF_ERROR: int = 86400
+
+    # Snapshot local da SWAPI ("mirror" responde tudo a partir dele)
+    SWAPI_MODE: Literal["live", "mirror"] = "live"
+    SWAPI_SNAPSHOT_PATH: Optional[str] = None
+    SWAPI_WARM_CACHE: bool = False
+    # Monta (em segundo plano) o store indexado em memória e responde /sw/* a partir dele
+    SWAPI_LOCAL_STORE: bool = False
+
+    # Instrumentação: spans por etapa no header Server-Timing e métricas Prometheus em /metrics
+    METRICS_ENABLED: bool = False
+    METRICS_SERVER_TIMING: bool = True
+
+    # Diagnóstico: travamentos do event loop e requisições lentas (limites em segundos; 0 desliga cada captura)
+    DIAGNOSTICS_ENABLED: bool = True
+    LOOP_STALL_THRESHOLD: float = 0.2
+    SLOW_REQUEST_THRESHOLD: float = 2.0
+    DIAGNOSTICS_MAX_CAPTURES: int = 50
+    PROFILER_MAX_SECONDS: float = 300 # janela máxima de uma sessão do profiler (/admin/profiler)
+
     model_config = SettingsConfigDict(
         env_file='.env',
         env_file_encoding='utf-8'
@@ -1,9 +1,11 @@
 from fastapi import Request
 from app.services.auth_service import AuthService
 from app.repository.firestore_repository import FirestoreRepository
+from app.repository.user_cache_repository import CachedUserRepository
 from app.services.starwars_service import StarWarsService
 from app.utils import jwt, auth, validated
 from app.integration.SwapiClient import SwapiClient
+from app.utils.profiler import SamplingProfiler, LoopMonitor
 
 async def get_redis(request: Request):
     return request.app.state.redis
@@ -14,10 +16,10 @@ async def get_db(request: Request):
 async def get_auth_service(request: Request) -> AuthService:
     db = request.app.state.db
     
-    repository = FirestoreRepository(db)
+    repository = CachedUserRepository(db, request.app.state.redis)
     
     jwt_tool = jwt.Jwt()
-    auth_tool = auth.Auth()
+    auth_tool = auth.Auth(pool=request.app.state.password_pool)
     validators = validated.Validadores()
     
     return AuthService(
@@ -28,11 +30,25 @@ async def get_auth_service(request: Request) -> AuthService:
     )
 
 
+async def get_profiler(request: Request) -> SamplingProfiler:
+    return request.app.state.profiler
+
+async def get_loop_monitor(request: Request) -> LoopMonitor:
+    return request.app.state.loop_monitor
+
+
 async def get_firestore_repository(request: Request) -> FirestoreRepository:
     db = request.app.state.db
     return FirestoreRepository(db)
 
 async def get_swapi_service(request: Request) -> StarWarsService:
     redis = request.app.state.redis
-    swapi_client = SwapiClient()
-    return StarWarsService(swapi_client, redis)
\ No newline at end of file
+    swapi_client: SwapiClient = request.app.state.swapi_client
+    return StarWarsService(
+        swapi_client,
+        redis,
+        single_flight=request.app.state.single_flight,
+        local_cache=request.app.state.local_cache,
+        snapshot=request.app.state.snapshot,
+        breaker=request.app.state.breaker
+    )
\ No newline at end of file
@@ -3,13 +3,85 @@ from fastapi import FastAPI
 from redis.asyncio import Redis
 from google.cloud import firestore
 from app.core.config import settings
+from app.integration.SwapiClient import SwapiClient, build_http_client
+from app.utils.single_flight import SingleFlight
+from app.utils.local_cache import LocalCache, listen_invalidations
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.upstream_limiter import TokenBucket
+from app.services.swapi_snapshot import SwapiSnapshot, crawl, prepare_snapshot
+from app.services.starwars_service import StarWarsService
+from app.utils.auth import build_password_pool
+from app.utils import metrics
+from app.utils.profiler import SamplingProfiler, LoopMonitor
+import asyncio
+
+async def load_snapshot(app: FastAPI):
+    # Sem snapshot (arquivo ilegível, SWAPI fora no crawl do modo espelho) o app sobe no modo live
+    app.state.snapshot = None
+    try:
+        app.state.snapshot = await prepare_snapshot(app.state.swapi_client)
+        if app.state.snapshot:
+            print(f"SWAPI snapshot loaded (mode: {settings.SWAPI_MODE})")
+    except Exception as e:
+        print(f"Failed to prepare SWAPI snapshot, serving live: {e}")
+
+async def build_local_store(app: FastAPI):
+    # Até o store ficar pronto as requisições seguem pelo caminho SWAPI + cache
+    try:
+        snapshot = await crawl(app.state.swapi_client)
+        if settings.SWAPI_SNAPSHOT_PATH:
+            snapshot.save(settings.SWAPI_SNAPSHOT_PATH)
+        app.state.snapshot = snapshot
+        print("SWAPI local store ready")
+    except Exception as e:
+        print(f"Failed to build SWAPI local store: {e}")
+
+async def warm_cache(app: FastAPI):
+    try:
+        snapshot: SwapiSnapshot = app.state.snapshot or await crawl(app.state.swapi_client)
+        service = StarWarsService(app.state.swapi_client, app.state.redis, breaker=app.state.breaker)
+        written = await service.warm_cache(snapshot)
+        print(f"Redis cache warmed with {written} SWAPI keys")
+    except Exception as e:
+        print(f"Failed to warm SWAPI cache: {e}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    redis_client = Redis.from_url(settings.REDIS, decode_responses=True)
+    # Bytes crus: os valores do cache são binários (cabeçalho + compressão), ver app/utils/cache_codec.py
+    redis_client = Redis.from_url(settings.REDIS)
+    if metrics.enabled:
+        metrics.instrument_redis(redis_client)
     app.state.redis = redis_client
     print("Redis connection")
 
+    http_client = build_http_client()
+    app.state.http_client = http_client
+    token_bucket = TokenBucket(redis_client, settings.SWAPI_RATE_LIMIT, settings.SWAPI_RATE_BURST) if settings.SWAPI_RATE_LIMIT > 0 else None
+    app.state.swapi_client = SwapiClient(http_client, token_bucket=token_bucket)
+    app.state.single_flight = SingleFlight()
+    # Um breaker por processo: o estado local em cache evita um GET no Redis por requisição
+    app.state.breaker = CircuitBreaker(redis_client)
+    print("SWAPI HTTP pool created")
+
+    app.state.local_cache = LocalCache(settings.LOCAL_CACHE_MAX_SIZE, settings.LOCAL_CACHE_TTL)
+    # Criado aqui (e não no import) para ficar preso ao loop deste app e poder ser recriado a cada lifespan
+    app.state.password_pool = build_password_pool()
+
+    app.state.profiler = SamplingProfiler(settings.PROFILER_MAX_SECONDS)
+    app.state.loop_monitor = None
+    if settings.DIAGNOSTICS_ENABLED:
+        app.state.loop_monitor = LoopMonitor(
+            settings.LOOP_STALL_THRESHOLD, settings.SLOW_REQUEST_THRESHOLD, max_captures=settings.DIAGNOSTICS_MAX_CAPTURES
+        )
+        app.state.loop_monitor.start()
+    invalidation_task = asyncio.create_task(listen_invalidations(redis_client, app.state.local_cache))
+
+    await load_snapshot(app)
+    store_task = None
+    if settings.SWAPI_LOCAL_STORE and not app.state.snapshot:
+        store_task = asyncio.create_task(build_local_store(app))
+    warm_task = asyncio.create_task(warm_cache(app)) if settings.SWAPI_WARM_CACHE else None
+
     if settings.ENVIRONMENT != "prod":
         import os
         app.state.db = firestore.AsyncClient(project="demo-test")
@@ -22,7 +94,15 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    invalidation_task.cancel()
+    app.state.profiler.stop()
+    if app.state.loop_monitor: await app.state.loop_monitor.stop()
+    if warm_task: warm_task.cancel()
+    if store_task: store_task.cancel()
+    app.state.password_pool.shutdown()
+    await http_client.aclose()
     await redis_client.close()
     await app.state.db.close()
+    print("SWAPI HTTP pool closed")
     print("Redis closed")
     print("Firestore closed")
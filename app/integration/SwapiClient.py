@@ -1,44 +1,224 @@
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+import asyncio
+import time
 import httpx
 from app.core.config import settings
+from app.utils.upstream_limiter import AdaptiveLimiter, TokenBucket
+from app.utils.deadline import remaining, stop_when_out_of_budget, wait_within_budget
+from app.utils import metrics
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """Cria o AsyncClient de longa duração usado para falar com a SWAPI (pool + keep-alive)"""
+    http2 = settings.SWAPI_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("Pacote 'h2' não instalado: usando HTTP/1.1 para a SWAPI")
+            http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.SWAPI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SWAPI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.SWAPI_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.SWAPI_TIMEOUT),
+        limits=limits,
+        http2=http2,
+    )
+
+
+class NotModified(Exception):
+    """A SWAPI respondeu 304: a cópia em cache continua válida"""
+
+
+class Revalidation:
+    """
+    Validadores HTTP (ETag/Last-Modified) da primeira URL chamada dentro de `revalidating`.
+    Entra com os validadores guardados no cache e sai com os da nova resposta.
+    """
+
+    def __init__(self, validators: Optional[dict] = None):
+        self.previous = validators or {}
+        self.validators: dict = {}
+        self.url: Optional[str] = None
+
+    def claim(self, url: str) -> bool:
+        # Só a chamada principal é condicional; as buscas aninhadas seguem normais
+        if self.url is None:
+            self.url = url
+        return self.url == url
+
+    def request_headers(self) -> dict:
+        headers = {}
+        if self.previous.get("etag"):
+            headers["If-None-Match"] = self.previous["etag"]
+        if self.previous.get("last_modified"):
+            headers["If-Modified-Since"] = self.previous["last_modified"]
+        return headers
+
+    def remember(self, response: httpx.Response):
+        self.validators = {
+            key: value for key, value in (
+                ("etag", response.headers.get("etag")),
+                ("last_modified", response.headers.get("last-modified")),
+            ) if value
+        }
+
+
+_revalidation: ContextVar[Optional[Revalidation]] = ContextVar("swapi_revalidation", default=None)
+
+@contextmanager
+def revalidating(revalidation: Revalidation):
+    token = _revalidation.set(revalidation)
+    try:
+        yield revalidation
+    finally:
+        _revalidation.reset(token)
 
 
 class SwapiClient:
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None, token_bucket: Optional[TokenBucket] = None):
         self.base_url = settings.SWAPI_BASE
-        self.timeout = httpx.Timeout(10.0)
+        self.timeout = httpx.Timeout(settings.SWAPI_TIMEOUT)
+        self.http_client = http_client
+        self.token_bucket = token_bucket
+        self.max_concurrency_per_host = settings.SWAPI_MAX_CONCURRENCY_PER_HOST
+        self.min_concurrency_per_host = settings.SWAPI_MIN_CONCURRENCY_PER_HOST
+        self.latency_tolerance = settings.SWAPI_LATENCY_TOLERANCE
+        # Teto global de chamadas em voo, somando todos os hosts
+        self.global_semaphore = asyncio.Semaphore(settings.SWAPI_MAX_CONCURRENCY)
+        self._host_limiters: dict[str, AdaptiveLimiter] = {}
+        self.hedge = settings.SWAPI_HEDGE
+        self.hedge_quantile = 0.95
+        self.hedge_min_delay = settings.SWAPI_HEDGE_MIN_DELAY
+        self.hedged_requests = 0
+
+
+    def _limiter_for(self, url: str) -> AdaptiveLimiter:
+        host = httpx.URL(url).host
+        limiter = self._host_limiters.get(host)
+        if limiter is None:
+            limiter = AdaptiveLimiter(
+                self.max_concurrency_per_host,
+                min_limit=self.min_concurrency_per_host,
+                tolerance=self.latency_tolerance
+            )
+            self._host_limiters[host] = limiter
+        return limiter
+
+    def limiter_stats(self) -> dict:
+        return {host: limiter.stats() for host, limiter in self._host_limiters.items()}
+
+    async def _attempt(self, url: str, params: dict = None):
+        """Uma chamada HTTP à SWAPI, limitada pela concorrência adaptativa e pelo prazo da requisição"""
+        left = remaining()
+        if left is not None and left <= 0:
+            raise httpx.TimeoutException(f"Prazo esgotado antes de chamar {url}")
 
-    
+        revalidation = _revalidation.get()
+        if revalidation is not None and not revalidation.claim(str(httpx.URL(url, params=params))):
+            revalidation = None
+        headers = revalidation.request_headers() if revalidation is not None else None
+
+        limiter = self._limiter_for(url)
+        response = None
+        try:
+            async with asyncio.timeout(left) as budget:
+                async with self.global_semaphore:
+                    await limiter.acquire()
+                    overloaded = True
+                    abandoned = False
+                    started = time.perf_counter()
+                    try:
+                        if self.token_bucket is not None:
+                            await self.token_bucket.acquire()
+                            started = time.perf_counter() # a espera pelo token não entra na latência
+                        if self.http_client is not None:
+                            response = await self.http_client.get(url, params=params, headers=headers)
+                        else:
+                            # Sem cliente compartilhado (scripts/testes): conexão avulsa
+                            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                                response = await client.get(url, params=params, headers=headers)
+                        overloaded = response.status_code == 429 or response.status_code >= 500
+                    except asyncio.CancelledError:
+                        # Cancelada de fora (hedge perdedor, cliente que desistiu): não diz nada sobre a SWAPI.
+                        # O prazo da requisição esgotado também chega como cancelamento, e esse conta como timeout
+                        abandoned = not budget.expired()
+                        raise
+                    finally:
+                        latency = time.perf_counter() - started
+                        if abandoned:
+                            await limiter.release(None)
+                        else:
+                            await limiter.release(latency, overloaded)
+                            metrics.UPSTREAM_SECONDS.observe(latency, status=response.status_code if response is not None else "error")
+        except TimeoutError:
+            raise httpx.TimeoutException(f"Prazo da requisição esgotado em {url}")
+        if revalidation is not None:
+            revalidation.remember(response)
+            if response.status_code == 304:
+                revalidation.validators = {**revalidation.previous, **revalidation.validators}
+                raise NotModified(url)
+        response.raise_for_status()
+        return response.json()
+
+    async def _get(self, url: str, params: dict = None):
+        limiter = self._limiter_for(url)
+        delay = limiter.percentile(self.hedge_quantile) if self.hedge else None
+        if delay is None:
+            return await self._attempt(url, params)
+
+        # Hedge: se a primeira tentativa passar do p95, dispara uma segunda e fica com a que responder antes
+        primary = asyncio.create_task(self._attempt(url, params))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=max(delay, self.hedge_min_delay))
+            if not done and not limiter.saturated():
+                self.hedged_requests += 1
+                tasks.add(asyncio.create_task(self._attempt(url, params)))
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    # Só erros de rede/timeout esperam a outra tentativa; status HTTP já é resposta
+                    if error is None or not isinstance(error, httpx.RequestError) or not tasks:
+                        return task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+    @metrics.timed("swapi")
     @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=6),
+        stop=stop_after_attempt(3) | stop_when_out_of_budget,
+        wait=wait_within_budget(wait_exponential(multiplier=1, min=2, max=6)),
         retry=retry_if_exception_type(httpx.RequestError),
+        before_sleep=metrics.count_retry,
         reraise=True
     )
     async def get_api(self, endpoint: str, name: str = None, page: int = None):
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            params = {}
-            if name: params["search"] = name
-            if page: params["page"] = page
-            response = await client.get(
-                f"{self.base_url}/{endpoint}",
-                params=params
-            )
-            response.raise_for_status()
-            return response.json()
-        
+        params = {}
+        if name: params["search"] = name
+        if page: params["page"] = page
+        return await self._get(f"{self.base_url}/{endpoint}", params=params)
+
 
+    @metrics.timed("swapi")
     @retry(
-        stop=stop_after_attempt(2),
-        wait=wait_exponential(multiplier=1, min=2, max=4),
+        stop=stop_after_attempt(2) | stop_when_out_of_budget,
+        wait=wait_within_budget(wait_exponential(multiplier=1, min=2, max=4)),
         retry=retry_if_exception_type(httpx.RequestError),
+        before_sleep=metrics.count_retry,
         reraise=True
     )
     async def get_url(self, url: str):
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(url)
 
 
     async def films(self, name: str = None, page: int = None):
@@ -60,4 +240,4 @@ class SwapiClient:
         return await self.get_api("vehicles", name=name, page=page)
 
     async def get_detail(self, resource: str, id: str):
-        return await self.get_url(f"{self.base_url}/{resource}/{id}")
\ No newline at end of file
+        return await self.get_url(f"{self.base_url}/{resource}/{id}")
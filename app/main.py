@@ -1,9 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.config import settings
 from app.core.lifespan import lifespan
+from app.middleware.etag import ETagMiddleware
+from app.middleware.server_timing import ServerTimingMiddleware
+from app.middleware.slow_requests import SlowRequestMiddleware
+from app.utils import metrics
 from app.api.v1.endpoints.swRoutes import router as sw
 from app.api.v1.endpoints.auth_routes import router as auth_router
 from app.api.v1.endpoints.favorite_routes import router as favorite_router
+from app.api.v1.endpoints.admin_routes import router as admin_router
 
 app = FastAPI(title="SWAPI Power Data", lifespan=lifespan)
 
@@ -14,11 +21,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ETagMiddleware, prefixes=("/sw",))
+app.add_middleware(SlowRequestMiddleware)
+# Por último = mais externo: o total do Server-Timing inclui os outros middlewares
+app.add_middleware(ServerTimingMiddleware, expose_header=settings.METRICS_SERVER_TIMING)
 
 @app.get("/health", tags=["Health"])
 async def health():
     return {"status": "ok"}
 
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def prometheus_metrics():
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Métricas desligadas (METRICS_ENABLED=false)")
+    return Response(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 app.include_router(sw)
 app.include_router(auth_router)
-app.include_router(favorite_router)
\ No newline at end of file
+app.include_router(favorite_router)
+app.include_router(admin_router)
\ No newline at end of file
@@ -1,7 +1,7 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
-from app.core.config import settings
+from app.utils.jwt import token_verifier
 from typing import List
 
 class Authorization:
@@ -9,28 +9,33 @@ class Authorization:
         self.security = HTTPBearer()
         self.nivel_requerido = nivel_requerido
 
-    def __call__(self, credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer())):
-        token = credentials.credentials
+    def _payload(self, request: Request, token: str) -> dict:
+        # Router e endpoint compartilham uma única decodificação por requisição
+        cached = getattr(request.state, "jwt_payload", None)
+        if cached is not None and cached[0] == token:
+            return cached[1]
+        payload = token_verifier.verify(token)
+        request.state.jwt_payload = (token, payload)
+        return payload
+
+    def __call__(self, request: Request, credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer())):
         if not credentials:
             raise HTTPException(
                 status_code=401,
                 detail="Você não está autenticado.",
             )
+        token = credentials.credentials
 
         try:
-            payload = jwt.decode(
-                token,
-                settings.JWT_SECRET_KEY,
-                algorithms=[settings.ALGORITHM]
-            )
+            payload = self._payload(request, token)
             user_sub = payload.get("sub")
             user_nivel = payload.get("nivel")
             if user_nivel not in self.nivel_requerido:
                 raise HTTPException(status_code=403, detail="Acesso negado")
-            return {"sub": user_sub, "nivel": user_nivel}  
+            return {"sub": user_sub, "nivel": user_nivel}
 
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=401, detail="Token expirado")
 
         except jwt.PyJWTError:
-            raise HTTPException(status_code=401, detail="Token inválido")
\ No newline at end of file
+            raise HTTPException(status_code=401, detail="Token inválido")
@@ -0,0 +1,85 @@
+import hashlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comparação fraca do If-None-Match (RFC 9110): ignora o prefixo W/ e aceita *"""
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in [value.removeprefix("W/") for value in candidates]
+
+
+class ETagMiddleware:
+    """
+    Middleware ASGI que calcula um ETag do corpo das respostas GET 200 nos prefixos dados
+    (ou usa o que a rota já definiu) e responde 304 sem corpo quando o If-None-Match do cliente bate.
+    Respostas em streaming (mais de um pedaço de corpo) passam direto, sem ETag.
+    """
+
+    def __init__(self, app: ASGIApp, prefixes: tuple[str, ...] = ("/sw",)):
+        self.app = app
+        self.prefixes = prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        start: Message = {}
+        passthrough: Optional[bool] = False # None: 304 já enviado, o resto do corpo é descartado
+        if_none_match = Headers(scope=scope).get("if-none-match")
+
+        async def send_with_etag(message: Message):
+            nonlocal start, passthrough
+            if passthrough is None:
+                return
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                if message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+                    return
+                etag = Headers(raw=message["headers"]).get("etag")
+                if etag is not None:
+                    # ETag já calculado pela rota (resposta pré-serializada): não precisa ler o corpo
+                    if if_none_match and etag_matches(if_none_match, etag):
+                        passthrough = None
+                        await self._not_modified(start, send)
+                    else:
+                        passthrough = True
+                        await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if message.get("more_body", False):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            etag = make_etag(body)
+            MutableHeaders(raw=start["headers"])["etag"] = etag
+            if if_none_match and etag_matches(if_none_match, etag):
+                await self._not_modified(start, send)
+                return
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+    async def _not_modified(self, start: Message, send: Send):
+        headers = MutableHeaders(raw=list(start["headers"]))
+        del headers["content-length"]
+        del headers["content-type"]
+        await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": b""})
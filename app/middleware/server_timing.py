@@ -0,0 +1,55 @@
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils import metrics
+
+
+def server_timing(timings: dict, total: float) -> str:
+    """Header Server-Timing: tempo somado de cada etapa (em ms) e o número de chamadas quando passa de uma"""
+    entries = []
+    for name, (seconds, calls) in timings.items():
+        entry = f"{name};dur={seconds * 1000:.1f}"
+        if calls > 1:
+            entry += f';desc="{calls}x"'
+        entries.append(entry)
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI que abre o registro de etapas da requisição (ver app/utils/metrics.py),
+    devolve o detalhamento no header Server-Timing e alimenta o histograma de latência por rota.
+    Com as métricas desligadas a requisição passa direto.
+    """
+
+    def __init__(self, app: ASGIApp, expose_header: bool = True):
+        self.app = app
+        self.expose_header = expose_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = metrics.start_request()
+        status = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.expose_header:
+                    MutableHeaders(scope=message).append("server-timing", server_timing(timings, time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Template da rota (ex: /sw/details/{resource}/{id}), não o caminho, para não explodir as séries
+            route = scope.get("route")
+            metrics.HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"], route=getattr(route, "path", "unmatched"), status=status
+            )
@@ -0,0 +1,33 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class SlowRequestMiddleware:
+    """
+    Middleware ASGI que registra cada requisição no LoopMonitor (app.state.loop_monitor)
+    para que as lentas tenham a cadeia de awaits amostrada e fiquem guardadas para diagnóstico.
+    Sem monitor no app (diagnóstico desligado) a requisição passa direto.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        app = scope.get("app")
+        monitor = getattr(app.state, "loop_monitor", None) if app is not None else None
+        if scope["type"] != "http" or monitor is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = monitor.request_started(scope["method"], scope["path"])
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            monitor.request_finished(key, status, getattr(scope.get("route"), "path", None))
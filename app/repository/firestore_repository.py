@@ -1,10 +1,12 @@
 from google.cloud.firestore import AsyncClient
-from typing import Optional, Any
+from typing import AsyncIterator, Optional, Any
+from app.utils import metrics
 
 class FirestoreRepository:
     def __init__(self, db: AsyncClient):
         self.db = db
 
+    @metrics.timed("firestore")
     async def find_by_id(self, collection: str, doc_id: str) -> Optional[dict]:
         """Comando centralizado para buscar por ID (chave primária)"""
         doc = await self.db.collection(collection).document(doc_id).get()
@@ -14,6 +16,7 @@ class FirestoreRepository:
             return data
         return None
 
+    @metrics.timed("firestore")
     async def find_one_by_field(self, collection: str, field: str, value: Any) -> Optional[dict]:
         """Comando centralizado para buscar um registro por campo específico (ex: email)"""
         query = self.db.collection(collection).where(field, "==", value).limit(1)
@@ -24,28 +27,51 @@ class FirestoreRepository:
             return data
         return None
     
-    async def list_with_filters(self, collection: str, filters: list[tuple] = None, limit: int = 10, last_doc_id: str = None):
-        """
-        filters: lista de tuplas ex: [("status", "==", "active"), ("age", ">", 20)]
-        """
+    def _filtered_query(self, collection: str, filters: list[tuple] = None):
         ref = self.db.collection(collection)
         if filters:
             for field, op, value in filters:
                 ref = ref.where(field, op, value)
 
-        ref = ref.order_by("__name__") # Ordena pelo ID do documento
+        return ref.order_by("__name__") # Ordena pelo ID do documento
+
+    async def list_with_filters(self, collection: str, filters: list[tuple] = None, limit: int = 10, last_doc_id: str = None):
+        """
+        filters: lista de tuplas ex: [("status", "==", "active"), ("age", ">", 20)]
+        Só a lista de documentos da página; a paginação em si fica em list_page.
+        """
+        items, _, _ = await self.list_page(
+            collection, filters, limit, start_after={"__name__": last_doc_id} if last_doc_id else None
+        )
+        return items
+
+    async def stream_with_filters(self, collection: str, filters: list[tuple] = None) -> AsyncIterator[dict]:
+        """
+        Todos os documentos da consulta pelo streaming do Firestore, sem montar a lista em memória:
+        o próximo documento só é lido do stream quando o consumidor pede.
+        """
+        async for doc in self._filtered_query(collection, filters).stream():
+            yield {**doc.to_dict(), "id": doc.id}
+
+    @metrics.timed("firestore")
+    async def list_page(self, collection: str, filters: list[tuple] = None, limit: int = 10, start_after: Optional[dict] = None):
+        """
+        Página com uma única consulta: start_after traz os valores de ordenação do último documento
+        (ex: {"__name__": "abc123"}). Retorna (documentos, cursor do último documento, has_more).
+        """
+        ref = self._filtered_query(collection, filters)
+        if start_after:
+            ref = ref.start_after(start_after)
 
-        if last_doc_id:
-            last_doc = await self.db.collection(collection).document(last_doc_id).get()
-            if last_doc.exists:
-                ref = ref.start_after(last_doc)
-        
-        docs = await ref.limit(limit).get()
-        return [
+        docs = await ref.limit(limit + 1).get()
+        items = [
             {**doc.to_dict(), "id": doc.id}
-            for doc in docs
+            for doc in docs[:limit]
         ]
+        last_values = {"__name__": items[-1]["id"]} if items else None
+        return items, last_values, len(docs) > limit
 
+    @metrics.timed("firestore")
     async def save(self, collection: str, data: dict, doc_id: Optional[str] = None):
         """Comando centralizado para salvar/atualizar dados"""
         data_return = {**data}
@@ -57,9 +83,11 @@ class FirestoreRepository:
             data_return["id"] = doc_ref.id
         return data_return
     
+    @metrics.timed("firestore")
     async def update_fields(self, collection: str, doc_id: str, data: dict):
         """Atualiza campos específicos de um documento existente"""
         await self.db.collection(collection).document(doc_id).update(data)
 
+    @metrics.timed("firestore")
     async def delete(self, collection: str, doc_id: str):
         await self.db.collection(collection).document(doc_id).delete()
\ No newline at end of file
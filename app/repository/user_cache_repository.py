@@ -0,0 +1,117 @@
+from datetime import datetime
+from typing import Optional, Any
+from google.cloud.firestore import AsyncClient
+from redis.asyncio import Redis
+from app.repository.firestore_repository import FirestoreRepository
+from app.core.config import settings
+from app.utils.cache_codec import cache_codec
+
+
+# Só o que create_token e as checagens de perfil leem; o hash da senha nunca vai para o Redis
+CACHED_FIELDS = ("id", "email", "name", "nivel", "is_active", "created_at")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} não é serializável")
+
+
+class CachedUserRepository(FirestoreRepository):
+    """
+    FirestoreRepository com cache-aside no Redis para a coleção users.
+    Índices: user:id:{id} -> perfil sem a senha (CACHED_FIELDS) e user:email:{email} -> id, com TTL curto.
+    A busca por email (login) precisa do hash: o índice só troca a consulta por uma leitura direta do documento.
+    Falhas do Redis nunca quebram a autenticação: a consulta cai direto no Firestore.
+    """
+
+    def __init__(self, db: AsyncClient, redis: Redis, ttl: int = None):
+        super().__init__(db)
+        self.redis = redis
+        self.ttl = ttl or settings.USER_CACHE_TTL
+        self.collection = "users"
+
+    def _id_key(self, doc_id: str) -> str:
+        return f"user:id:{doc_id}"
+
+    def _email_key(self, email: str) -> str:
+        return f"user:email:{email.lower()}"
+
+    async def _get_cached(self, doc_id: str) -> Optional[dict]:
+        try:
+            cached = await self.redis.get(self._id_key(doc_id))
+            user = cache_codec.decode(cached) if cached else None
+        except Exception:
+            return None
+        if user and isinstance(user.get("created_at"), str):
+            # o JSON guarda o datetime como ISO; devolve o mesmo tipo que o Firestore
+            try:
+                user["created_at"] = datetime.fromisoformat(user["created_at"])
+            except ValueError:
+                pass
+        return user
+
+    async def _cache_user(self, user: dict):
+        profile = {field: user[field] for field in CACHED_FIELDS if field in user}
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.set(self._id_key(user["id"]), cache_codec.encode(profile, default=_json_default), ex=self.ttl)
+            if user.get("email"):
+                pipe.set(self._email_key(user["email"]), user["id"], ex=self.ttl)
+            await pipe.execute()
+        except Exception as e:
+            print(f"Falha ao gravar usuário no cache: {e}")
+
+    async def invalidate_user(self, doc_id: str, email: Optional[str] = None):
+        """Remove os dois índices do usuário; chamado em toda escrita na coleção users"""
+        try:
+            cached = await self._get_cached(doc_id)
+            emails = {email, cached.get("email") if cached else None} - {None}
+            await self.redis.delete(self._id_key(doc_id), *[self._email_key(e) for e in emails])
+        except Exception as e:
+            print(f"Falha ao invalidar usuário no cache: {e}")
+
+    async def find_by_id(self, collection: str, doc_id: str) -> Optional[dict]:
+        if collection != self.collection:
+            return await super().find_by_id(collection, doc_id)
+        cached = await self._get_cached(doc_id)
+        if cached is not None:
+            return cached
+        user = await super().find_by_id(collection, doc_id)
+        if user:
+            await self._cache_user(user)
+        return user
+
+    async def find_one_by_field(self, collection: str, field: str, value: Any) -> Optional[dict]:
+        if collection != self.collection or field != "email":
+            return await super().find_one_by_field(collection, field, value)
+        try:
+            user_id = await self.redis.get(self._email_key(value))
+            user_id = user_id.decode("utf-8") if isinstance(user_id, bytes) else user_id
+        except Exception:
+            user_id = None
+        if user_id:
+            # Leitura direta pelo id em vez da consulta por email; o documento completo traz o hash para o login
+            user = await super().find_by_id(collection, user_id)
+            if user and user.get("email") == value:
+                return user
+        user = await super().find_one_by_field(collection, field, value)
+        if user:
+            await self._cache_user(user)
+        return user
+
+    async def save(self, collection: str, data: dict, doc_id: Optional[str] = None):
+        saved = await super().save(collection, data, doc_id)
+        if collection == self.collection:
+            await self.invalidate_user(saved["id"], data.get("email"))
+        return saved
+
+    async def update_fields(self, collection: str, doc_id: str, data: dict):
+        await super().update_fields(collection, doc_id, data)
+        if collection == self.collection:
+            await self.invalidate_user(doc_id)
+
+    async def delete(self, collection: str, doc_id: str):
+        await super().delete(collection, doc_id)
+        if collection == self.collection:
+            await self.invalidate_user(doc_id)
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 from app.schemas.sw.sw_resouce import SWResource
 from app.schemas.sw.sw import SWAnyDetailsRead
@@ -16,4 +17,13 @@ class SWFavorite(SWFavoriteCreate):
 
 
 class SWFavoriteRead(SWFavorite):
-    details: SWAnyDetailsRead | dict
\ No newline at end of file
+    details: SWAnyDetailsRead | dict
+
+class SWFavoriteListItem(SWFavorite):
+    details: Optional[SWAnyDetailsRead | dict] = None
+
+
+class SWFavoritePage(BaseModel):
+    items: list[SWFavoriteListItem]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
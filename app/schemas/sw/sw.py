@@ -1,5 +1,6 @@
-from pydantic import BaseModel, RootModel
-from typing import Union
+from pydantic import BaseModel, RootModel, Field, Discriminator, Tag
+from typing import Annotated, Union, Optional
+from app.schemas.sw.sw_resouce import SWResource
 from app.schemas.sw.sw_people import SWPeople, SWPeopleDetails
 from app.schemas.sw.sw_films import SWFilms, SWFilmsDetails
 from app.schemas.sw.sw_planets import SWPlanets, SWPlanetsDetails
@@ -31,12 +32,57 @@ class SWVehiclesRead(SWRead):
     results: list[SWVehicles]
 
 
+# Modelo de um item da listagem, usado na exportação da coleção inteira
+RESOURCE_MODELS: dict[SWResource, type[BaseModel]] = {
+    SWResource.people: SWPeople,
+    SWResource.films: SWFilms,
+    SWResource.planets: SWPlanets,
+    SWResource.species: SWSpecies,
+    SWResource.starships: SWStarships,
+    SWResource.vehicles: SWVehicles,
+}
+
+DETAILS_MODELS: dict[SWResource, type[BaseModel]] = {
+    SWResource.people: SWPeopleDetails,
+    SWResource.films: SWFilmsDetails,
+    SWResource.planets: SWPlanetsDetails,
+    SWResource.species: SWSpeciesDetails,
+    SWResource.starships: SWStarshipsDetails,
+    SWResource.vehicles: SWVehiclesDetails,
+}
+
+
+def _details_tag(value) -> Optional[str]:
+    # O recurso vem da própria url da SWAPI (.../api/films/1/): uma checagem direta, sem tentar cada variante
+    url = value.get("url") if isinstance(value, dict) else getattr(value, "url", None)
+    if not isinstance(url, str):
+        return None
+    parts = url.rstrip("/").split("/")
+    return parts[-2] if len(parts) >= 2 else None
+
+
 class SWAnyDetailsRead(RootModel):
-    root: Union[
-        SWPeopleDetails, 
-        SWFilmsDetails, 
-        SWPlanetsDetails, 
-        SWSpeciesDetails, 
-        SWStarshipsDetails, 
-        SWVehiclesDetails
-    ]
\ No newline at end of file
+    root: Annotated[
+        Union[
+            Annotated[SWPeopleDetails, Tag(SWResource.people.value)],
+            Annotated[SWFilmsDetails, Tag(SWResource.films.value)],
+            Annotated[SWPlanetsDetails, Tag(SWResource.planets.value)],
+            Annotated[SWSpeciesDetails, Tag(SWResource.species.value)],
+            Annotated[SWStarshipsDetails, Tag(SWResource.starships.value)],
+            Annotated[SWVehiclesDetails, Tag(SWResource.vehicles.value)],
+        ],
+        Discriminator(_details_tag)
+    ]
+
+
+class SWDetailsRef(BaseModel):
+    resource: SWResource
+    id: str
+
+class SWDetailsBatchRequest(BaseModel):
+    items: list[SWDetailsRef] = Field(..., min_length=1, max_length=100)
+
+class SWDetailsBatchItem(SWDetailsRef):
+    details: Optional[SWAnyDetailsRead] = None
+    status_code: int = 200
+    error: Optional[str] = None
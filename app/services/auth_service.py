@@ -22,7 +22,7 @@ class AuthService:
                 detail="A senha tem que ter 8 caracteres, pelo menos um caractere maiúsculo, um minúsculo, um número e um especial!"
             )
     
-        hashed_password = self.auth.hash_senha(new_user_data.password)
+        hashed_password = await self.auth.hash_senha_async(new_user_data.password)
         new_user = User(
             email=new_user_data.email,
             password=hashed_password,
@@ -36,7 +36,7 @@ class AuthService:
     
     async def authenticate_user(self, login_data: UserLogin):
        user = await self.repository.find_one_by_field("users", "email", login_data.email)
-       if not user or not self.auth.verificar_senha(login_data.password, user["password"]):
+       if not user or not await self.auth.verificar_senha_async(login_data.password, user["password"]):
            raise HTTPException(status_code=401, detail="Credenciais inválidas")
        return user
 
@@ -1,13 +1,15 @@
-from typing import Optional
+from typing import AsyncIterator, Optional
 from fastapi import HTTPException
 from app.repository.firestore_repository import FirestoreRepository
 from app.schemas.favorites.sw_favorites import SWFavoriteCreate
 from app.services.starwars_service import StarWarsService
+from app.utils.cursor import Cursor
 
 class FavoriteService:
     def __init__(self, repository: FirestoreRepository, sw_service: Optional[StarWarsService] = None):
         self.sw_service = sw_service
         self.repository = repository
+        self.cursor = Cursor()
         
 
     async def get_favorite_id(self, user_id: str, id: str):
@@ -21,12 +23,64 @@ class FavoriteService:
             favorite['details'] = {"error": "Não foi possível carregar os detalhes da Star Wars API no momento."}
         return favorite
 
-    async def list_favorites(self, user_id: str, filters: list[tuple] = None, limit: int = 10, last_id: Optional[str] = None):
+    async def list_favorites(
+        self,
+        user_id: str,
+        filters: list[tuple] = None,
+        limit: int = 10,
+        last_id: Optional[str] = None,
+        expand_details: bool = False,
+        cursor: Optional[str] = None
+    ):
         if not filters:
             filters = [("user_id", "==", user_id)]
         else:
             filters.append(("user_id", "==", user_id))
-        return await self.repository.list_with_filters("favorites", filters=filters, limit=limit, last_doc_id=last_id)
+
+        # O cursor só vale para a mesma consulta (usuário + filtros) que o gerou
+        scope = repr(sorted(filters))
+        start_after = {"__name__": last_id} if last_id else None
+        if cursor:
+            start_after = self.cursor.decode(cursor, scope)
+            if start_after is None:
+                raise HTTPException(status_code=400, detail="Cursor de paginação inválido.")
+
+        favorites, last_values, has_more = await self.repository.list_page(
+            "favorites", filters=filters, limit=limit, start_after=start_after
+        )
+        if expand_details:
+            await self._expand_details(favorites)
+        return {
+            "items": favorites,
+            "next_cursor": self.cursor.encode(last_values, scope) if has_more else None,
+            "has_more": has_more
+        }
+
+    async def export_favorites(self, user_id: str, filters: list[tuple] = None, chunk_size: int = 100) -> AsyncIterator[list[dict]]:
+        """Todos os favoritos do usuário, em lotes de até `chunk_size`, lidos do stream do Firestore sob demanda"""
+        filters = [*(filters or []), ("user_id", "==", user_id)]
+        chunk = []
+        async for favorite in self.repository.stream_with_filters("favorites", filters=filters):
+            chunk.append(favorite)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def _expand_details(self, favorites: list[dict]):
+        """Enriquece a página inteira numa única busca em lote (sem N+1), isolando o erro de cada item"""
+        error = {"error": "Não foi possível carregar os detalhes da Star Wars API no momento."}
+        try:
+            results = await self.sw_service.get_details_many(
+                [(favorite.get('resource'), favorite.get('sw_id')) for favorite in favorites]
+            )
+        except Exception:
+            results = {}
+        for favorite in favorites:
+            details = results.get((favorite.get('resource'), str(favorite.get('sw_id'))))
+            favorite['details'] = details if isinstance(details, dict) else error
+        return favorites
 
     async def add_favorite(self, favorite_create: SWFavoriteCreate):
         if not favorite_create.url.startswith("https://"):
@@ -1,102 +1,374 @@
-from app.integration.SwapiClient import SwapiClient
+from app.integration.SwapiClient import SwapiClient, NotModified, Revalidation, revalidating
 from app.core.config import settings
 from app.schemas.sw.sw_resouce import SWResource
+from app.utils.single_flight import SingleFlight
+from app.utils.local_cache import LocalCache, INVALIDATION_CHANNEL
+from app.utils.circuit_breaker import CircuitBreaker, Permit
+from app.utils.deadline import deadline
+from app.utils.cache_codec import cache_codec
+from app.utils import metrics
+from app.middleware.etag import make_etag
+from app.services.swapi_snapshot import SwapiSnapshot, resource_id
 from redis.asyncio import Redis
 from fastapi import HTTPException
+from typing import AsyncIterator, Optional
+from collections import deque
 import httpx
-import json
+import time
+import math
+import uuid
 import asyncio
+import contextvars
+
+# Campos do envelope gravado no Redis: dados, carimbo de tempo e validadores HTTP da SWAPI
+ENVELOPE_FIELDS = {"data", "cached_at", "etag", "last_modified"}
+
+# Respostas prontas guardam o ETag (aspas + 32 hex) colado na frente do JSON
+ETAG_LENGTH = 34
+
+# Libera o lock de recarga só se ele ainda for nosso: um dono lento que passou do TTL não apaga o lock de outro worker
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Referências fortes para as revalidações em segundo plano não serem coletadas pelo GC
+_background_tasks: set[asyncio.Task] = set()
+
+# Segundos de frescor que ainda restam aos dados lidos por _execute_with_resilience na requisição atual.
+# _cached_response usa para não guardar uma resposta pronta por mais tempo que os dados por trás dela.
+_freshness: contextvars.ContextVar[Optional[list[float]]] = contextvars.ContextVar("swapi_freshness", default=None)
+
+
+def _report_freshness(ttl: float):
+    holder = _freshness.get()
+    if holder is not None:
+        holder[0] = min(holder[0], max(0.0, ttl))
+
 
 class StarWarsService:
-    def __init__(self, swapi_client: SwapiClient, redis: Redis):
+    def __init__(
+        self,
+        swapi_client: SwapiClient,
+        redis: Redis,
+        single_flight: Optional[SingleFlight] = None,
+        local_cache: Optional[LocalCache] = None,
+        snapshot: Optional[SwapiSnapshot] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
         self.swapi = swapi_client
         self.redis = redis
-        self.failure_key = "circuit:swapi:failures"
-        self.status_key = "circuit:swapi:status" # open ou closed
-        self.threshold = 3
-        self.recovery_time = 60
-        self.cache_expiry = 3600
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+        self.local_cache = local_cache if local_cache is not None else LocalCache()
+        self.snapshot = snapshot
+        # Modo espelho ou store local: listagens, buscas e detalhes saem dos índices em memória, sem Redis nem SWAPI
+        self.serve_local = snapshot is not None and (settings.SWAPI_MODE == "mirror" or settings.SWAPI_LOCAL_STORE)
+        self.breaker = breaker if breaker is not None else CircuitBreaker(redis)
+        self.codec = cache_codec
+        self.cache_expiry = 3600 # TTL "soft": depois disso a entrada fica velha (stale)
+        self.stale_while_revalidate = settings.CACHE_STALE_WHILE_REVALIDATE
+        self.stale_if_error = settings.CACHE_STALE_IF_ERROR
+        self.cache_hard_expiry = self.cache_expiry + max(self.stale_while_revalidate, self.stale_if_error)
         self.cache_expiry_resource = 86400
+        self.response_ttl = min(settings.RESPONSE_CACHE_TTL, self.cache_expiry)
+        self.nested_concurrency = 10 # buscas simultâneas de recursos aninhados na SWAPI
+        self.batch_concurrency = 10 # detalhes buscados em paralelo por get_details_many
+        self.stream_prefetch = max(1, settings.SWAPI_STREAM_PREFETCH)
         self.base_url = settings.SWAPI_BASE
+        self.distributed_lock = settings.SWAPI_DISTRIBUTED_LOCK
+        self.lock_wait = 5
+        self.lock_poll_interval = 0.05
+        self.request_budget = settings.SWAPI_REQUEST_BUDGET # segundos para a SWAPI responder, aninhados inclusos
+        # Sempre maior que o orçamento da chamada (retries inclusos), com folga para as escritas no Redis
+        self.lock_ttl = math.ceil(self.request_budget) + 5 # segundos
 
 
-    async def _execute_with_resilience(self, cache_key: str, swapi_callback):
-        status = await self.redis.get(self.status_key)
-        if status == "open":
-            raise HTTPException(
-                status_code=503, 
-                detail="Circuito aberto: SWAPI temporariamente bloqueada."
-            )
+    async def invalidate(self, cache_key: str):
+        """Remove a chave (e a resposta pronta derivada dela) do Redis e avisa os outros workers para descartarem o L1"""
+        keys = [cache_key, self._response_key(cache_key)]
+        for key in keys:
+            self.local_cache.invalidate(key)
+        await self.redis.delete(*keys)
+        for key in keys:
+            await self.redis.publish(INVALIDATION_CHANNEL, self.local_cache.invalidation_message(key))
+
+    async def _drop_response(self, cache_key: str):
+        """Os dados mudaram: a resposta serializada a partir deles deixa de valer em todos os workers"""
+        response_key = self._response_key(cache_key)
+        self.local_cache.invalidate(response_key)
+        await self.redis.delete(response_key)
+        await self.redis.publish(INVALIDATION_CHANNEL, self.local_cache.invalidation_message(response_key))
+
+
+    def _wrap(self, data, validators: Optional[dict] = None) -> bytes:
+        return self.codec.encode({"data": data, "cached_at": time.time(), **(validators or {})})
+
+    def _unwrap(self, raw):
+        """Retorna (dados, idade em segundos, validadores HTTP) de uma entrada do cache"""
+        payload = self.codec.decode(raw)
+        if isinstance(payload, dict) and {"data", "cached_at"} <= set(payload) <= ENVELOPE_FIELDS:
+            validators = {key: payload[key] for key in ("etag", "last_modified") if payload.get(key)}
+            return payload["data"], max(0.0, time.time() - payload["cached_at"]), validators
+        return payload, 0.0, {} # formato antigo, sem carimbo de tempo
+
+    async def _read_cache(self, cache_key: str):
         cached_data = await self.redis.get(cache_key)
-        if cached_data: return json.loads(cached_data)
-        
+        if not cached_data: return None
+        try:
+            return self._unwrap(cached_data)
+        except ValueError:
+            return None
+
+
+    def _schedule_refresh(self, cache_key: str, swapi_callback, entry=None):
+        async def refresh():
+            try:
+                await self.single_flight.do(cache_key, lambda: self._refill(cache_key, swapi_callback, entry))
+            except Exception as e:
+                print(f"Falha ao revalidar {cache_key} em segundo plano: {e}")
+
+        # Contexto vazio: a revalidação tem orçamento próprio, não o que sobrou da requisição que a disparou
+        task = asyncio.create_task(refresh(), context=contextvars.Context())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+
+    @metrics.timed("resilience")
+    async def _execute_with_resilience(self, cache_key: str, swapi_callback):
+        local_data = self.local_cache.get(cache_key)
+        if local_data is not None:
+            metrics.CACHE_REQUESTS.inc(cache="data", result="l1_hit")
+            _report_freshness(self.local_cache.remaining(cache_key) or 0.0)
+            return local_data
+
+        entry = await self._read_cache(cache_key)
+        if entry is not None:
+            data, age, _ = entry
+            if age <= self.cache_expiry:
+                metrics.CACHE_REQUESTS.inc(cache="data", result="redis_hit")
+                self.local_cache.set(cache_key, data, ttl=self.cache_expiry - age)
+                _report_freshness(self.cache_expiry - age)
+                return data
+            if age <= self.cache_expiry + self.stale_while_revalidate:
+                # stale-while-revalidate: responde já e atualiza em segundo plano
+                metrics.CACHE_REQUESTS.inc(cache="data", result="stale")
+                self._schedule_refresh(cache_key, swapi_callback, entry)
+                _report_freshness(0)
+                return data
+
+        metrics.CACHE_REQUESTS.inc(cache="data", result="miss")
         try:
-            data = await swapi_callback()
-            await self.redis.set(cache_key, json.dumps(data), ex=self.cache_expiry)
-            await self.redis.delete(self.failure_key)
+            # Misses concorrentes da mesma chave compartilham uma única ida à SWAPI
+            data = await self.single_flight.do(cache_key, lambda: self._refill(cache_key, swapi_callback, entry))
+        except HTTPException as e:
+            # stale-if-error: falha da SWAPI (timeout, 5xx, circuito aberto) devolve a última cópia conhecida
+            if entry is not None and e.status_code >= 500:
+                _report_freshness(0)
+                return entry[0]
+            raise
+        _report_freshness(self.cache_expiry)
+        return data
+
+
+    async def _wait_for_cache(self, cache_key: str):
+        """Aguarda outro worker (dono do lock) preencher a chave no Redis"""
+        waited = 0.0
+        while waited < self.lock_wait:
+            await asyncio.sleep(self.lock_poll_interval)
+            waited += self.lock_poll_interval
+            entry = await self._read_cache(cache_key)
+            if entry is not None and entry[1] <= self.cache_expiry:
+                data, age, _ = entry
+                self.local_cache.set(cache_key, data, ttl=self.cache_expiry - age)
+                return data
+        return None
+
+
+    async def _refill(self, cache_key: str, swapi_callback, entry=None):
+        lock_key = f"lock:{cache_key}"
+        lock_token = uuid.uuid4().hex
+        acquired = False
+        if self.distributed_lock:
+            acquired = await self.redis.set(lock_key, lock_token, nx=True, ex=self.lock_ttl)
+            if not acquired:
+                cached_data = await self._wait_for_cache(cache_key)
+                if cached_data is not None: return cached_data
+        try:
+            return await self._fetch_and_store(cache_key, swapi_callback, entry)
+        finally:
+            if acquired:
+                await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, lock_token)
+
+
+    def _circuit_open(self) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail="Circuito aberto: SWAPI temporariamente bloqueada."
+        )
+
+
+    async def _call_upstream(self, permit: Permit, swapi_callback):
+        """Executa a chamada autorizada e registra sucesso/falha e latência no circuit breaker"""
+        started = time.perf_counter()
+        try:
+            with deadline(self.request_budget):
+                data = await swapi_callback()
+        except Exception as e:
+            await self.breaker.record(permit, not self._is_failure(e), time.perf_counter() - started)
+            raise
+        await self.breaker.record(permit, True, time.perf_counter() - started)
+        return data
+
+
+    async def _fetch_and_store(self, cache_key: str, swapi_callback, entry=None):
+        permit = await self.breaker.acquire()
+        if permit is None:
+            raise self._circuit_open()
+        # Com uma cópia velha em mãos a chamada principal vai com If-None-Match/If-Modified-Since
+        revalidation = Revalidation(entry[2] if entry is not None else None)
+        try:
+            try:
+                with revalidating(revalidation):
+                    data = await self._call_upstream(permit, swapi_callback)
+                changed = True
+            except NotModified:
+                # 304: nada de baixar, parsear ou resolver aninhados de novo; só renova o TTL
+                data, changed = entry[0], False
+                revalidation.validators = revalidation.validators or entry[2]
+            await self.redis.set(cache_key, self._wrap(data, revalidation.validators), ex=self.cache_hard_expiry)
+            self.local_cache.set(cache_key, data, ttl=self.cache_expiry)
+            if changed:
+                await self.redis.publish(INVALIDATION_CHANNEL, self.local_cache.invalidation_message(cache_key))
+                await self._drop_response(cache_key)
             return data
 
         except Exception as e:
-            
-            if isinstance(e, httpx.HTTPStatusError):
-                raise HTTPException(
-                    status_code=e.response.status_code,
-                    detail="Recurso não encontrado" if e.response.status_code == 404 else e.response.json()
-                )
-            
-            failures = await self.redis.incr(self.failure_key)
-            
-            if failures >= self.threshold:
-                await self.redis.set(self.status_key, "open", ex=self.recovery_time)
-                print(f"CIRCUITO ABERTO para SWAPI")
-
-            
-            if isinstance(e, httpx.RequestError):
-                raise HTTPException(
-                    status_code=504,
-                    detail="Tempo de resposta da SWAPI esgotado (Timeout)."
-                )
-            
-            
-            raise HTTPException(status_code=500, detail=str(e))
+            raise self._upstream_error(e)
 
 
-    async def _update_resources(self, urls: list[str]):
-        async def fetch(url):
-            cache_key = f"resource:{url}"
-            cached_data = await self.redis.get(cache_key)
+    def _is_failure(self, e: Exception) -> bool:
+        """4xx e 304 são respostas válidas da SWAPI; timeouts, erros de rede e 5xx contam como falha"""
+        if isinstance(e, NotModified):
+            return False
+        if isinstance(e, httpx.HTTPStatusError):
+            return e.response.status_code >= 500
+        return True
+
+
+    def _upstream_error(self, e: Exception) -> HTTPException:
+        """Traduz a falha da SWAPI em HTTPException; nunca levanta (o lote mapeia item a item com ela)"""
+        if isinstance(e, HTTPException):
+            return e
+        if isinstance(e, httpx.HTTPStatusError):
+            status_code = e.response.status_code
+            if status_code == 404:
+                return HTTPException(status_code=404, detail="Recurso não encontrado")
+            if status_code >= 500:
+                # Não lê o corpo: no 5xx costuma vir HTML do proxy ou nada, e o stale-if-error depende desta exceção
+                return HTTPException(status_code=status_code, detail=f"A SWAPI respondeu com erro ({status_code}).")
+            try:
+                detail = e.response.json()
+            except Exception:
+                # corpo que não é JSON (ou nem foi lido): devolve o texto, ou só o status
+                try:
+                    detail = e.response.text
+                except Exception:
+                    detail = str(e)
+            return HTTPException(status_code=status_code, detail=detail)
+
+        if isinstance(e, httpx.RequestError):
+            return HTTPException(
+                status_code=504,
+                detail="Tempo de resposta da SWAPI esgotado (Timeout)."
+            )
+        
+        
+        return HTTPException(status_code=500, detail=str(e))
+
+
+    def _nested_urls(self, data: dict) -> dict[str, list[str]]:
+        """Campos de relacionamento do recurso (URLs da SWAPI) que devem virar nomes"""
+        fields = {}
+        for key, value in data.items():
+            if isinstance(value, list) and len(value) > 0 and str(value[0]).startswith(self.base_url):
+                fields[key] = value
+            elif isinstance(value, str) and value.startswith(self.base_url) and key not in ["url"]:
+                fields[key] = [value]
+        return fields
+
+
+    async def _resolve_names(self, urls: list[str]) -> dict[str, Optional[str]]:
+        """Resolve URLs em nomes com um MGET, busca só os misses na SWAPI e grava tudo num pipeline"""
+        names = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            local_name = self.local_cache.get(f"resource:{url}")
+            if local_name is not None:
+                names[url] = local_name
+            else:
+                pending.append(url)
+        metrics.CACHE_REQUESTS.inc(len(names), cache="names", result="l1_hit")
+        if not pending: return names
+
+        cached = await self.redis.mget([f"resource:{url}" for url in pending])
+        misses = []
+        for url, cached_data in zip(pending, cached):
             if cached_data:
-                return cached_data.decode('utf-8') if isinstance(cached_data, bytes) else cached_data
+                name = cached_data.decode('utf-8') if isinstance(cached_data, bytes) else cached_data
+                names[url] = name
+                self.local_cache.set(f"resource:{url}", name)
+            else:
+                misses.append(url)
+        metrics.CACHE_REQUESTS.inc(len(pending) - len(misses), cache="names", result="redis_hit")
+        metrics.CACHE_REQUESTS.inc(len(misses), cache="names", result="miss")
+        if not misses: return names
+
+        semaphore = asyncio.Semaphore(self.nested_concurrency)
+
+        async def fetch_name(url):
             try:
-                data = await self.swapi.get_url(url)
-                name = data.get("name") or data.get("title") or "Unknown"
-                await self.redis.set(cache_key, name, ex=self.cache_expiry_resource)
-                return name
+                async with semaphore:
+                    data = await self.swapi.get_url(url)
+                return data.get("name") or data.get("title") or "Unknown"
             except:
                 return None
-        
-        return await asyncio.gather(*[fetch(url) for url in urls])
+
+        fetched = await asyncio.gather(*[
+            self.single_flight.do(f"resource:{url}", lambda url=url: fetch_name(url))
+            for url in misses
+        ])
+
+        pipe = self.redis.pipeline(transaction=False)
+        to_write = 0
+        for url, name in zip(misses, fetched):
+            names[url] = name
+            if name is not None:
+                pipe.set(f"resource:{url}", name, ex=self.cache_expiry_resource)
+                self.local_cache.set(f"resource:{url}", name, ttl=self.cache_expiry_resource)
+                to_write += 1
+        if to_write:
+            await pipe.execute()
+        return names
+
+
+    async def _update_resources(self, urls: list[str]):
+        names = await self._resolve_names(urls)
+        return [names.get(url) for url in urls]
     
 
+    @metrics.timed("nested")
     async def _update_nested_resources(self, data: dict):
-        keys_to_update = []
-        tasks = []
+        fields = self._nested_urls(data)
+        if not fields: return data
 
-        for key, value in data.items():
-            if isinstance(value, list) and len(value) > 0 and str(value[0]).startswith(self.base_url):
-                keys_to_update.append(key)
-                tasks.append(self._update_resources(value))
-            elif isinstance(value, str) and value.startswith(self.base_url) and key not in ["url"]:
-                keys_to_update.append(key)
-                tasks.append(self._update_resources([value]))
-        
-        if tasks:
-            results = await asyncio.gather(*tasks)
-            for i, key in enumerate(keys_to_update):
-                if isinstance(data[key], list):
-                    data[key] = results[i]
-                else:
-                    data[key] = results[i][0] if results[i] else data[key]
+        names = await self._resolve_names([url for urls in fields.values() for url in urls])
+        for key, urls in fields.items():
+            if isinstance(data[key], list):
+                data[key] = [names.get(url) for url in urls]
+            else:
+                data[key] = names.get(urls[0])
         return data
     
 
@@ -112,33 +384,251 @@ class StarWarsService:
             item.pop(key)
         return item
 
-    async def get_resources(self, resource: str, **kwargs):
-        
+    def _strip_page(self, data: dict):
+        if "results" in data and isinstance(data["results"], list):
+            data["results"] = [self._strip_nested_lists(item) for item in data["results"]]
+        else:
+            data = self._strip_nested_lists(data)
+        return data
+
+    def _resources_key(self, resource: str, **kwargs) -> str:
         kwargs_str = ":".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
-        cache_key = f"cache:{resource}:{kwargs_str}"
+        return f"cache:{resource}:{kwargs_str}"
+
+    def _details_key(self, resource: str, id: str) -> str:
+        return f"detail:{resource}:{id}"
+
+    def _response_key(self, cache_key: str) -> str:
+        return f"response:{cache_key}"
+
+    def _snapshot_details(self, resource: str, id: str) -> dict:
+        data = self.snapshot.detail(resource, id)
+        for key, urls in self._nested_urls(data).items():
+            names = [self.snapshot.name_for(url) for url in urls]
+            data[key] = names if isinstance(data[key], list) else names[0]
+        return data
+
+
+    async def warm_cache(self, snapshot: SwapiSnapshot) -> int:
+        """Pré-carrega as chaves resource:*, detail:* e cache:* do Redis a partir de um snapshot"""
+        previous, self.snapshot = self.snapshot, snapshot
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            written = 0
+            for resource, items in snapshot.resources.items():
+                for item in items:
+                    pipe.set(f"resource:{item['url']}", snapshot.display_name(item), ex=self.cache_expiry_resource)
+                    details = self._snapshot_details(resource, resource_id(item["url"]))
+                    pipe.set(self._details_key(resource, resource_id(item["url"])), self._wrap(details), ex=self.cache_hard_expiry)
+                    written += 2
+
+                pages = max(1, -(-len(items) // snapshot.page_size))
+                for page in [None, *range(1, pages + 1)]:
+                    data = self._strip_page(snapshot.list_page(resource, page=page))
+                    pipe.set(self._resources_key(resource, name=None, page=page), self._wrap(data), ex=self.cache_hard_expiry)
+                    written += 1
+            await pipe.execute()
+            return written
+        finally:
+            self.snapshot = previous
+
+
+    async def get_resources(self, resource: str, **kwargs):
+        if self.serve_local:
+            return self._strip_page(self.snapshot.list_page(resource, **kwargs))
+
+        cache_key = self._resources_key(resource, **kwargs)
                   
         async def fetch_and_strip():
 
             method = getattr(self.swapi, resource) # pega o método do SWAPI ex: people, planets
             data = await method(**kwargs) # passa os argumentos como name , page
-            
-            if "results" in data and isinstance(data["results"], list):
-                data["results"] = [self._strip_nested_lists(item) for item in data["results"]]
-            else:
-                data = self._strip_nested_lists(data)
-            return data
+            return self._strip_page(data)
         return await self._execute_with_resilience(cache_key, fetch_and_strip)
 
        
         
 
-    async def get_details(self, resource: SWResource, id: str):
-        res_name = resource.value if hasattr(resource, 'value') else resource
-        cache_key = f"detail:{resource}:{id}"
+    async def stream_resources(self, resource: str) -> AsyncIterator[list[dict]]:
+        """
+        Coleção inteira, página por página. A primeira é buscada aqui (uma falha vira HTTPException
+        antes de a resposta começar) e as demais saem do gerador retornado, em ordem.
+        """
+        first = await self.get_resources(resource, name=None, page=1)
+        return self._iter_pages(resource, first)
+
+    async def _iter_pages(self, resource: str, first: dict) -> AsyncIterator[list[dict]]:
+        # Cada página passa pelo cache/breaker normal (mesma chave da listagem paginada) e até
+        # `stream_prefetch` ficam em voo à frente da que está sendo enviada: memória limitada a essas páginas
+        yield first.get("results", [])
+        page_size = len(first.get("results", []))
+        if not first.get("next") or not page_size:
+            return
+        last_page = -(-first.get("count", 0) // page_size)
+
+        pending: deque[asyncio.Task] = deque()
+        next_page = 2
+        try:
+            while next_page <= last_page or pending:
+                while next_page <= last_page and len(pending) < self.stream_prefetch:
+                    pending.append(asyncio.create_task(self.get_resources(resource, name=None, page=next_page)))
+                    next_page += 1
+                data = await pending.popleft()
+                yield data.get("results", [])
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+    def _details_callback(self, resource: str, id: str):
         async def fetch_details():
             method = getattr(self.swapi, "get_detail")
-            data = await method(res_name, id)
+            data = await method(resource, id)
             if isinstance(data, dict):
                 data = await self._update_nested_resources(data)
             return data
-        return await self._execute_with_resilience(cache_key, fetch_details)
\ No newline at end of file
+        return fetch_details
+
+    async def get_details(self, resource: SWResource, id: str):
+        res_name = resource.value if hasattr(resource, 'value') else resource
+        if self.serve_local:
+            return self._snapshot_details(res_name, id)
+
+        cache_key = self._details_key(res_name, id)
+        return await self._execute_with_resilience(cache_key, self._details_callback(res_name, id))
+
+
+    async def _cached_response(self, cache_key: str, model, load) -> tuple[str, bytes]:
+        """
+        Resposta final de uma rota: JSON já validado pelo response model e serializado, mais o ETag.
+        No hit (L1 ou um GET no Redis) não há decodificação, validação nem serialização.
+        """
+        response_key = self._response_key(cache_key)
+        packed = self.local_cache.get(response_key)
+        result = "l1_hit"
+        if packed is None and not self.serve_local:
+            packed = await self.redis.get(response_key) or None
+            result = "redis_hit"
+            if packed is not None:
+                self.local_cache.set(response_key, packed, ttl=self.response_ttl)
+
+        if packed is None:
+            result = "miss"
+            freshness = [float(self.response_ttl)]
+            token = _freshness.set(freshness)
+            try:
+                data = await load()
+            finally:
+                _freshness.reset(token)
+            with metrics.span("serialize"):
+                body = model.model_validate(data).model_dump_json(by_alias=True).encode("utf-8")
+            packed = make_etag(body).encode("ascii") + body
+            # Dados velhos (SWR ou stale-if-error) não viram resposta pronta: a próxima requisição já vê a atualização
+            ttl = int(freshness[0])
+            if ttl > 0:
+                self.local_cache.set(response_key, packed, ttl=ttl)
+                if not self.serve_local:
+                    await self.redis.set(response_key, packed, ex=ttl)
+        metrics.CACHE_REQUESTS.inc(cache="response", result=result)
+        return packed[:ETAG_LENGTH].decode("ascii"), packed[ETAG_LENGTH:]
+
+    async def get_resources_response(self, resource: str, model, **kwargs) -> tuple[str, bytes]:
+        return await self._cached_response(
+            self._resources_key(resource, **kwargs), model, lambda: self.get_resources(resource, **kwargs)
+        )
+
+    async def get_details_response(self, resource: SWResource, id: str, model) -> tuple[str, bytes]:
+        res_name = resource.value if hasattr(resource, 'value') else resource
+        return await self._cached_response(
+            self._details_key(res_name, id), model, lambda: self.get_details(resource, id)
+        )
+
+
+    async def invalidate_details(self, resource: SWResource, id: str):
+        """Descarta os detalhes em cache de um recurso em todos os workers; a próxima leitura vai à SWAPI"""
+        res_name = resource.value if hasattr(resource, 'value') else resource
+        await self.invalidate(self._details_key(res_name, id))
+
+
+    async def get_details_many(self, refs: list[tuple]) -> dict[tuple[str, str], dict | HTTPException]:
+        """Detalhes de vários recursos de uma vez: um MGET para o cache e os misses em paralelo,
+        cada um pelo mesmo caminho de get_details (single-flight, lock, breaker, revalidação e stale-if-error).
+
+        Retorna {(recurso, id): detalhes} com a HTTPException no lugar dos itens que falharam.
+        """
+        # Um orçamento para o lote inteiro: buscas dos itens e resolução dos nomes aninhados
+        with deadline(self.request_budget):
+            return await self._get_details_many(refs)
+
+
+    async def _get_details_many(self, refs: list[tuple]) -> dict[tuple[str, str], dict | HTTPException]:
+        keys = list(dict.fromkeys(
+            (resource.value if hasattr(resource, 'value') else resource, str(id)) for resource, id in refs
+        ))
+        results: dict[tuple[str, str], dict | HTTPException] = {}
+
+        if self.serve_local:
+            for resource, id in keys:
+                try:
+                    results[(resource, id)] = self._snapshot_details(resource, id)
+                except HTTPException as e:
+                    results[(resource, id)] = e
+            return results
+
+        pending = []
+        for key in keys:
+            local_data = self.local_cache.get(self._details_key(*key))
+            if local_data is not None:
+                results[key] = local_data
+            else:
+                pending.append(key)
+        if not pending: return results
+
+        cached = await self.redis.mget([self._details_key(*key) for key in pending])
+
+        stale: dict[tuple[str, str], tuple] = {}
+        misses = []
+        for key, cached_data in zip(pending, cached):
+            entry = None
+            if cached_data:
+                try:
+                    entry = self._unwrap(cached_data)
+                except ValueError:
+                    entry = None
+            if entry is None:
+                misses.append(key)
+                continue
+            data, age, _ = entry
+            if age <= self.cache_expiry:
+                self.local_cache.set(self._details_key(*key), data, ttl=self.cache_expiry - age)
+                results[key] = data
+            elif age <= self.cache_expiry + self.stale_while_revalidate:
+                self._schedule_refresh(self._details_key(*key), self._details_callback(*key), entry)
+                results[key] = data
+            else:
+                stale[key] = entry
+                misses.append(key)
+
+        if not misses: return results
+
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def refill(key):
+            # Mesma chave e mesmo caminho de get_details: coalesce com ele, passa por lock e breaker e revalida com ETag
+            cache_key = self._details_key(*key)
+            async with semaphore:
+                return await self.single_flight.do(
+                    cache_key, lambda: self._refill(cache_key, self._details_callback(*key), stale.get(key))
+                )
+
+        fetched = await asyncio.gather(*[refill(key) for key in misses], return_exceptions=True)
+
+        for key, data in zip(misses, fetched):
+            if isinstance(data, Exception):
+                error = self._upstream_error(data)
+                # stale-if-error por item, como em _execute_with_resilience
+                results[key] = stale[key][0] if key in stale and error.status_code >= 500 else error
+            else:
+                results[key] = data
+        return results
@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import quote
+from fastapi import HTTPException
+from app.core.config import settings
+from app.integration.SwapiClient import SwapiClient, build_http_client
+from app.schemas.sw.sw_resouce import SWResource
+
+RESOURCES = [resource.value for resource in SWResource]
+
+
+def resource_id(url: str) -> str:
+    """Extrai o ID de uma URL da SWAPI (ex: https://swapi.dev/api/people/1/ -> 1)"""
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+# Campos usados pela busca (?search=) de cada recurso, como na SWAPI
+SEARCH_FIELDS = {
+    "films": ("title",),
+    "starships": ("name", "model"),
+    "vehicles": ("name", "model"),
+}
+
+
+class ResourceIndex:
+    """Índices de um recurso: mapa por ID, índice de trigramas dos nomes e páginas pré-calculadas"""
+
+    def __init__(self, items: list[dict], fields: tuple[str, ...], page_size: int, max_searches: int = 512):
+        self.items = items
+        self.page_size = page_size
+        self.by_id = {resource_id(item["url"]): item for item in items}
+        self.keys = ["\n".join(str(item.get(field) or "") for field in fields).lower() for item in items]
+        self.trigrams: dict[str, set[int]] = {}
+        for position, key in enumerate(self.keys):
+            for i in range(len(key) - 2):
+                self.trigrams.setdefault(key[i:i + 3], set()).add(position)
+        self.pages = [items[start:start + page_size] for start in range(0, len(items), page_size)] or [[]]
+        self.max_searches = max_searches
+        self._searches: OrderedDict[str, list[dict]] = OrderedDict()
+
+    def search(self, term: str) -> list[dict]:
+        term = term.lower()
+        matches = self._searches.get(term)
+        if matches is not None:
+            self._searches.move_to_end(term)
+            return matches
+
+        if len(term) >= 3:
+            grams = sorted((self.trigrams.get(term[i:i + 3], set()) for i in range(len(term) - 2)), key=len)
+            candidates = sorted(set.intersection(*grams)) if grams[0] else []
+        else:
+            candidates = range(len(self.items))
+        matches = [self.items[position] for position in candidates if term in self.keys[position]]
+
+        self._searches[term] = matches
+        if len(self._searches) > self.max_searches:
+            self._searches.popitem(last=False)
+        return matches
+
+    def page_slice(self, page: int, name: Optional[str] = None) -> tuple[int, list[dict]]:
+        """Retorna (total de itens, itens da página); página inexistente gera lista vazia"""
+        if not name:
+            return len(self.items), self.pages[page - 1] if page <= len(self.pages) else []
+        matches = self.search(name)
+        start = (page - 1) * self.page_size
+        return len(matches), matches[start:start + self.page_size]
+
+
+class SwapiSnapshot:
+    """Cópia local e imutável de todo o dataset da SWAPI, indexada para busca e paginação em memória"""
+
+    def __init__(self, resources: dict[str, list[dict]], base_url: str = None, created_at: float = None):
+        self.resources = resources
+        self.base_url = (base_url or settings.SWAPI_BASE).rstrip("/")
+        self.created_at = created_at or time.time()
+        self.page_size = 10
+        self.by_url = {item["url"]: item for items in resources.values() for item in items}
+        self.indexes = {
+            resource: ResourceIndex(items, SEARCH_FIELDS.get(resource, ("name",)), self.page_size)
+            for resource, items in resources.items()
+        }
+
+    @staticmethod
+    def display_name(item: dict) -> str:
+        return item.get("name") or item.get("title") or "Unknown"
+
+    def _page_url(self, resource: str, name: Optional[str], page: int) -> str:
+        search = f"search={quote(name)}&" if name else ""
+        return f"{self.base_url}/{resource}/?{search}page={page}"
+
+    def list_page(self, resource: str, name: str = None, page: int = None) -> dict:
+        """Mesmo formato de resposta da listagem da SWAPI (count/next/previous/results)"""
+        index = self.indexes.get(resource)
+        if index is None:
+            raise HTTPException(status_code=404, detail="Recurso não encontrado")
+
+        page = page or 1
+        count, items = index.page_slice(page, name)
+        if not items and page != 1:
+            raise HTTPException(status_code=404, detail="Recurso não encontrado")
+
+        return {
+            "count": count,
+            "next": self._page_url(resource, name, page + 1) if page * self.page_size < count else None,
+            "previous": self._page_url(resource, name, page - 1) if page > 1 else None,
+            "results": [dict(item) for item in items],
+        }
+
+    def detail(self, resource: str, id: str) -> dict:
+        index = self.indexes.get(resource)
+        item = index.by_id.get(str(id)) if index else None
+        if item is None:
+            raise HTTPException(status_code=404, detail="Recurso não encontrado")
+        return dict(item)
+
+    def name_for(self, url: str) -> Optional[str]:
+        item = self.by_url.get(url)
+        return self.display_name(item) if item else None
+
+    def to_dict(self) -> dict:
+        return {"base_url": self.base_url, "created_at": self.created_at, "resources": self.resources}
+
+    def save(self, path: str):
+        """Grava num temporário ao lado e troca com os.replace: workers salvando juntos nunca deixam o arquivo pela metade"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, separators=(",", ":"))
+            os.chmod(tmp_path, 0o644) # mkstemp cria com 0600
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "SwapiSnapshot":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["resources"], base_url=data.get("base_url"), created_at=data.get("created_at"))
+
+
+async def crawl_resource(swapi: SwapiClient, resource: str) -> list[dict]:
+    page = await swapi.get_api(resource)
+    items = list(page.get("results", []))
+    while page.get("next"):
+        page = await swapi.get_url(page["next"])
+        items.extend(page.get("results", []))
+    return items
+
+
+async def crawl(swapi: SwapiClient) -> SwapiSnapshot:
+    """Percorre a paginação dos seis recursos da SWAPI e monta o snapshot"""
+    results = await asyncio.gather(*[crawl_resource(swapi, resource) for resource in RESOURCES])
+    return SwapiSnapshot(dict(zip(RESOURCES, results)), base_url=swapi.base_url)
+
+
+async def prepare_snapshot(swapi: SwapiClient) -> Optional[SwapiSnapshot]:
+    """Carrega o snapshot do disco; no modo espelho, sem arquivo, percorre a SWAPI e salva"""
+    path = settings.SWAPI_SNAPSHOT_PATH
+    if path and os.path.exists(path):
+        return SwapiSnapshot.load(path)
+    if settings.SWAPI_MODE != "mirror":
+        return None
+    snapshot = await crawl(swapi)
+    if path:
+        snapshot.save(path)
+    return snapshot
+
+
+async def _main():
+    parser = argparse.ArgumentParser(description="Gera um snapshot local da SWAPI")
+    parser.add_argument("--output", default=settings.SWAPI_SNAPSHOT_PATH or "swapi_snapshot.json.gz")
+    parser.add_argument("--warm", action="store_true", help="Também pré-carrega as chaves de cache no Redis")
+    args = parser.parse_args()
+
+    http_client = build_http_client()
+    try:
+        snapshot = await crawl(SwapiClient(http_client))
+    finally:
+        await http_client.aclose()
+    snapshot.save(args.output)
+    print(f"Snapshot salvo em {args.output}: " + ", ".join(f"{k}={len(v)}" for k, v in snapshot.resources.items()))
+
+    if args.warm:
+        from redis.asyncio import Redis
+        from app.services.starwars_service import StarWarsService
+        redis = Redis.from_url(settings.REDIS, decode_responses=True)
+        try:
+            written = await StarWarsService(SwapiClient(), redis).warm_cache(snapshot)
+            print(f"{written} chaves gravadas no Redis")
+        finally:
+            await redis.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
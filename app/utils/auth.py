@@ -1,11 +1,87 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from fastapi import HTTPException
 from passlib.context import CryptContext
+from app.core.config import settings
+from app.utils import metrics
+
+
+class PasswordPool:
+    """Pool de threads limitado para o bcrypt (que libera o GIL), fora do event loop"""
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.slots = asyncio.Semaphore(workers + queue_limit)
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _record_wait(self, wait: float):
+        self.completed += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        metrics.PASSWORD_QUEUE_WAIT_SECONDS.observe(wait)
+
+    async def run(self, fn, *args):
+        if self.slots.locked():
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Servidor ocupado, tente novamente em instantes.")
+
+        async with self.slots:
+            queued_at = time.perf_counter()
+
+            def job():
+                # Tempo entre entrar na fila e uma thread começar o hash
+                self._record_wait(time.perf_counter() - queued_at)
+                return fn(*args)
+
+            return await asyncio.get_running_loop().run_in_executor(self.executor, job)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_seconds_avg": self.wait_seconds_total / self.completed if self.completed else 0.0,
+            "queue_wait_seconds_max": self.wait_seconds_max,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def build_password_pool() -> PasswordPool:
+    """Um pool por app, criado e encerrado no lifespan (app.state.password_pool)"""
+    return PasswordPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_LIMIT)
+
 
 class Auth():
-    def __init__(self):
+    def __init__(self, pool: Optional[PasswordPool] = None):
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.pool = pool
 
     def hash_senha(self, senha: str) -> str:
         return self.pwd_context.hash(senha)
 
     def verificar_senha(self, senha_plain: str, senha_hash: str) -> bool:
-        return self.pwd_context.verify(senha_plain, senha_hash)
\ No newline at end of file
+        return self.pwd_context.verify(senha_plain, senha_hash)
+
+    async def _run(self, fn, *args):
+        # Sem pool (uso fora do app, como scripts) o hash vai para o executor padrão do loop
+        if self.pool is None:
+            return await asyncio.to_thread(fn, *args)
+        return await self.pool.run(fn, *args)
+
+    @metrics.timed("bcrypt")
+    async def hash_senha_async(self, senha: str) -> str:
+        return await self._run(self.hash_senha, senha)
+
+    @metrics.timed("bcrypt")
+    async def verificar_senha_async(self, senha_plain: str, senha_hash: str) -> bool:
+        return await self._run(self.verificar_senha, senha_plain, senha_hash)
@@ -0,0 +1,116 @@
+import json
+import zlib
+from typing import Any, Callable, Optional
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+# Cabeçalho: byte mágico + versão do formato + serializador + compressão.
+# 0xC1 nunca aparece em UTF-8 válido, então o formato antigo (JSON em texto) segue legível.
+MAGIC = 0xC1
+VERSION = 1
+
+SERIALIZERS = {"json": 1, "msgpack": 2}
+COMPRESSIONS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+
+
+def _json_dumps(value: Any, default: Optional[Callable]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=default)
+    return json.dumps(value, default=default, separators=(",", ":")).encode("utf-8")
+
+def _json_loads(raw: bytes) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _compress(compression: str, raw: bytes) -> bytes:
+    if compression == "zlib":
+        return zlib.compress(raw, 1)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(raw)
+    if compression == "lz4":
+        return lz4_frame.compress(raw)
+    return raw
+
+def _decompress(compression_id: int, raw: bytes) -> bytes:
+    if compression_id == COMPRESSIONS["none"]:
+        return raw
+    if compression_id == COMPRESSIONS["zlib"]:
+        return zlib.decompress(raw)
+    if compression_id == COMPRESSIONS["zstd"] and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(raw)
+    if compression_id == COMPRESSIONS["lz4"] and lz4_frame is not None:
+        return lz4_frame.decompress(raw)
+    raise ValueError(f"Compressão {compression_id} não suportada neste worker")
+
+
+class CacheCodec:
+    """
+    Serialização dos valores gravados no Redis: JSON (orjson quando instalado) ou msgpack,
+    com compressão opcional acima de `min_compress_bytes`. O modo "legacy" grava JSON em texto
+    sem cabeçalho, para o deploy em que workers antigos ainda leem o cache.
+    A leitura aceita qualquer formato conhecido; entrada ilegível levanta ValueError (vira miss).
+    """
+
+    def __init__(self, serializer: str = "json", compression: str = "zlib", min_compress_bytes: int = 1024):
+        if serializer == "msgpack" and msgpack is None:
+            print("Pacote 'msgpack' não instalado: usando JSON no cache")
+            serializer = "json"
+        if (compression == "zstd" and zstandard is None) or (compression == "lz4" and lz4_frame is None):
+            print(f"Compressão '{compression}' indisponível: usando zlib no cache")
+            compression = "zlib"
+        self.serializer = serializer
+        self.compression = compression
+        self.min_compress_bytes = min_compress_bytes
+
+    def encode(self, value: Any, default: Optional[Callable] = None) -> bytes:
+        if self.serializer == "legacy":
+            return json.dumps(value, default=default).encode("utf-8")
+        if self.serializer == "msgpack":
+            raw = msgpack.packb(value, default=default, use_bin_type=True)
+        else:
+            raw = _json_dumps(value, default)
+
+        compression = self.compression if len(raw) >= self.min_compress_bytes else "none"
+        header = bytes((MAGIC, VERSION, SERIALIZERS[self.serializer], COMPRESSIONS[compression]))
+        return header + _compress(compression, raw)
+
+    def decode(self, raw: bytes | str) -> Any:
+        if isinstance(raw, str):
+            return json.loads(raw)
+        if len(raw) < 4 or raw[0] != MAGIC:
+            return _json_loads(raw)
+        if raw[1] != VERSION:
+            raise ValueError(f"Versão {raw[1]} do formato de cache desconhecida")
+
+        if raw[2] not in SERIALIZERS.values() or (raw[2] == SERIALIZERS["msgpack"] and msgpack is None):
+            raise ValueError(f"Serializador {raw[2]} não suportado neste worker")
+        try:
+            body = _decompress(raw[3], raw[4:])
+            return _json_loads(body) if raw[2] == SERIALIZERS["json"] else msgpack.unpackb(body, raw=False)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Entrada de cache corrompida: {e}") from e
+
+
+cache_codec = CacheCodec(settings.CACHE_CODEC, settings.CACHE_COMPRESSION, settings.CACHE_COMPRESSION_MIN_BYTES)
@@ -0,0 +1,195 @@
+import time
+from typing import Optional
+from redis.asyncio import Redis
+from app.core.config import settings
+from app.utils import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Valor do gauge circuit_breaker_state
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# KEYS[1] = hash de estado | ARGV: agora, segundos aberto, máximo de sondas, timeout das sondas
+# Retorna {estado, admitido, é sonda, mudou_em}
+ALLOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+local changed_at = tonumber(redis.call('HGET', KEYS[1], 'changed_at') or '0')
+if state == 'closed' then
+  return {'closed', 1, 0, tostring(changed_at)}
+end
+if state == 'open' then
+  if now - changed_at < tonumber(ARGV[2]) then
+    return {'open', 0, 0, tostring(changed_at)}
+  end
+  redis.call('HSET', KEYS[1], 'state', 'half_open', 'changed_at', ARGV[1], 'probes', 0, 'successes', 0)
+  changed_at = now
+end
+local probes = tonumber(redis.call('HGET', KEYS[1], 'probes') or '0')
+if probes >= tonumber(ARGV[3]) then
+  if now - changed_at < tonumber(ARGV[4]) then
+    return {'half_open', 0, 0, tostring(changed_at)}
+  end
+  -- sondas que nunca reportaram (worker caiu): libera novas
+  redis.call('HSET', KEYS[1], 'probes', 0, 'changed_at', ARGV[1])
+  changed_at = now
+end
+redis.call('HINCRBY', KEYS[1], 'probes', 1)
+return {'half_open', 1, 1, tostring(changed_at)}
+"""
+
+# KEYS[1] = hash de estado | ARGV: agora, sucesso, lenta, sonda, segundos por bucket, buckets na janela,
+# mínimo de chamadas, taxa de falhas, taxa de lentas, sucessos para fechar, prefixo das chaves da janela
+# Retorna {estado, mudou_em}
+RECORD_SCRIPT = """
+local now = tonumber(ARGV[1])
+local success = ARGV[2] == '1'
+local slow = ARGV[3] == '1'
+local bucket_seconds = tonumber(ARGV[5])
+local buckets = tonumber(ARGV[6])
+local bucket = math.floor(now / bucket_seconds)
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+local changed_at = redis.call('HGET', KEYS[1], 'changed_at') or '0'
+
+if state == 'half_open' then
+  if ARGV[4] == '1' then
+    redis.call('HINCRBY', KEYS[1], 'probes', -1)
+  end
+  if not success or slow then
+    redis.call('HSET', KEYS[1], 'state', 'open', 'changed_at', ARGV[1], 'probes', 0, 'successes', 0)
+    return {'open', ARGV[1]}
+  end
+  local successes = redis.call('HINCRBY', KEYS[1], 'successes', 1)
+  if successes >= tonumber(ARGV[10]) then
+    redis.call('HSET', KEYS[1], 'state', 'closed', 'changed_at', ARGV[1], 'probes', 0, 'successes', 0)
+    -- janela zerada: falhas de antes da queda não reabrem o circuito
+    for i = 0, buckets - 1 do
+      redis.call('DEL', ARGV[11] .. (bucket - i))
+    end
+    return {'closed', ARGV[1]}
+  end
+  return {'half_open', changed_at}
+end
+
+if state == 'open' then
+  return {'open', changed_at}
+end
+
+local key = ARGV[11] .. bucket
+redis.call('HINCRBY', key, 'total', 1)
+if not success then
+  redis.call('HINCRBY', key, 'failures', 1)
+end
+if slow then
+  redis.call('HINCRBY', key, 'slow', 1)
+end
+redis.call('EXPIRE', key, math.ceil(bucket_seconds * (buckets + 1)))
+
+local total, failures, slow_calls = 0, 0, 0
+for i = 0, buckets - 1 do
+  local values = redis.call('HMGET', ARGV[11] .. (bucket - i), 'total', 'failures', 'slow')
+  total = total + tonumber(values[1] or '0')
+  failures = failures + tonumber(values[2] or '0')
+  slow_calls = slow_calls + tonumber(values[3] or '0')
+end
+
+if total >= tonumber(ARGV[7]) and (failures / total >= tonumber(ARGV[8]) or slow_calls / total >= tonumber(ARGV[9])) then
+  redis.call('HSET', KEYS[1], 'state', 'open', 'changed_at', ARGV[1], 'probes', 0, 'successes', 0)
+  return {'open', ARGV[1]}
+end
+return {'closed', changed_at}
+"""
+
+
+def _text(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+class Permit:
+    """Autorização para uma chamada à SWAPI; probe indica uma sonda do estado half-open"""
+
+    def __init__(self, probe: bool = False):
+        self.probe = probe
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker distribuído (estado no Redis, transições atômicas via Lua) com janela deslizante
+    de taxa de erro e de chamadas lentas, e estado half-open que admite poucas sondas por vez.
+    O estado fica em cache local por alguns instantes para evitar um GET no Redis por requisição.
+    """
+
+    def __init__(self, redis: Redis, name: str = "swapi"):
+        self.redis = redis
+        self.name = name
+        self.state_key = f"circuit:{{{name}}}:state"
+        self.window_prefix = f"circuit:{{{name}}}:window:"
+        self.window_seconds = settings.CIRCUIT_WINDOW_SECONDS
+        self.bucket_seconds = 1
+        self.min_requests = settings.CIRCUIT_MIN_REQUESTS
+        self.failure_rate = settings.CIRCUIT_FAILURE_RATE
+        self.slow_call_seconds = settings.CIRCUIT_SLOW_CALL_SECONDS
+        self.slow_call_rate = settings.CIRCUIT_SLOW_CALL_RATE
+        self.open_seconds = settings.CIRCUIT_OPEN_SECONDS
+        self.half_open_probes = settings.CIRCUIT_HALF_OPEN_PROBES
+        self.probe_timeout = 30
+        self.local_refresh = settings.CIRCUIT_LOCAL_REFRESH
+        self.state = CLOSED
+        self.changed_at = 0.0
+        self._checked_at: Optional[float] = None
+
+    def _remember(self, state: str, changed_at: float):
+        if state == OPEN and self.state != OPEN:
+            print(f"CIRCUITO ABERTO para SWAPI")
+        self.state = state if state in (CLOSED, OPEN, HALF_OPEN) else CLOSED
+        metrics.BREAKER_STATE.set(STATE_VALUES[self.state], name=self.name)
+        self.changed_at = changed_at
+        self._checked_at = time.monotonic()
+
+    def _is_fresh(self) -> bool:
+        return self._checked_at is not None and time.monotonic() - self._checked_at < self.local_refresh
+
+    async def acquire(self) -> Optional[Permit]:
+        """Retorna uma Permit se a chamada pode seguir, ou None se o circuito está bloqueando"""
+        now = time.time()
+        if self._is_fresh():
+            if self.state == CLOSED:
+                return Permit()
+            if self.state == OPEN and now - self.changed_at < self.open_seconds:
+                return None
+
+        try:
+            result = await self.redis.eval(
+                ALLOW_SCRIPT, 1, self.state_key,
+                now, self.open_seconds, self.half_open_probes, self.probe_timeout
+            )
+            if not isinstance(result, (list, tuple)) or len(result) < 4:
+                raise ValueError(f"resposta inesperada do Redis: {result!r}")
+            state, admitted, probe, changed_at = _text(result[0]), int(result[1]), int(result[2]), float(_text(result[3]))
+        except Exception as e:
+            # Sem Redis o breaker decide só com o estado local (deixa passar se não estiver aberto)
+            print(f"Circuit breaker sem Redis: {e}")
+            self._checked_at = time.monotonic()
+            return None if self.state == OPEN else Permit()
+
+        self._remember(state, changed_at)
+        return Permit(probe=bool(probe)) if admitted else None
+
+    async def record(self, permit: Permit, success: bool, latency: float):
+        """Registra o resultado de uma chamada autorizada na janela deslizante"""
+        probe, permit.probe = permit.probe, False
+        try:
+            result = await self.redis.eval(
+                RECORD_SCRIPT, 1, self.state_key,
+                time.time(), int(success), int(latency >= self.slow_call_seconds), int(probe),
+                self.bucket_seconds, max(1, int(self.window_seconds / self.bucket_seconds)),
+                self.min_requests, self.failure_rate, self.slow_call_rate, self.half_open_probes,
+                self.window_prefix
+            )
+            if not isinstance(result, (list, tuple)) or len(result) < 2:
+                raise ValueError(f"resposta inesperada do Redis: {result!r}")
+            self._remember(_text(result[0]), float(_text(result[1])))
+        except Exception as e:
+            print(f"Circuit breaker sem Redis: {e}")
@@ -0,0 +1,45 @@
+import base64
+import hashlib
+import hmac
+import json
+from typing import Optional
+from app.core.config import settings
+
+
+class Cursor():
+    """Token opaco e assinado (HMAC) com os valores de ordenação do último documento da página"""
+
+    def __init__(self, secret: str = None):
+        secret = secret or settings.CURSOR_SECRET_KEY
+        if secret:
+            self.secret = secret.encode("utf-8")
+        else:
+            # Chave própria dos cursores: quem junta cursores não obtém MACs feitos com a chave dos JWTs
+            self.secret = hmac.new(settings.JWT_SECRET_KEY.encode("utf-8"), b"cursor", hashlib.sha256).digest()
+
+    @staticmethod
+    def _b64encode(raw: bytes) -> str:
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    @staticmethod
+    def _b64decode(value: str) -> bytes:
+        return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+    def _sign(self, payload: str, scope: str) -> str:
+        digest = hmac.new(self.secret, f"{scope}|{payload}".encode("utf-8"), hashlib.sha256).digest()
+        return self._b64encode(digest[:16])
+
+    def encode(self, values: dict, scope: str = "") -> str:
+        payload = self._b64encode(json.dumps(values, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+        return f"{payload}.{self._sign(payload, scope)}"
+
+    def decode(self, token: str, scope: str = "") -> Optional[dict]:
+        """Retorna os valores do cursor, ou None se o token foi alterado ou pertence a outra consulta"""
+        payload, _, signature = token.partition(".")
+        if not payload or not hmac.compare_digest(signature, self._sign(payload, scope)):
+            return None
+        try:
+            values = json.loads(self._b64decode(payload))
+        except ValueError:
+            return None
+        return values if isinstance(values, dict) else None
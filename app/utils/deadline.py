@@ -0,0 +1,51 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Instante (time.monotonic) em que o orçamento da requisição atual acaba; propaga para tasks filhas
+_deadline: ContextVar[Optional[float]] = ContextVar("swapi_deadline", default=None)
+
+# Abaixo disso não vale a pena começar (ou repetir) uma chamada à SWAPI
+MIN_ATTEMPT_SECONDS = 0.5
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """Define um prazo para o bloco; um prazo já existente e mais curto prevalece"""
+    if not seconds or seconds <= 0:
+        yield
+        return
+    current = _deadline.get()
+    candidate = time.monotonic() + seconds
+    token = _deadline.set(candidate if current is None else min(current, candidate))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Segundos restantes do orçamento atual, ou None quando não há prazo"""
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+def stop_when_out_of_budget(retry_state) -> bool:
+    """Condição de parada do tenacity: não tenta de novo sem orçamento para outra chamada"""
+    left = remaining()
+    return left is not None and left < MIN_ATTEMPT_SECONDS
+
+
+class wait_within_budget:
+    """Envolve uma estratégia de espera do tenacity para nunca dormir além do prazo"""
+
+    def __init__(self, wait):
+        self.wait = wait
+
+    def __call__(self, retry_state) -> float:
+        seconds = self.wait(retry_state)
+        left = remaining()
+        if left is None:
+            return seconds
+        return max(0.0, min(seconds, left - MIN_ATTEMPT_SECONDS))
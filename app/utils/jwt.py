@@ -1,7 +1,73 @@
 import jwt
+import hashlib
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
+from jwt.algorithms import get_default_algorithms
 from app.core.config import settings
 
+
+@lru_cache(maxsize=None)
+def _prepared_key(algorithm: str, key: str):
+    """Converte a chave PEM em objeto de chave uma única vez por processo"""
+    return get_default_algorithms()[algorithm].prepare_key(key)
+
+def _is_symmetric(algorithm: str) -> bool:
+    return algorithm.startswith("HS")
+
+def signing_key():
+    if _is_symmetric(settings.ALGORITHM):
+        return settings.JWT_SECRET_KEY
+    return _prepared_key(settings.ALGORITHM, settings.JWT_PRIVATE_KEY)
+
+def verification_key():
+    if _is_symmetric(settings.ALGORITHM):
+        return settings.JWT_SECRET_KEY
+    return _prepared_key(settings.ALGORITHM, settings.JWT_PUBLIC_KEY)
+
+
+class TokenVerifier:
+    """Cache LRU de tokens já validados, indexado pelo hash do token e respeitando o exp"""
+
+    def __init__(self, max_size: int = 10000, max_ttl: float = 300):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._cache: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        self._cache.clear()
+
+    def verify(self, token: str) -> dict:
+        """Decodifica e valida o token; levanta as exceções do PyJWT como jwt.decode"""
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        now = time.time()
+        entry = self._cache.get(digest)
+        if entry is not None:
+            payload, expires_at = entry
+            if expires_at > now:
+                self._cache.move_to_end(digest)
+                return payload
+            del self._cache[digest]
+            if payload.get("exp") is not None and payload["exp"] <= now:
+                raise jwt.ExpiredSignatureError("Signature has expired")
+
+        payload = jwt.decode(token, verification_key(), algorithms=[settings.ALGORITHM])
+        if self.max_size > 0:
+            # max_ttl limita o tempo em cache de tokens sem exp (ou após troca de chave)
+            expires_at = min(payload.get("exp", float("inf")), now + self.max_ttl)
+            self._cache[digest] = (payload, expires_at)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return payload
+
+
+token_verifier = TokenVerifier(max_size=settings.JWT_CACHE_SIZE)
+
+
 class Jwt():
     def __init__(self):
         self.days_validade_access = 7
@@ -11,17 +77,17 @@ class Jwt():
         to_encode = data.copy()
         expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=self.minutes_validade_access))
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
+        encoded_jwt = jwt.encode(to_encode, signing_key(), algorithm=settings.ALGORITHM)
         return encoded_jwt
-    
+
     def create_refresh_token(self, data: dict, expires_delta: timedelta = None):
         to_encode = data.copy()
-        expire = datetime.now(timezone.utc) + (expires_delta or timedelta(days=self.days_validade_access)) 
+        expire = datetime.now(timezone.utc) + (expires_delta or timedelta(days=self.days_validade_access))
         to_encode.update({"exp": expire})
-        return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
-    
+        return jwt.encode(to_encode, signing_key(), algorithm=settings.ALGORITHM)
+
     def verify_token(self, token: str):
         try:
-            return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM])
+            return token_verifier.verify(token)
         except jwt.PyJWTError:
-            return None
\ No newline at end of file
+            return None
@@ -0,0 +1,104 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+from redis.asyncio import Redis
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+
+class LocalCache:
+    """Cache L1 em memória do processo, limitado por tamanho (LRU) e por TTL.
+
+    Os valores são compartilhados entre requisições e devem ser tratados como somente leitura.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.instance_id = uuid.uuid4().hex
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def remaining(self, key: str) -> Optional[float]:
+        """Segundos até a entrada expirar, sem contar como hit/miss (None se ausente ou vencida)"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        left = entry[0] - time.monotonic()
+        return left if left > 0 else None
+
+    def invalidate(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+    def invalidation_message(self, key: str) -> str:
+        return f"{self.instance_id}:{key}"
+
+    def handle_invalidation(self, message: str):
+        origin, _, key = message.partition(":")
+        if origin != self.instance_id:
+            self.invalidate(key)
+
+
+async def listen_invalidations(redis: Redis, cache: LocalCache, retry_interval: float = 5):
+    """Mantém o L1 coerente entre workers escutando o canal de invalidação do Redis"""
+    while True:
+        try:
+            pubsub = redis.pubsub()
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            try:
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    cache.handle_invalidation(data.decode("utf-8") if isinstance(data, bytes) else data)
+            finally:
+                await pubsub.aclose()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Sem o canal não há como saber o que invalidar: descarta tudo e tenta de novo
+            cache.clear()
+            print(f"Invalidação do cache L1 indisponível: {e}")
+            await asyncio.sleep(retry_interval)
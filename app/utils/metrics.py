@@ -0,0 +1,242 @@
+import bisect
+import functools
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Optional
+from app.core.config import settings
+
+# Desligado (METRICS_ENABLED=false) cada ponto instrumentado custa só a leitura desta flag
+enabled = settings.METRICS_ENABLED
+
+# Limites (segundos) dos buckets dos histogramas de latência
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(labelnames: tuple[str, ...], labels: dict) -> tuple[str, ...]:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if not enabled:
+            return
+        key = _labels(self.labelnames, labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        if not enabled:
+            return
+        self.values[_labels(self.labelnames, labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        # Por combinação de labels: [contagem por bucket (não cumulativa), soma, total]
+        self.series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        if not enabled:
+            return
+        key = _labels(self.labelnames, labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="' + ("+Inf" if bound == float("inf") else _format_value(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    """Métricas do processo no formato texto do Prometheus (sem coletor externo; cada worker expõe as suas)"""
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Métrica {metric.name} já registrada")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota", ("method", "route", "status")
+)
+SPAN_SECONDS = registry.histogram(
+    "span_duration_seconds", "Tempo gasto em cada etapa instrumentada (redis, swapi, firestore, bcrypt...)", ("span",)
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "Leituras do cache por camada e resultado (hit ratio = hits / total)", ("cache", "result")
+)
+UPSTREAM_SECONDS = registry.histogram(
+    "swapi_request_duration_seconds", "Latência de cada chamada HTTP à SWAPI", ("status",)
+)
+UPSTREAM_RETRIES = registry.counter(
+    "swapi_retries_total", "Novas tentativas de chamadas à SWAPI", ("method",)
+)
+PASSWORD_QUEUE_WAIT_SECONDS = registry.histogram(
+    "password_hash_queue_wait_seconds", "Espera na fila do pool do bcrypt até uma thread começar o hash"
+)
+BREAKER_STATE = registry.gauge(
+    "circuit_breaker_state", "Estado do circuit breaker visto por este worker (0 fechado, 1 half-open, 2 aberto)", ("name",)
+)
+
+
+# Tempos da requisição atual: {etapa: [segundos somados, chamadas]}, lido pelo Server-Timing
+_request_timings: ContextVar[Optional[dict]] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> dict:
+    timings = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def record(name: str, seconds: float):
+    SPAN_SECONDS.observe(seconds, span=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.get(name)
+        if entry is None:
+            timings[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+_NOOP = nullcontext()
+
+
+def span(name: str):
+    """Mede o bloco `with` como a etapa `name` (Server-Timing da requisição + histograma)"""
+    return _Span(name) if enabled else _NOOP
+
+
+def timed(name: str):
+    """Decorator de span para corrotinas"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not enabled:
+                return await func(*args, **kwargs)
+            with _Span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_retry(retry_state):
+    """before_sleep do tenacity: conta cada nova tentativa pelo nome do método"""
+    UPSTREAM_RETRIES.inc(method=getattr(retry_state.fn, "__name__", "unknown"))
+
+
+def instrument_redis(redis):
+    """Mede todo comando (e todo pipeline) do cliente Redis como a etapa `redis`"""
+    execute_command = redis.execute_command
+    pipeline = redis.pipeline
+
+    async def timed_command(*args, **options):
+        with span("redis"):
+            return await execute_command(*args, **options)
+
+    def timed_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def timed_execute(*execute_args, **execute_kwargs):
+            with span("redis"):
+                return await execute(*execute_args, **execute_kwargs)
+
+        pipe.execute = timed_execute
+        return pipe
+
+    redis.execute_command = timed_command
+    redis.pipeline = timed_pipeline
+    return redis
@@ -0,0 +1,27 @@
+import json
+from typing import AsyncIterator, Iterable
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+# Falha fora de HTTPException (Firestore, bug): o motivo vai para o log, não para o cliente
+STREAM_ERROR_DETAIL = "Não foi possível enviar todos os itens."
+
+
+def error_line(detail, status_code: int) -> bytes:
+    return json.dumps({"error": detail, "status_code": status_code}).encode("utf-8") + b"\n"
+
+
+async def ndjson_stream(chunks: AsyncIterator[Iterable[dict]], model: type[BaseModel]) -> AsyncIterator[bytes]:
+    """
+    Uma linha JSON por item (validado por `model`), um pedaço por lote de `chunks`.
+    O próximo lote só é pedido depois que o anterior foi enviado ao cliente.
+    Como o 200 já foi enviado, uma falha no meio vira a última linha: {"error": ..., "status_code": ...}.
+    """
+    try:
+        async for items in chunks:
+            yield b"".join(model.model_validate(item).model_dump_json(by_alias=True).encode("utf-8") + b"\n" for item in items)
+    except HTTPException as e:
+        yield error_line(e.detail, e.status_code)
+    except Exception as e:
+        print(f"Falha no meio do stream NDJSON: {e}")
+        yield error_line(STREAM_ERROR_DETAIL, 500)
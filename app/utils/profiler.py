@@ -0,0 +1,216 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Optional
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def fold_frame(frame) -> str:
+    """Pilha de uma thread no formato "collapsed" do flamegraph: raiz;...;folha"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def fold_await_chain(coro) -> str:
+    """Cadeia de awaits de uma corrotina suspensa (onde a requisição está esperando), da raiz à folha"""
+    names = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        names.append(_frame_name(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "ag_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return ";".join(names)
+
+
+def collapsed(stacks: Counter, root: Optional[str] = None) -> str:
+    """Uma linha "pilha contagem" por pilha, entrada do flamegraph.pl, speedscope e afins"""
+    prefix = f"{root};" if root else ""
+    return "".join(f"{prefix}{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class SamplingProfiler:
+    """
+    Profiler estatístico: uma thread lê a pilha de todas as threads (sys._current_frames) a cada
+    `interval` segundos durante uma janela de tempo. Não instrumenta as chamadas, então o custo
+    é o da amostragem e não cresce com o volume de requisições. Uma sessão por vez.
+    """
+
+    def __init__(self, max_seconds: float = 300):
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.interval = 0.01
+        self.started_at: Optional[float] = None
+        self.ends_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval: float = 0.01):
+        if self.running:
+            raise RuntimeError("Já existe uma sessão do profiler em andamento")
+        seconds = min(seconds, self.max_seconds)
+        self.stacks = Counter()
+        self.samples = 0
+        self.interval = interval
+        self.started_at = time.time()
+        self.ends_at = time.monotonic() + seconds
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval) and time.monotonic() < self.ends_at:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self.stacks[f"{names.get(ident, ident)};{fold_frame(frame)}"] += 1
+            self.samples += 1
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "seconds_left": max(0.0, self.ends_at - time.monotonic()) if self.running else 0.0,
+            "interval": self.interval,
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+        }
+
+    def collapsed(self) -> str:
+        return collapsed(self.stacks)
+
+
+class LoopMonitor:
+    """
+    Captura automática de travamentos do event loop e de requisições lentas.
+
+    Uma tarefa no loop marca um batimento a cada `interval`. Se o batimento atrasa mais que
+    `stall_threshold`, o loop está preso em código síncrono (bcrypt fora do pool, um json.loads enorme...)
+    e uma thread de vigia amostra a pilha da thread do loop enquanto durar o travamento.
+    A cada batimento, as requisições em andamento há mais de `slow_request_threshold` têm a cadeia
+    de awaits amostrada, mostrando onde cada uma está esperando. As últimas `max_captures` ficam guardadas.
+    """
+
+    def __init__(self, stall_threshold: float = 0.2, slow_request_threshold: float = 1.0, interval: float = 0.05, max_captures: int = 50):
+        self.stall_threshold = stall_threshold
+        self.slow_request_threshold = slow_request_threshold
+        self.interval = interval
+        self.stalls: deque = deque(maxlen=max_captures)
+        self.slow_requests: deque = deque(maxlen=max_captures)
+        self.inflight: dict[int, dict] = {}
+        self.beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self):
+        self._loop_thread = threading.get_ident()
+        self.beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        if self.stall_threshold > 0:
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+
+    async def _heartbeat(self):
+        while True:
+            self.beat = time.monotonic()
+            if self.slow_request_threshold > 0:
+                self._sample_slow_requests()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self):
+        stall = None
+        while not self._stop.wait(self.interval):
+            beat = self.beat
+            # O batimento normal atrasa até `interval`; o que passar disso + o limite é travamento
+            if time.monotonic() - beat > self.interval + self.stall_threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if stall is None or stall["beat"] != beat:
+                    stall = {"beat": beat, "at": time.time(), "stacks": Counter()}
+                if frame is not None:
+                    stall["stacks"][fold_frame(frame)] += 1
+            elif stall is not None:
+                self.stalls.append({
+                    "at": stall["at"],
+                    "duration_ms": round(max(0.0, self.beat - stall["beat"] - self.interval) * 1000, 1),
+                    "stacks": stall["stacks"],
+                })
+                stall = None
+
+    def _sample_slow_requests(self):
+        now = time.monotonic()
+        for request in list(self.inflight.values()):
+            if now - request["started"] > self.slow_request_threshold and not request["task"].done():
+                stack = fold_await_chain(request["task"].get_coro())
+                if stack:
+                    request["stacks"][stack] += 1
+
+    def request_started(self, method: str, path: str) -> Optional[int]:
+        task = asyncio.current_task()
+        if task is None or self.slow_request_threshold <= 0:
+            return None
+        key = id(task)
+        self.inflight[key] = {
+            "task": task, "method": method, "path": path,
+            "started": time.monotonic(), "at": time.time(), "stacks": Counter(),
+        }
+        return key
+
+    def request_finished(self, key: Optional[int], status: int, route: Optional[str] = None):
+        request = self.inflight.pop(key, None) if key is not None else None
+        if request is None:
+            return
+        duration = time.monotonic() - request["started"]
+        if duration > self.slow_request_threshold:
+            self.slow_requests.append({
+                "at": request["at"], "method": request["method"], "path": request["path"], "route": route,
+                "status": status, "duration_ms": round(duration * 1000, 1), "stacks": request["stacks"],
+            })
+
+    def report(self, kind: str) -> list[dict]:
+        captures = self.stalls if kind == "stalls" else self.slow_requests
+        return [
+            {**{key: value for key, value in capture.items() if key != "stacks"},
+             "samples": sum(capture["stacks"].values()),
+             "top_stacks": [{"stack": stack, "count": count} for stack, count in capture["stacks"].most_common(5)]}
+            for capture in captures
+        ]
+
+    def collapsed(self, kind: str) -> str:
+        """Todas as capturas num arquivo só; a raiz de cada pilha identifica a captura"""
+        if kind == "stalls":
+            return "".join(collapsed(capture["stacks"], "loop-stall") for capture in self.stalls)
+        return "".join(
+            collapsed(capture["stacks"], f"{capture['method']} {capture['route'] or capture['path']}")
+            for capture in self.slow_requests
+        )
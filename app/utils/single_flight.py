@@ -0,0 +1,25 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """Agrupa chamadas concorrentes pela mesma chave em uma única execução (request coalescing)"""
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # shield: o cancelamento de um chamador não derruba a busca dos demais
+        return await asyncio.shield(task)
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+from redis.asyncio import Redis
+
+# KEYS[1] = hash do balde | ARGV: tokens por segundo, capacidade
+# Retorna quantos segundos esperar (string, "0" quando o token foi concedido)
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or burst
+local ts = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class AdaptiveLimiter:
+    """
+    Limite de concorrência AIMD guiado pela latência: cresce +1 a cada `limit` respostas rápidas
+    e cai multiplicativamente quando a latência passa de `tolerance` vezes a linha de base
+    (menor latência recente) ou a SWAPI responde 429/5xx/timeout.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, tolerance: float = 2.0, backoff: float = 0.9):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.limit = float(max(self.min_limit, self.max_limit // 2))
+        self.inflight = 0
+        self.baseline: Optional[float] = None
+        self.samples: deque[float] = deque(maxlen=200) # latências recentes, base do p95 dos hedges
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.inflight < int(self.limit))
+            self.inflight += 1
+
+    async def release(self, latency: Optional[float], overloaded: bool = False):
+        """Devolve a vaga; `latency=None` (chamada abandonada, sem resposta da SWAPI) não mexe no limite"""
+        async with self._condition:
+            self.inflight -= 1
+            if latency is not None:
+                self._update(latency, overloaded)
+            self._condition.notify_all()
+
+    def _update(self, latency: float, overloaded: bool):
+        if not overloaded:
+            self.samples.append(latency)
+            # A linha de base desce na hora e sobe devagar, acompanhando mudanças reais da SWAPI
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                self.baseline += (latency - self.baseline) * 0.01
+
+        if overloaded or latency > self.baseline * self.tolerance:
+            self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+    def saturated(self) -> bool:
+        return self.inflight >= int(self.limit)
+
+    def percentile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        """Quantil q das latências recentes, ou None enquanto há poucas amostras"""
+        if len(self.samples) < min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "inflight": self.inflight,
+            "baseline_seconds": self.baseline,
+            "p95_seconds": self.percentile(0.95),
+        }
+
+
+class TokenBucket:
+    """Token bucket no Redis: limita as chamadas por segundo somando todos os workers"""
+
+    def __init__(self, redis: Redis, rate: float, burst: int, name: str = "swapi"):
+        self.redis = redis
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.key = f"ratelimit:{{{name}}}:bucket"
+
+    async def acquire(self):
+        while True:
+            try:
+                wait = float(await self.redis.eval(TOKEN_BUCKET_SCRIPT, 1, self.key, self.rate, self.burst))
+            except Exception as e:
+                # Sem Redis não há coordenação entre workers: segue só com o limite local
+                print(f"Token bucket sem Redis: {e}")
+                return
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
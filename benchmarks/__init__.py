@@ -0,0 +1,4 @@
+"""
+Benchmarks da API: carga HTTP contra uma SWAPI falsa local (benchmarks.load)
+e micro-benchmarks das partes quentes do service (benchmarks.micro).
+"""
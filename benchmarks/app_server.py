@@ -0,0 +1,57 @@
+"""
+Sobe app.main:app para os benchmarks. Opcionalmente troca o Redis por fakeredis (BENCH_FAKE_REDIS=1)
+e o Firestore pelo stand-in em memória (BENCH_MEMORY_FIRESTORE=1); o resto da aplicação roda sem alteração.
+
+    BENCH_FAKE_REDIS=1 BENCH_MEMORY_FIRESTORE=1 python -m benchmarks.app_server --port 9000
+"""
+import argparse
+import os
+from contextlib import asynccontextmanager
+
+
+def _use_fake_redis():
+    try:
+        import fakeredis
+    except ImportError:
+        raise SystemExit("BENCH_FAKE_REDIS=1 requer o pacote fakeredis (pip install fakeredis lupa)")
+    from redis.asyncio import Redis
+
+    server = fakeredis.FakeServer()
+    Redis.from_url = classmethod(lambda cls, url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs))
+
+
+def _use_memory_firestore(app):
+    from benchmarks.memory_firestore import MemoryFirestore
+
+    original = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with original(app):
+            app.state.db = MemoryFirestore()
+            yield
+
+    app.router.lifespan_context = lifespan
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Sobe a API para os benchmarks")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+
+    memory_firestore = os.getenv("BENCH_MEMORY_FIRESTORE") == "1"
+    if memory_firestore:
+        # O AsyncClient criado no lifespan não chega a ser usado; o emulador fictício só evita buscar credenciais
+        os.environ.setdefault("FIRESTORE_EMULATOR_HOST", "127.0.0.1:1")
+    if os.getenv("BENCH_FAKE_REDIS") == "1":
+        _use_fake_redis()
+
+    import uvicorn
+    from app.main import app
+    if memory_firestore:
+        _use_memory_firestore(app)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,172 @@
+"""
+SWAPI falsa para benchmarks: serve um snapshot gravado (python -m app.services.swapi_snapshot)
+ou um dataset sintético determinístico, com latência e erros injetáveis e contagem de chamadas.
+
+    python -m benchmarks.fake_swapi --port 9100 --latency-ms 80 --jitter-ms 40 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+from collections import Counter
+from typing import Optional
+from fastapi import HTTPException
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from app.services.swapi_snapshot import SwapiSnapshot
+
+# Tamanho de cada recurso na SWAPI real
+SIZES = {"people": 82, "films": 6, "planets": 60, "species": 37, "starships": 36, "vehicles": 39}
+STAMP = "2014-12-10T16:16:29.192000Z"
+
+
+def synthetic_snapshot(base_url: str, seed: int = 42) -> SwapiSnapshot:
+    """Dataset com o formato e os relacionamentos da SWAPI, sempre igual para a mesma semente"""
+    rng = random.Random(seed)
+    url = lambda resource, i: f"{base_url}/{resource}/{i}/"
+    urls = {resource: [url(resource, i) for i in range(1, size + 1)] for resource, size in SIZES.items()}
+    sample = lambda resource, low, high: rng.sample(urls[resource], rng.randint(low, min(high, len(urls[resource]))))
+    common = lambda resource, i: {"created": STAMP, "edited": STAMP, "url": url(resource, i)}
+    craft = lambda resource, i, kind: {
+        "name": f"{kind} {i}", "model": f"Model {i}", "manufacturer": "Kuat Drive Yards",
+        "cost_in_credits": str(rng.randint(10_000, 10_000_000)), "length": str(rng.randint(5, 2000)),
+        "max_atmosphering_speed": str(rng.randint(300, 1200)), "crew": str(rng.randint(1, 50)),
+        "passengers": str(rng.randint(0, 600)), "cargo_capacity": str(rng.randint(50, 100_000)),
+        "consumables": "2 months", "pilots": sample("people", 0, 4), "films": sample("films", 1, 3),
+        **common(resource, i),
+    }
+
+    resources = {
+        "films": [{
+            "title": f"Episode {i}", "episode_id": i, "opening_crawl": "It is a period of civil war. " * 20,
+            "director": "George Lucas", "producer": "Gary Kurtz, Rick McCallum", "release_date": f"19{70 + i}-05-25",
+            "characters": sample("people", 15, 40), "planets": sample("planets", 3, 13),
+            "starships": sample("starships", 5, 15), "vehicles": sample("vehicles", 4, 12),
+            "species": sample("species", 5, 15), **common("films", i),
+        } for i in range(1, SIZES["films"] + 1)],
+        "people": [{
+            "name": f"Person {i}", "height": str(rng.randint(60, 230)), "mass": str(rng.randint(20, 150)),
+            "hair_color": "brown", "skin_color": "fair", "eye_color": "blue", "birth_year": f"{rng.randint(8, 900)}BBY",
+            "gender": rng.choice(["male", "female", "n/a"]), "homeworld": rng.choice(urls["planets"]),
+            "films": sample("films", 1, 4), "species": sample("species", 0, 1),
+            "vehicles": sample("vehicles", 0, 2), "starships": sample("starships", 0, 3), **common("people", i),
+        } for i in range(1, SIZES["people"] + 1)],
+        "planets": [{
+            "name": f"Planet {i}", "rotation_period": "24", "orbital_period": "364", "diameter": str(rng.randint(0, 20000)),
+            "climate": "temperate", "gravity": "1 standard", "terrain": "grasslands, mountains", "surface_water": "40",
+            "population": str(rng.randint(0, 10**9)), "residents": sample("people", 0, 10), "films": sample("films", 0, 3),
+            **common("planets", i),
+        } for i in range(1, SIZES["planets"] + 1)],
+        "species": [{
+            "name": f"Species {i}", "classification": "mammal", "designation": "sentient", "average_height": "180",
+            "skin_colors": "caucasian, black", "hair_colors": "blonde, brown", "eye_colors": "brown, blue",
+            "average_lifespan": "120", "language": "Galactic Basic", "homeworld": rng.choice(urls["planets"]),
+            "people": sample("people", 1, 8), "films": sample("films", 1, 3), **common("species", i),
+        } for i in range(1, SIZES["species"] + 1)],
+        "starships": [
+            {**craft("starships", i, "Starship"), "hyperdrive_rating": "1.0", "MGLT": "60", "starship_class": "Starfighter"}
+            for i in range(1, SIZES["starships"] + 1)
+        ],
+        "vehicles": [
+            {**craft("vehicles", i, "Vehicle"), "vehicle_class": "wheeled"}
+            for i in range(1, SIZES["vehicles"] + 1)
+        ],
+    }
+    return SwapiSnapshot(resources, base_url=base_url)
+
+
+def recorded_snapshot(path: str, base_url: str) -> SwapiSnapshot:
+    """Snapshot gravado da SWAPI real, com as URLs reescritas para a SWAPI falsa"""
+    recorded = SwapiSnapshot.load(path)
+    resources = json.loads(json.dumps(recorded.resources).replace(recorded.base_url, base_url))
+    return SwapiSnapshot(resources, base_url=base_url)
+
+
+class FakeSwapi:
+    def __init__(self, snapshot: SwapiSnapshot, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0, seed: int = 42):
+        self.snapshot = snapshot
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.inflight = 0
+        self.max_inflight = 0
+        self.app = Starlette(routes=[
+            Route("/api/{resource}/", self.listing),
+            Route("/api/{resource}", self.listing),
+            Route("/api/{resource}/{id}/", self.detail),
+            Route("/api/{resource}/{id}", self.detail),
+            Route("/__stats", self.stats),
+            Route("/__reset", self.reset, methods=["POST"]),
+        ])
+
+    async def _respond(self, request: Request, kind: str, load) -> Response:
+        self.calls[kind] += 1
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            await asyncio.sleep(max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)))
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.calls["errors"] += 1
+                return JSONResponse({"detail": "Injected failure"}, status_code=503)
+            try:
+                body = json.dumps(load(), separators=(",", ":")).encode("utf-8")
+            except HTTPException as e:
+                return JSONResponse({"detail": "Not found"}, status_code=e.status_code)
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if request.headers.get("if-none-match") == etag:
+                self.calls["not_modified"] += 1
+                return Response(status_code=304, headers={"ETag": etag})
+            return Response(body, media_type="application/json", headers={"ETag": etag})
+        finally:
+            self.inflight -= 1
+
+    async def listing(self, request: Request) -> Response:
+        resource = request.path_params["resource"]
+        page = request.query_params.get("page")
+        return await self._respond(request, "list", lambda: self.snapshot.list_page(
+            resource, name=request.query_params.get("search"), page=int(page) if page else None
+        ))
+
+    async def detail(self, request: Request) -> Response:
+        resource, id = request.path_params["resource"], request.path_params["id"]
+        return await self._respond(request, "detail", lambda: self.snapshot.detail(resource, id))
+
+    async def stats(self, request: Request) -> Response:
+        total = sum(count for kind, count in self.calls.items() if kind in ("list", "detail"))
+        return JSONResponse({"calls": total, **self.calls, "max_inflight": self.max_inflight})
+
+    async def reset(self, request: Request) -> Response:
+        self.calls.clear()
+        self.max_inflight = 0
+        return JSONResponse({"ok": True})
+
+
+def build_app(port: int, snapshot_path: Optional[str] = None, latency_ms: float = 0, jitter_ms: float = 0,
+              error_rate: float = 0, seed: int = 42) -> Starlette:
+    base_url = f"http://127.0.0.1:{port}/api"
+    snapshot = recorded_snapshot(snapshot_path, base_url) if snapshot_path else synthetic_snapshot(base_url, seed)
+    return FakeSwapi(snapshot, latency_ms, jitter_ms, error_rate, seed).app
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="SWAPI falsa para benchmarks")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--snapshot", help="Snapshot gravado (.json.gz); sem ele usa o dataset sintético")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    import uvicorn
+    app = build_app(args.port, args.snapshot, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    _main()
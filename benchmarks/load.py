@@ -0,0 +1,249 @@
+"""
+Teste de carga reprodutível: sobe a SWAPI falsa e a API (cada uma no seu processo), prepara usuário
+e favoritos e dispara cargas fixas (semente) contra /sw/*, /sw/details/*, /favorite/* e /auth/*.
+Reporta RPS, p50/p95/p99, erros e quantas chamadas chegaram à SWAPI em cada carga.
+
+    python -m benchmarks.load --requests 2000 --concurrency 50 --latency-ms 80 --fake-redis
+    python -m benchmarks.load --workloads sw-details,favorites --json resultado.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+import httpx
+from benchmarks.fake_swapi import SIZES
+
+RESOURCES = list(SIZES)
+PASSWORD = "Bench@12345"
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Workload:
+    """Sequência de requisições gerada a partir da semente: a mesma em toda execução"""
+
+    def __init__(self, name: str, make_request: Callable[[random.Random], tuple[str, str, dict]]):
+        self.name = name
+        self.make_request = make_request
+
+    def requests(self, count: int, seed: int) -> list[tuple[str, str, dict]]:
+        rng = random.Random(f"{self.name}:{seed}")
+        return [self.make_request(rng) for _ in range(count)]
+
+
+def build_workloads(token: str, refresh_token: str, email: str) -> dict[str, Workload]:
+    auth = {"Authorization": f"Bearer {token}"}
+
+    def sw_list(rng):
+        resource = rng.choice(RESOURCES)
+        pages = -(-SIZES[resource] // 10)
+        if rng.random() < 0.2:
+            return "GET", f"/sw/{resource}", {"params": {"search": rng.choice(["1", "2", "Per", "Sta", "Ve"])}}
+        return "GET", f"/sw/{resource}", {"params": {"page": rng.randint(1, pages)}}
+
+    def sw_details(rng):
+        # Poucos filmes com muitos aninhados + cauda longa de pessoas/naves
+        resource = rng.choices(RESOURCES, weights=[5, 3, 2, 1, 2, 1])[0]
+        return "GET", f"/sw/details/{resource}/{rng.randint(1, SIZES[resource])}", {}
+
+    def sw_batch(rng):
+        items = [{"resource": (r := rng.choice(RESOURCES)), "id": str(rng.randint(1, SIZES[r]))} for _ in range(20)]
+        return "POST", "/sw/details/batch", {"json": {"items": items}}
+
+    def favorites(rng):
+        params = {"limit": rng.choice([10, 20, 50])}
+        if rng.random() < 0.5:
+            params["expand"] = "details"
+        if rng.random() < 0.3:
+            params["resource"] = rng.choice(RESOURCES)
+        return "GET", "/favorite/", {"params": params, "headers": auth}
+
+    def favorites_export(rng):
+        params = {"resource": rng.choice(RESOURCES)} if rng.random() < 0.3 else {}
+        return "GET", "/favorite/export", {"params": params, "headers": auth}
+
+    def auth_flow(rng):
+        if rng.random() < 0.5:
+            return "POST", "/auth/login", {"json": {"email": email, "password": PASSWORD}}
+        return "POST", "/auth/refresh-token", {"json": {"refresh_token": refresh_token}}
+
+    return {
+        "sw-list": Workload("sw-list", sw_list),
+        "sw-details": Workload("sw-details", sw_details),
+        "sw-batch": Workload("sw-batch", sw_batch),
+        "favorites": Workload("favorites", favorites),
+        "favorites-export": Workload("favorites-export", favorites_export),
+        "auth": Workload("auth", auth_flow),
+    }
+
+
+async def run_workload(client: httpx.AsyncClient, requests: list, concurrency: int) -> dict:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    queue = iter(requests)
+
+    async def worker():
+        for method, path, kwargs in queue:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    errors = sum(count for status, count in statuses.items() if status == 0 or status >= 400)
+    return {
+        "requests": len(requests),
+        "errors": errors,
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(requests) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"Processo encerrou antes de responder em {url}")
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise SystemExit(f"Tempo esgotado esperando {url}")
+
+
+async def prepare_user(client: httpx.AsyncClient, favorites: int) -> tuple[str, str, str]:
+    """Registra um usuário novo e cria favoritos; retorna (access_token, refresh_token, email)"""
+    email = f"bench-{int(time.time() * 1000)}@example.com"
+    created_at = datetime.now(timezone.utc).isoformat()
+    response = await client.post("/auth/register", json={"email": email, "password": PASSWORD, "created_at": created_at})
+    response.raise_for_status()
+    response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    tokens = response.json()
+
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    rng = random.Random("favorites")
+    for _ in range(favorites):
+        resource = rng.choice(RESOURCES)
+        sw_id = str(rng.randint(1, SIZES[resource]))
+        payload = {"sw_id": sw_id, "resource": resource, "url": f"https://swapi.dev/api/{resource}/{sw_id}/", "name": f"{resource} {sw_id}"}
+        (await client.post("/favorite/", json=payload, headers=headers)).raise_for_status()
+    return tokens["access_token"], tokens["refresh_token"], email
+
+
+def print_table(results: dict[str, dict]):
+    header = f"{'carga':<16} {'reqs':>6} {'erros':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'swapi':>7}"
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        print(
+            f"{name:<16} {result['requests']:>6} {result['errors']:>6} {result['rps']:>8} "
+            f"{result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9} {result['upstream_calls']:>7}"
+        )
+
+
+def start_process(module: str, args: list[str], env: dict) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", module, *args], env=env)
+
+
+async def main(args):
+    env = {
+        **os.environ,
+        "SWAPI_BASE": f"http://127.0.0.1:{args.swapi_port}/api",
+        "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])),
+    }
+    env.setdefault("DATABASE_URL", "unused")
+    env.setdefault("REDIS", "redis://127.0.0.1:6379")
+    env.setdefault("JWT_SECRET_KEY", "bench-secret")
+    if args.fake_redis:
+        env["BENCH_FAKE_REDIS"] = "1"
+    if not env.get("FIRESTORE_EMULATOR_HOST"):
+        env["BENCH_MEMORY_FIRESTORE"] = "1"
+
+    swapi_args = [
+        "--port", str(args.swapi_port), "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate), "--seed", str(args.seed),
+    ] + (["--snapshot", args.snapshot] if args.snapshot else [])
+    processes = [
+        start_process("benchmarks.fake_swapi", swapi_args, env),
+        start_process("benchmarks.app_server", ["--port", str(args.app_port)], env),
+    ]
+    swapi_url = f"http://127.0.0.1:{args.swapi_port}"
+    try:
+        await wait_ready(f"{swapi_url}/__stats", processes[0])
+        await wait_ready(f"http://127.0.0.1:{args.app_port}/health", processes[1])
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.app_port}", limits=limits, timeout=60) as client, \
+                   httpx.AsyncClient(base_url=swapi_url) as swapi:
+            token, refresh_token, email = await prepare_user(client, args.favorites)
+            workloads = build_workloads(token, refresh_token, email)
+
+            results = {}
+            for name in args.workloads.split(","):
+                workload = workloads[name]
+                if args.warmup:
+                    await run_workload(client, workload.requests(args.warmup, args.seed + 1), args.concurrency)
+                await swapi.post("/__reset")
+                result = await run_workload(client, workload.requests(args.requests, args.seed), args.concurrency)
+                stats = (await swapi.get("/__stats")).json()
+                result["upstream_calls"] = stats["calls"]
+                result["upstream_max_inflight"] = stats["max_inflight"]
+                results[name] = result
+
+        print_table(results)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"args": vars(args), "results": results}, f, indent=2)
+            print(f"Resultados salvos em {args.json}")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+def parse_args(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Teste de carga da API contra uma SWAPI falsa local")
+    parser.add_argument("--workloads", default="sw-list,sw-details,sw-batch,favorites,favorites-export,auth")
+    parser.add_argument("--requests", type=int, default=1000, help="Requisições medidas por carga")
+    parser.add_argument("--warmup", type=int, default=0, help="Requisições de aquecimento (não medidas) por carga")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--favorites", type=int, default=30, help="Favoritos criados para o usuário do teste")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=50, help="Latência injetada na SWAPI falsa")
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0, help="Fração de respostas 503 da SWAPI falsa")
+    parser.add_argument("--snapshot", help="Snapshot gravado da SWAPI; sem ele usa o dataset sintético")
+    parser.add_argument("--fake-redis", action="store_true", help="Usa fakeredis em vez de um Redis local")
+    parser.add_argument("--app-port", type=int, default=9000)
+    parser.add_argument("--swapi-port", type=int, default=9100)
+    parser.add_argument("--json", help="Arquivo para salvar os resultados (para comparar execuções)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
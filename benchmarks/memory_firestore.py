@@ -0,0 +1,98 @@
+"""
+Firestore em memória para os benchmarks quando o emulador (docker compose up firestore) não está no ar.
+Cobre só o que o FirestoreRepository usa: documentos, add, where ==, order_by __name__, start_after e limit.
+"""
+import uuid
+from typing import Any, Optional
+
+
+class MemorySnapshot:
+    def __init__(self, id: str, data: Optional[dict]):
+        self.id = id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self) -> Optional[dict]:
+        return dict(self._data) if self._data is not None else None
+
+
+class MemoryDocument:
+    def __init__(self, store: dict, id: str):
+        self.store = store
+        self.id = id
+
+    async def get(self) -> MemorySnapshot:
+        return MemorySnapshot(self.id, self.store.get(self.id))
+
+    async def set(self, data: dict, merge: bool = False):
+        self.store[self.id] = {**self.store.get(self.id, {}), **data} if merge else dict(data)
+
+    async def update(self, data: dict):
+        if self.id not in self.store:
+            raise KeyError(f"Documento {self.id} não existe")
+        self.store[self.id].update(data)
+
+    async def delete(self):
+        self.store.pop(self.id, None)
+
+
+class MemoryQuery:
+    def __init__(self, store: dict, filters: tuple = (), after: Optional[str] = None, max_items: Optional[int] = None):
+        self.store = store
+        self.filters = filters
+        self.after = after
+        self.max_items = max_items
+
+    def where(self, field: str, op: str, value: Any) -> "MemoryQuery":
+        if op != "==":
+            raise NotImplementedError(f"Operador {op} não suportado no Firestore em memória")
+        return MemoryQuery(self.store, self.filters + ((field, value),), self.after, self.max_items)
+
+    def order_by(self, field: str) -> "MemoryQuery":
+        return self # os documentos já saem ordenados pelo ID
+
+    def start_after(self, values: dict) -> "MemoryQuery":
+        return MemoryQuery(self.store, self.filters, values["__name__"], self.max_items)
+
+    def limit(self, count: int) -> "MemoryQuery":
+        return MemoryQuery(self.store, self.filters, self.after, count)
+
+    def _matches(self) -> list[MemorySnapshot]:
+        docs = []
+        for id in sorted(self.store):
+            if self.after is not None and id <= self.after:
+                continue
+            data = self.store[id]
+            if all(data.get(field) == value for field, value in self.filters):
+                docs.append(MemorySnapshot(id, data))
+                if self.max_items is not None and len(docs) >= self.max_items:
+                    break
+        return docs
+
+    async def get(self) -> list[MemorySnapshot]:
+        return self._matches()
+
+    async def stream(self):
+        for doc in self._matches():
+            yield doc
+
+
+class MemoryCollection(MemoryQuery):
+    def document(self, id: str) -> MemoryDocument:
+        return MemoryDocument(self.store, id)
+
+    async def add(self, data: dict):
+        document = MemoryDocument(self.store, uuid.uuid4().hex[:20])
+        await document.set(data)
+        return None, document
+
+
+class MemoryFirestore:
+    def __init__(self):
+        self.collections: dict[str, dict] = {}
+
+    def collection(self, name: str) -> MemoryCollection:
+        return MemoryCollection(self.collections.setdefault(name, {}))
+
+    async def close(self):
+        pass
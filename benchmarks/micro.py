@@ -0,0 +1,175 @@
+"""
+Micro-benchmarks das partes quentes do StarWarsService, sem rede: limpeza de páginas, troca de URLs
+aninhadas por nomes, codec do cache e validação dos detalhes. Usa o dataset sintético da SWAPI falsa
+e um Redis em memória, então mede só o custo de CPU de cada etapa.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --number 2000 --json micro.json
+"""
+import argparse
+import asyncio
+import copy
+import json
+import time
+from typing import Callable
+from pydantic import TypeAdapter
+from app.core.config import settings
+from app.schemas.sw.sw import SWAnyDetailsRead, DETAILS_MODELS
+from app.schemas.sw.sw_resouce import SWResource
+from app.services.starwars_service import StarWarsService
+from app.utils.cache_codec import CacheCodec
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.local_cache import LocalCache
+from benchmarks.fake_swapi import synthetic_snapshot
+
+
+class MemoryRedis:
+    """Só o que _resolve_names usa: MGET e pipeline de SET"""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+
+    async def mget(self, keys: list[str]):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction: bool = True):
+        return MemoryPipeline(self)
+
+
+class MemoryPipeline:
+    def __init__(self, redis: MemoryRedis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key: str, value, ex=None):
+        self.commands.append((key, value))
+
+    async def execute(self):
+        for key, value in self.commands:
+            self.redis.data[key] = value.encode("utf-8") if isinstance(value, str) else value
+        self.commands = []
+
+
+def measure(func: Callable, number: int, repeat: int = 5) -> float:
+    """Melhor média (µs por chamada) entre `repeat` rodadas de `number` chamadas"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best * 1_000_000
+
+
+def measure_async(loop: asyncio.AbstractEventLoop, make_coro: Callable, number: int, repeat: int = 5) -> float:
+    async def run():
+        for _ in range(number):
+            await make_coro()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        loop.run_until_complete(run())
+        best = min(best, (time.perf_counter() - started) / number)
+    return best * 1_000_000
+
+
+def bench_service(number: int) -> dict[str, float]:
+    snapshot = synthetic_snapshot(settings.SWAPI_BASE)
+    redis = MemoryRedis()
+    # Nomes de todos os recursos já no "Redis": o benchmark mede só a CPU, sem chamadas à SWAPI
+    for items in snapshot.resources.values():
+        for item in items:
+            redis.data[f"resource:{item['url']}"] = snapshot.display_name(item).encode("utf-8")
+    service = StarWarsService(None, redis, local_cache=LocalCache(max_size=4096), breaker=CircuitBreaker(redis))
+
+    page = snapshot.list_page("people", page=1)
+    film = snapshot.detail("films", "1")
+    person = snapshot.detail("people", "1")
+    loop = asyncio.new_event_loop()
+    try:
+        results = {
+            "strip_page people (10 itens)": measure(lambda: service._strip_page(copy.deepcopy(page)), number),
+            "deepcopy da página (referência)": measure(lambda: copy.deepcopy(page), number),
+            "update_nested film (cache local)": measure_async(
+                loop, lambda: service._update_nested_resources(copy.deepcopy(film)), number
+            ),
+            "update_nested person (cache local)": measure_async(
+                loop, lambda: service._update_nested_resources(copy.deepcopy(person)), number
+            ),
+        }
+
+        def from_redis():
+            service.local_cache.clear()
+            return service._update_nested_resources(copy.deepcopy(film))
+        results["update_nested film (MGET no Redis)"] = measure_async(loop, from_redis, number)
+    finally:
+        loop.close()
+    return results
+
+
+def bench_codec(number: int) -> tuple[dict[str, float], dict[str, int]]:
+    snapshot = synthetic_snapshot(settings.SWAPI_BASE)
+    envelope = {"data": snapshot.list_page("films", page=1), "cached_at": time.time()}
+    timings, sizes = {}, {}
+    for serializer in ("legacy", "json", "msgpack"):
+        for compression in (("none",) if serializer == "legacy" else ("none", "zlib", "zstd", "lz4")):
+            codec = CacheCodec(serializer, compression, min_compress_bytes=0)
+            if codec.serializer != serializer or codec.compression != compression:
+                continue # pacote opcional não instalado
+            name = f"{serializer}+{compression}"
+            raw = codec.encode(envelope)
+            sizes[name] = len(raw)
+            timings[f"encode {name}"] = measure(lambda: codec.encode(envelope), number)
+            timings[f"decode {name}"] = measure(lambda: codec.decode(raw), number)
+    return timings, sizes
+
+
+def bench_validation(number: int) -> dict[str, float]:
+    snapshot = synthetic_snapshot(settings.SWAPI_BASE)
+    service = StarWarsService(None, MemoryRedis(), breaker=CircuitBreaker(None))
+    # Detalhes com os aninhados já trocados por nomes, como saem do service
+    names = {item["url"]: snapshot.display_name(item) for items in snapshot.resources.values() for item in items}
+    vehicle = snapshot.detail("vehicles", "1")
+    for key, urls in service._nested_urls(vehicle).items():
+        vehicle[key] = [names[url] for url in urls] if isinstance(vehicle[key], list) else names[urls[0]]
+
+    union = TypeAdapter(SWAnyDetailsRead)
+    model = DETAILS_MODELS[SWResource.vehicles]
+    return {
+        "SWAnyDetailsRead (união) vehicles": measure(lambda: union.validate_python(vehicle), number),
+        "modelo concreto vehicles": measure(lambda: model.model_validate(vehicle), number),
+    }
+
+
+def main(args):
+    results = {}
+    results.update(bench_service(args.number))
+    codec_timings, sizes = bench_codec(args.number)
+    results.update(codec_timings)
+    results.update(bench_validation(args.number))
+
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}}  µs/chamada")
+    print("-" * (width + 12))
+    for name, value in results.items():
+        print(f"{name:<{width}}  {value:>10.2f}")
+    print()
+    print("Tamanho do envelope (página de filmes) por formato:")
+    for name, size in sizes.items():
+        print(f"  {name:<16} {size:>8} bytes")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"number": args.number, "timings_us": results, "sizes_bytes": sizes}, f, indent=2)
+        print(f"Resultados salvos em {args.json}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks do StarWarsService")
+    parser.add_argument("--number", type=int, default=500, help="Chamadas por rodada (a melhor de 5 rodadas vale)")
+    parser.add_argument("--json", help="Arquivo para salvar os resultados (para comparar execuções)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -15,7 +15,7 @@ async def test_authenticate_user_success():
     })
 
     mock_auth = MagicMock()
-    mock_auth.verificar_senha = MagicMock(return_value=True)
+    mock_auth.verificar_senha_async = AsyncMock(return_value=True)
     mock_jwt = MagicMock()
     mock_validated = MagicMock()
 
@@ -28,7 +28,7 @@ async def test_authenticate_user_success():
 
     assert user["id"] == "user_1_abc"
     mock_repository.find_one_by_field.assert_called_once_with("users", "email", "testuser@example.com")
-    mock_auth.verificar_senha.assert_called_once_with("correct_password", "hashed_password")
+    mock_auth.verificar_senha_async.assert_awaited_once_with("correct_password", "hashed_password")
 
 
 @pytest.mark.asyncio
@@ -40,7 +40,7 @@ async def test_authenticate_user_invalid_credentials_raises_401():
         "email": "testuser@example.com"
     })
     mock_auth = MagicMock()
-    mock_auth.verificar_senha = MagicMock(return_value=False)
+    mock_auth.verificar_senha_async = AsyncMock(return_value=False)
     mock_jwt = MagicMock()
     mock_validated = MagicMock()
 
@@ -136,7 +136,7 @@ async def test_register_user_success():
     })
 
     mock_auth = MagicMock()
-    mock_auth.hash_senha = MagicMock(return_value="hashed_password")
+    mock_auth.hash_senha_async = AsyncMock(return_value="hashed_password")
     mock_jwt = MagicMock()
     mock_validated = MagicMock()
     mock_validated.password = MagicMock(return_value=True)
@@ -0,0 +1,58 @@
+import json
+import pytest
+from datetime import datetime
+from app.utils.cache_codec import CacheCodec, MAGIC
+
+
+PAGE = {"count": 82, "results": [{"name": f"Personagem {i}", "height": "172", "films": ["A New Hope"]} for i in range(50)]}
+
+
+def test_roundtrip_with_header_and_compression():
+    codec = CacheCodec("json", "zlib", min_compress_bytes=1024)
+
+    encoded = codec.encode(PAGE)
+
+    assert encoded[0] == MAGIC
+    assert encoded[3] == 1 # zlib
+    assert len(encoded) < len(json.dumps(PAGE))
+    assert codec.decode(encoded) == PAGE
+
+
+def test_small_values_are_not_compressed():
+    codec = CacheCodec("json", "zlib", min_compress_bytes=1024)
+
+    encoded = codec.encode({"name": "Luke"})
+
+    assert encoded[3] == 0
+    assert codec.decode(encoded) == {"name": "Luke"}
+
+
+def test_reads_legacy_json_text():
+    codec = CacheCodec("json", "zlib")
+
+    assert codec.decode(json.dumps(PAGE)) == PAGE
+    assert codec.decode(json.dumps(PAGE).encode("utf-8")) == PAGE
+
+
+def test_legacy_mode_writes_plain_json():
+    codec = CacheCodec("legacy")
+
+    assert json.loads(codec.encode(PAGE)) == PAGE
+
+
+def test_default_hook_serializes_datetimes():
+    codec = CacheCodec("json", "none")
+    moment = datetime(2024, 1, 1, 12, 0, 0)
+
+    decoded = codec.decode(codec.encode({"created_at": moment}, default=lambda value: value.isoformat()))
+
+    assert decoded["created_at"].startswith("2024-01-01T12:00:00")
+
+
+def test_unknown_format_is_rejected():
+    codec = CacheCodec()
+
+    with pytest.raises(ValueError):
+        codec.decode(bytes((MAGIC, 99, 1, 0)) + b"{}")
+    with pytest.raises(ValueError):
+        codec.decode(bytes((MAGIC, 1, 1, 1)) + b"nao e zlib")
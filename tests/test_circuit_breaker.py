@@ -0,0 +1,73 @@
+import pytest
+import time
+from unittest.mock import AsyncMock
+from app.utils.circuit_breaker import CircuitBreaker, Permit, CLOSED, OPEN, HALF_OPEN
+
+
+@pytest.mark.asyncio
+async def test_closed_state_is_cached_locally():
+    mock_redis = AsyncMock()
+    mock_redis.eval.return_value = ["closed", 1, 0, "0"]
+    breaker = CircuitBreaker(mock_redis)
+
+    first = await breaker.acquire()
+    second = await breaker.acquire()
+
+    assert first is not None and second is not None
+    assert breaker.state == CLOSED
+    mock_redis.eval.assert_awaited_once() # a segunda chamada usa o estado local
+
+
+@pytest.mark.asyncio
+async def test_open_state_rejects_without_redis():
+    mock_redis = AsyncMock()
+    mock_redis.eval.return_value = [b"open", 0, 0, str(time.time()).encode()]
+    breaker = CircuitBreaker(mock_redis)
+
+    assert await breaker.acquire() is None
+    assert await breaker.acquire() is None
+    assert breaker.state == OPEN
+    mock_redis.eval.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_half_open_admits_probe_and_records_it():
+    mock_redis = AsyncMock()
+    mock_redis.eval.side_effect = [["half_open", 1, 1, "10"], ["closed", "20"]]
+    breaker = CircuitBreaker(mock_redis)
+
+    permit = await breaker.acquire()
+    assert permit.probe is True
+    assert breaker.state == HALF_OPEN
+
+    await breaker.record(permit, True, 0.1)
+
+    args = mock_redis.eval.await_args.args
+    assert args[2] == breaker.state_key
+    assert args[4:7] == (1, 0, 1) # sucesso, não lenta, sonda
+    assert breaker.state == CLOSED
+    assert permit.probe is False
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_flagged():
+    mock_redis = AsyncMock()
+    mock_redis.eval.return_value = ["closed", "0"]
+    breaker = CircuitBreaker(mock_redis)
+
+    await breaker.record(Permit(), True, breaker.slow_call_seconds + 1)
+
+    assert mock_redis.eval.await_args.args[5] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_lets_calls_through_unless_open():
+    mock_redis = AsyncMock()
+    mock_redis.eval.side_effect = ConnectionError("redis down")
+    breaker = CircuitBreaker(mock_redis)
+
+    assert await breaker.acquire() is not None
+
+    breaker.state = OPEN
+    breaker._checked_at = None
+    assert await breaker.acquire() is None
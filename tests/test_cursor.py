@@ -0,0 +1,26 @@
+from app.core.config import settings
+from app.utils.cursor import Cursor
+
+
+def test_cursor_roundtrip_and_scope():
+    cursor = Cursor()
+    token = cursor.encode({"__name__": "fav_1"}, scope="user_1")
+
+    assert cursor.decode(token, scope="user_1") == {"__name__": "fav_1"}
+    assert cursor.decode(token, scope="user_2") is None
+
+
+def test_cursor_key_is_not_the_jwt_key(monkeypatch):
+    monkeypatch.setattr("app.utils.cursor.settings.CURSOR_SECRET_KEY", None)
+    token = Cursor().encode({"__name__": "fav_1"})
+
+    # A assinatura não sai da chave dos JWTs: um cursor feito com ela é recusado
+    assert Cursor(secret=settings.JWT_SECRET_KEY).decode(token) is None
+    assert Cursor(secret=settings.JWT_SECRET_KEY).encode({"__name__": "fav_1"}) != token
+
+
+def test_cursor_secret_setting_takes_precedence(monkeypatch):
+    monkeypatch.setattr("app.utils.cursor.settings.CURSOR_SECRET_KEY", "cursor-secret")
+    token = Cursor().encode({"__name__": "fav_1"})
+
+    assert Cursor(secret="cursor-secret").decode(token) == {"__name__": "fav_1"}
@@ -0,0 +1,80 @@
+import pytest
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from app.middleware.etag import ETagMiddleware, etag_matches
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware, prefixes=("/sw",))
+
+    @app.get("/sw/people")
+    async def people():
+        return {"results": [{"name": "Luke"}]}
+
+    @app.get("/sw/stream")
+    async def stream():
+        async def lines():
+            yield b"a\n"
+            yield b"b\n"
+        return StreamingResponse(lines())
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_etag_and_conditional_304():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client:
+        first = await client.get("/sw/people")
+        etag = first.headers["etag"]
+
+        second = await client.get("/sw/people", headers={"If-None-Match": etag})
+        changed = await client.get("/sw/people", headers={"If-None-Match": '"outro"'})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert changed.status_code == 200
+    assert changed.json() == {"results": [{"name": "Luke"}]}
+
+
+@pytest.mark.asyncio
+async def test_other_paths_and_streams_pass_through():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client:
+        health = await client.get("/health")
+        stream = await client.get("/sw/stream")
+
+    assert "etag" not in health.headers
+    assert "etag" not in stream.headers
+    assert stream.text == "a\nb\n"
+
+
+def test_weak_comparison():
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+
+
+@pytest.mark.asyncio
+async def test_route_etag_is_honored_without_hashing():
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware, prefixes=("/sw",))
+
+    @app.get("/sw/cached")
+    async def cached():
+        return Response(content=b'{"name":"Luke"}', media_type="application/json", headers={"ETag": '"pronto"'})
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        fresh = await client.get("/sw/cached")
+        revalidated = await client.get("/sw/cached", headers={"If-None-Match": '"pronto"'})
+
+    assert fresh.headers["etag"] == '"pronto"'
+    assert fresh.json() == {"name": "Luke"}
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
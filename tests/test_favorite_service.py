@@ -190,7 +190,7 @@ async def test_get_favorite_id_success_with_details_error():
 @pytest.mark.asyncio
 async def test_list_favorites_no_filters():
     mock_repository = MagicMock()
-    mock_repository.list_with_filters = AsyncMock(return_value=[
+    mock_repository.list_page = AsyncMock(return_value=([
         {
             "id": "fav_1",
             "user_id": "user_1_abc",
@@ -207,23 +207,25 @@ async def test_list_favorites_no_filters():
             "url": "https://swapi.dev/api/people/2/",
             "name": "C-3PO"
         }
-    ])
+    ], {"__name__": "fav_2"}, False))
 
     service = FavoriteService(repository=mock_repository, sw_service=None)
 
     result = await service.list_favorites(user_id="user_1_abc")
-    assert len(result) == 2
-    mock_repository.list_with_filters.assert_called_once_with(
+    assert len(result["items"]) == 2
+    assert result["has_more"] is False
+    assert result["next_cursor"] is None
+    mock_repository.list_page.assert_called_once_with(
         "favorites",
         filters=[("user_id", "==", "user_1_abc")],
         limit=10,
-        last_doc_id=None
+        start_after=None
     )
 
 @pytest.mark.asyncio
 async def test_list_favorites_with_filters():
     mock_repository = MagicMock()
-    mock_repository.list_with_filters = AsyncMock(return_value=[
+    mock_repository.list_page = AsyncMock(return_value=([
         {
             "id": "fav_2",
             "user_id": "user_1_abc",
@@ -232,18 +234,139 @@ async def test_list_favorites_with_filters():
             "url": "https://swapi.dev/api/people/2/",
             "name": "C-3PO"
         }
-    ])
+    ], {"__name__": "fav_2"}, False))
 
     service = FavoriteService(repository=mock_repository, sw_service=None)
 
     filters = [("resource", "==", "people")]
     result = await service.list_favorites(user_id="user_1_abc", filters=filters, limit=5, last_id="fav_1")
-    assert len(result) == 1
-    mock_repository.list_with_filters.assert_called_once_with(
+    assert len(result["items"]) == 1
+    mock_repository.list_page.assert_called_once_with(
         "favorites",
         filters=[("resource", "==", "people"), ("user_id", "==", "user_1_abc")],
         limit=5,
-        last_doc_id="fav_1"
+        start_after={"__name__": "fav_1"}
     )
 
 
+
+
+@pytest.mark.asyncio
+async def test_list_favorites_expand_details_uses_one_batch():
+    mock_repository = MagicMock()
+    mock_repository.list_page = AsyncMock(return_value=([
+        {"id": "fav_1", "user_id": "user_1_abc", "sw_id": "1", "resource": "people", "url": "https://swapi.dev/api/people/1/", "name": "Luke Skywalker"},
+        {"id": "fav_2", "user_id": "user_1_abc", "sw_id": "1", "resource": "people", "url": "https://swapi.dev/api/people/1/", "name": "Luke Skywalker"},
+        {"id": "fav_3", "user_id": "user_1_abc", "sw_id": "99", "resource": "films", "url": "https://swapi.dev/api/films/99/", "name": "?"},
+    ], {"__name__": "fav_3"}, False))
+
+    mock_sw_service = MagicMock()
+    mock_sw_service.get_details_many = AsyncMock(return_value={
+        ("people", "1"): {"name": "Luke Skywalker"},
+        ("films", "99"): HTTPException(status_code=404, detail="Recurso não encontrado"),
+    })
+
+    service = FavoriteService(repository=mock_repository, sw_service=mock_sw_service)
+    result = (await service.list_favorites(user_id="user_1_abc", expand_details=True))["items"]
+
+    assert result[0]["details"]["name"] == "Luke Skywalker"
+    assert result[1]["details"]["name"] == "Luke Skywalker"
+    assert "error" in result[2]["details"]
+    mock_sw_service.get_details_many.assert_awaited_once_with([("people", "1"), ("people", "1"), ("films", "99")])
+
+
+@pytest.mark.asyncio
+async def test_list_favorites_cursor_round_trip():
+    mock_repository = MagicMock()
+    mock_repository.list_page = AsyncMock(return_value=([
+        {"id": "fav_1", "user_id": "user_1_abc", "sw_id": "1", "resource": "people", "url": "https://swapi.dev/api/people/1/", "name": "Luke Skywalker"},
+    ], {"__name__": "fav_1"}, True))
+
+    service = FavoriteService(repository=mock_repository, sw_service=None)
+    first = await service.list_favorites(user_id="user_1_abc", limit=1)
+    assert first["has_more"] is True
+
+    await service.list_favorites(user_id="user_1_abc", limit=1, cursor=first["next_cursor"])
+    assert mock_repository.list_page.call_args.kwargs["start_after"] == {"__name__": "fav_1"}
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.list_favorites(user_id="user_2_abc", limit=1, cursor=first["next_cursor"])
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_favorites_streams_in_chunks():
+    favorites = [{"id": f"fav_{i}", "user_id": "user_1_abc", "sw_id": str(i)} for i in range(5)]
+    consumed = []
+
+    async def stream_with_filters(collection, filters=None):
+        for favorite in favorites:
+            consumed.append(favorite["id"])
+            yield favorite
+
+    mock_repository = MagicMock()
+    mock_repository.stream_with_filters = MagicMock(side_effect=stream_with_filters)
+    service = FavoriteService(repository=mock_repository, sw_service=None)
+
+    chunks = service.export_favorites("user_1_abc", filters=[("resource", "==", "people")], chunk_size=2)
+    first = await chunks.__anext__()
+
+    assert [favorite["id"] for favorite in first] == ["fav_0", "fav_1"]
+    assert consumed == ["fav_0", "fav_1"] # o resto do stream só é lido quando o consumidor pede
+    rest = [chunk async for chunk in chunks]
+    assert [len(chunk) for chunk in rest] == [2, 1]
+    mock_repository.stream_with_filters.assert_called_once_with(
+        "favorites", filters=[("resource", "==", "people"), ("user_id", "==", "user_1_abc")]
+    )
+
+
+@pytest.mark.asyncio
+async def test_repository_stream_with_filters_uses_firestore_stream():
+    from app.repository.firestore_repository import FirestoreRepository
+
+    async def stream():
+        for i in range(3):
+            doc = MagicMock(id=f"fav_{i}")
+            doc.to_dict.return_value = {"user_id": "user_1_abc"}
+            yield doc
+
+    query = MagicMock()
+    query.where.return_value = query
+    query.order_by.return_value = query
+    query.stream = stream
+    db = MagicMock()
+    db.collection.return_value = query
+
+    repository = FirestoreRepository(db)
+    items = [item async for item in repository.stream_with_filters("favorites", [("user_id", "==", "user_1_abc")])]
+
+    assert items == [{"user_id": "user_1_abc", "id": f"fav_{i}"} for i in range(3)]
+    query.where.assert_called_once_with("user_id", "==", "user_1_abc")
+    query.order_by.assert_called_once_with("__name__")
+    query.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_repository_list_with_filters_delegates_to_list_page():
+    from app.repository.firestore_repository import FirestoreRepository
+
+    docs = []
+    for i in range(3):
+        doc = MagicMock(id=f"fav_{i}")
+        doc.to_dict.return_value = {"user_id": "user_1_abc"}
+        docs.append(doc)
+    query = MagicMock()
+    query.where.return_value = query
+    query.order_by.return_value = query
+    query.start_after.return_value = query
+    query.limit.return_value = query
+    query.get = AsyncMock(return_value=docs)
+    db = MagicMock()
+    db.collection.return_value = query
+
+    repository = FirestoreRepository(db)
+    items = await repository.list_with_filters("favorites", [("user_id", "==", "user_1_abc")], limit=2, last_doc_id="fav_x")
+
+    assert [item["id"] for item in items] == ["fav_0", "fav_1"]
+    query.start_after.assert_called_once_with({"__name__": "fav_x"})
+    query.limit.assert_called_once_with(3)
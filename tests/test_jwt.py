@@ -0,0 +1,64 @@
+import pytest
+import jwt as pyjwt
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from fastapi import HTTPException
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from app.utils.jwt import Jwt, TokenVerifier
+from app.middleware.authorization import Authorization
+
+
+def test_token_verifier_caches_valid_tokens(monkeypatch):
+    token = Jwt().create_access_token({"sub": "user_1", "nivel": "common"})
+    decode = MagicMock(wraps=pyjwt.decode)
+    monkeypatch.setattr("app.utils.jwt.jwt.decode", decode)
+    verifier = TokenVerifier(max_size=10)
+
+    assert verifier.verify(token)["sub"] == "user_1"
+    assert verifier.verify(token)["sub"] == "user_1"
+    assert decode.call_count == 1
+
+
+def test_token_verifier_rejects_cached_token_after_exp(monkeypatch):
+    token = Jwt().create_access_token({"sub": "user_1"}, expires_delta=timedelta(seconds=30))
+    verifier = TokenVerifier(max_size=10)
+    payload = verifier.verify(token)
+
+    monkeypatch.setattr("app.utils.jwt.time.time", lambda: payload["exp"] + 1)
+    with pytest.raises(pyjwt.ExpiredSignatureError):
+        verifier.verify(token)
+    assert len(verifier) == 0
+
+
+def test_asymmetric_keys_sign_and_verify(monkeypatch):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    monkeypatch.setattr("app.utils.jwt.settings.ALGORITHM", "RS256")
+    monkeypatch.setattr("app.utils.jwt.settings.JWT_PRIVATE_KEY", private_pem)
+    monkeypatch.setattr("app.utils.jwt.settings.JWT_PUBLIC_KEY", public_pem)
+
+    token = Jwt().create_access_token({"sub": "user_1"})
+
+    assert pyjwt.get_unverified_header(token)["alg"] == "RS256"
+    assert TokenVerifier().verify(token)["sub"] == "user_1"
+
+
+def test_authorization_decodes_once_per_request(monkeypatch):
+    token = Jwt().create_access_token({"sub": "user_1", "nivel": "common"})
+    verify = MagicMock(return_value={"sub": "user_1", "nivel": "common"})
+    monkeypatch.setattr("app.middleware.authorization.token_verifier.verify", verify)
+    request = SimpleNamespace(state=SimpleNamespace())
+    credentials = SimpleNamespace(credentials=token)
+
+    assert Authorization(["common"])(request, credentials)["sub"] == "user_1"
+    with pytest.raises(HTTPException) as exc_info:
+        Authorization(["admin"])(request, credentials)
+    assert exc_info.value.status_code == 403
+    verify.assert_called_once_with(token)
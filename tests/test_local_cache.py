@@ -0,0 +1,40 @@
+from app.utils.local_cache import LocalCache
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1 # "a" passa a ser o mais recente
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_local_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.utils.local_cache.time.monotonic", lambda: now[0])
+    cache = LocalCache(max_size=10, ttl=30)
+    cache.set("a", 1, ttl=3600) # limitado ao TTL do L1
+
+    now[0] += 29
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_local_cache_ignores_own_invalidation_messages():
+    cache = LocalCache()
+    other = LocalCache()
+    cache.set("detail:films:1", {"title": "A New Hope"})
+
+    cache.handle_invalidation(cache.invalidation_message("detail:films:1"))
+    assert cache.get("detail:films:1") is not None
+
+    cache.handle_invalidation(other.invalidation_message("detail:films:1"))
+    assert cache.get("detail:films:1") is None
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+import httpx
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI
+from app.middleware.server_timing import ServerTimingMiddleware, server_timing
+from app.utils import metrics
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+
+
+def test_disabled_metrics_are_noop():
+    registry = metrics.Registry()
+    counter = registry.counter("hits_total", "hits")
+    histogram = registry.histogram("latency_seconds", "latency")
+
+    counter.inc()
+    histogram.observe(0.2)
+    timings = metrics.start_request()
+    with metrics.span("redis"):
+        pass
+
+    assert counter.values == {}
+    assert histogram.series == {}
+    assert timings == {}
+
+
+def test_prometheus_text_format(enabled):
+    registry = metrics.Registry()
+    counter = registry.counter("cache_total", "Leituras", ("result",))
+    histogram = registry.histogram("latency_seconds", "Latência", ("route",), buckets=(0.1, 1.0))
+
+    counter.inc(result="hit")
+    counter.inc(2, result="hit")
+    histogram.observe(0.05, route='/sw/"x"')
+    histogram.observe(0.5, route='/sw/"x"')
+    histogram.observe(3, route='/sw/"x"')
+
+    text = registry.render()
+    assert "# TYPE cache_total counter" in text
+    assert 'cache_total{result="hit"} 3' in text
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/sw/\\"x\\"",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/sw/\\"x\\"",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/sw/\\"x\\"",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/sw/\\"x\\""} 3' in text
+    assert 'latency_seconds_sum{route="/sw/\\"x\\""} 3.55' in text
+
+    with pytest.raises(ValueError):
+        registry.counter("cache_total", "duplicada")
+
+
+@pytest.mark.asyncio
+async def test_spans_accumulate_per_request(enabled):
+    @metrics.timed("swapi")
+    async def call():
+        await asyncio.sleep(0)
+
+    timings = metrics.start_request()
+    await asyncio.gather(call(), call())
+    with metrics.span("serialize"):
+        pass
+
+    assert timings["swapi"][1] == 2
+    assert timings["serialize"][1] == 1
+    assert "swapi" in server_timing(timings, 0.01)
+    assert server_timing({"redis": [0.0012, 3]}, 0.005) == 'redis;dur=1.2;desc="3x", total;dur=5.0'
+
+
+@pytest.mark.asyncio
+async def test_instrument_redis_times_commands_and_pipelines(enabled):
+    redis = MagicMock()
+    redis.execute_command = AsyncMock(return_value=b"1")
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[True])
+    redis.pipeline = MagicMock(return_value=pipe)
+    metrics.instrument_redis(redis)
+
+    timings = metrics.start_request()
+    assert await redis.execute_command("GET", "k") == b"1"
+    assert await redis.pipeline(transaction=False).execute() == [True]
+
+    assert timings["redis"][1] == 2
+
+
+@pytest.mark.asyncio
+async def test_server_timing_middleware(enabled):
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+
+    @app.get("/sw/details/{resource}/{id}")
+    async def details(resource: str, id: str):
+        with metrics.span("redis"):
+            pass
+        return {"resource": resource, "id": id}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/sw/details/films/1")
+
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("redis;dur=")
+    assert "total;dur=" in response.headers["server-timing"]
+    # Série pela rota, não pelo caminho
+    assert ("GET", "/sw/details/{resource}/{id}", "200") in metrics.HTTP_REQUEST_SECONDS.series
+
+
+@pytest.mark.asyncio
+async def test_server_timing_middleware_disabled():
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/health")
+
+    assert "server-timing" not in response.headers
@@ -0,0 +1,47 @@
+import json
+import pytest
+from fastapi import HTTPException
+from app.schemas.favorites.sw_favorites import SWFavorite
+from app.utils.ndjson import ndjson_stream, STREAM_ERROR_DETAIL
+
+
+def _favorite(sw_id: str) -> dict:
+    return {"id": f"fav_{sw_id}", "user_id": "user_1", "sw_id": sw_id, "resource": "people",
+            "url": f"https://swapi.dev/api/people/{sw_id}/", "name": f"Person {sw_id}"}
+
+
+async def _collect(stream) -> list[dict]:
+    return [json.loads(line) async for chunk in stream for line in chunk.splitlines()]
+
+
+async def _chunks(*chunks, error: Exception = None):
+    for chunk in chunks:
+        yield chunk
+    if error is not None:
+        raise error
+
+
+@pytest.mark.asyncio
+async def test_ndjson_stream_writes_one_line_per_item():
+    lines = await _collect(ndjson_stream(_chunks([_favorite("1"), _favorite("2")], [_favorite("3")]), SWFavorite))
+
+    assert [line["sw_id"] for line in lines] == ["1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_stream_http_error_becomes_last_line():
+    stream = ndjson_stream(_chunks([_favorite("1")], error=HTTPException(503, "Circuito aberto")), SWFavorite)
+
+    lines = await _collect(stream)
+
+    assert lines[0]["sw_id"] == "1"
+    assert lines[-1] == {"error": "Circuito aberto", "status_code": 503}
+
+
+@pytest.mark.asyncio
+async def test_ndjson_stream_unexpected_error_hides_details():
+    stream = ndjson_stream(_chunks([_favorite("1")], error=RuntimeError("deadline exceeded no Firestore")), SWFavorite)
+
+    lines = await _collect(stream)
+
+    assert lines[-1] == {"error": STREAM_ERROR_DETAIL, "status_code": 500}
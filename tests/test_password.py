@@ -1,5 +1,10 @@
 import pytest
+import asyncio
+import threading
+from fastapi import HTTPException
 from app.utils.validated import Validadores
+from app.utils.auth import Auth, PasswordPool, build_password_pool
+from app.utils import metrics
 
 @pytest.mark.parametrize("password, expected", [
     ("Password123!", True),
@@ -10,4 +15,66 @@ from app.utils.validated import Validadores
 ])
 def test_validated_password(password, expected):
     validador = Validadores()
-    assert validador.password(password) == expected
\ No newline at end of file
+    assert validador.password(password) == expected
+
+@pytest.mark.asyncio
+async def test_password_hash_runs_in_pool():
+    pool = PasswordPool(workers=1, queue_limit=1)
+    auth = Auth(pool=pool)
+
+    hashed = await auth.hash_senha_async("Password123!")
+
+    assert await auth.verificar_senha_async("Password123!", hashed) is True
+    assert await auth.verificar_senha_async("wrong", hashed) is False
+    assert pool.stats()["completed"] == 3
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_pool_rejects_when_queue_is_full():
+    pool = PasswordPool(workers=1, queue_limit=0)
+    release = threading.Event()
+    running = asyncio.create_task(pool.run(release.wait))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(lambda: None)
+    assert exc_info.value.status_code == 503
+
+    release.set()
+    await running
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_pool_records_queue_wait_histogram(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+    monkeypatch.setattr(metrics.PASSWORD_QUEUE_WAIT_SECONDS, "series", {})
+    pool = PasswordPool(workers=1, queue_limit=2)
+
+    await asyncio.gather(pool.run(lambda: None), pool.run(lambda: None))
+
+    [(counts, total, observations)] = metrics.PASSWORD_QUEUE_WAIT_SECONDS.series.values()
+    assert observations == 2
+    assert sum(counts) == 2
+    pool.shutdown()
+
+
+def test_password_pool_is_rebuilt_per_event_loop():
+    # Cada lifespan (e cada event loop) cria e encerra o próprio pool
+    async def lifespan_cycle():
+        pool = build_password_pool()
+        auth = Auth(pool=pool)
+        hashed = await auth.hash_senha_async("Password123!")
+        pool.shutdown()
+        return hashed
+
+    assert asyncio.run(lifespan_cycle()) != asyncio.run(lifespan_cycle())
+
+
+@pytest.mark.asyncio
+async def test_auth_without_pool_hashes_off_the_loop():
+    auth = Auth()
+    hashed = await auth.hash_senha_async("Password123!")
+    assert await auth.verificar_senha_async("Password123!", hashed) is True
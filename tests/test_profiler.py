@@ -0,0 +1,148 @@
+import asyncio
+import time
+import pytest
+import httpx
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI
+from app.api.v1.endpoints.admin_routes import router as admin_router
+from app.core.deps import get_swapi_service
+from app.services.starwars_service import StarWarsService
+from app.utils.local_cache import LocalCache
+from app.middleware.slow_requests import SlowRequestMiddleware
+from app.utils.jwt import Jwt
+from app.utils.profiler import SamplingProfiler, LoopMonitor
+
+
+def _busy(seconds: float):
+    ends = time.monotonic() + seconds
+    while time.monotonic() < ends:
+        pass
+
+
+def test_sampling_profiler_collects_collapsed_stacks():
+    profiler = SamplingProfiler(max_seconds=5)
+    profiler.start(2, interval=0.005)
+    with pytest.raises(RuntimeError):
+        profiler.start(1)
+    _busy(0.2)
+    profiler.stop()
+
+    output = profiler.collapsed()
+    assert profiler.samples > 0
+    assert "_busy (test_profiler.py:" in output
+    stack, count = output.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+    assert profiler.status()["running"] is False
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_captures_stall():
+    monitor = LoopMonitor(stall_threshold=0.05, slow_request_threshold=0, interval=0.01)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.03)
+        _busy(0.3) # bloqueia o loop, como um bcrypt síncrono
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    [stall] = monitor.report("stalls")
+    assert stall["duration_ms"] >= 150
+    assert stall["samples"] > 0
+    assert "_busy" in monitor.collapsed("stalls")
+    assert monitor.collapsed("stalls").startswith("loop-stall;")
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_samples_slow_request_await_chain():
+    monitor = LoopMonitor(stall_threshold=0, slow_request_threshold=0.05, interval=0.01)
+
+    async def slow_upstream():
+        await asyncio.sleep(0.2)
+
+    async def handler():
+        key = monitor.request_started("GET", "/sw/details/films/1")
+        await slow_upstream()
+        monitor.request_finished(key, 200, "/sw/details/{resource}/{id}")
+
+    async def fast_handler():
+        key = monitor.request_started("GET", "/health")
+        monitor.request_finished(key, 200)
+
+    monitor.start()
+    try:
+        await asyncio.gather(asyncio.create_task(handler()), asyncio.create_task(fast_handler()))
+    finally:
+        await monitor.stop()
+
+    [slow] = monitor.report("slow_requests")
+    assert slow["route"] == "/sw/details/{resource}/{id}"
+    assert slow["duration_ms"] >= 200
+    assert "handler" in slow["top_stacks"][0]["stack"]
+    assert "slow_upstream" in slow["top_stacks"][0]["stack"]
+    assert monitor.collapsed("slow_requests").startswith("GET /sw/details/{resource}/{id};")
+    assert monitor.inflight == {}
+
+
+def _app(monitor: LoopMonitor) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(SlowRequestMiddleware)
+    app.include_router(admin_router)
+    app.state.profiler = SamplingProfiler()
+    app.state.loop_monitor = monitor
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.1)
+        return {"ok": True}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_admin_diagnostics_require_admin_and_list_slow_requests():
+    monitor = LoopMonitor(stall_threshold=0, slow_request_threshold=0.05, interval=0.01)
+    admin = {"Authorization": f"Bearer {Jwt().create_access_token({'sub': 'admin_1', 'nivel': 'admin'})}"}
+    common = {"Authorization": f"Bearer {Jwt().create_access_token({'sub': 'user_1', 'nivel': 'common'})}"}
+
+    monitor.start()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app(monitor)), base_url="http://test") as client:
+            await client.get("/slow")
+            forbidden = await client.get("/admin/diagnostics/slow-requests", headers=common)
+            report = await client.get("/admin/diagnostics/slow-requests", headers=admin)
+            folded = await client.get("/admin/diagnostics/slow-requests", params={"format": "collapsed"}, headers=admin)
+            started = await client.post("/admin/profiler/start", params={"seconds": 1}, headers=admin)
+            conflict = await client.post("/admin/profiler/start", headers=admin)
+            stopped = await client.post("/admin/profiler/stop", headers=admin)
+    finally:
+        await monitor.stop()
+
+    assert forbidden.status_code == 403
+    assert report.status_code == 200
+    assert [(item["route"], item["status"]) for item in report.json()] == [("/slow", 200)]
+    assert folded.text.startswith("GET /slow;")
+    assert started.json()["running"] is True
+    assert conflict.status_code == 409
+    assert stopped.json()["running"] is False
+
+
+@pytest.mark.asyncio
+async def test_admin_invalidates_cached_details_in_every_worker():
+    redis = AsyncMock()
+    local_cache = LocalCache()
+    local_cache.set("detail:people:1", {"name": "Luke"}, ttl=60)
+    service = StarWarsService(swapi_client=MagicMock(), redis=redis, local_cache=local_cache)
+    app = _app(LoopMonitor(stall_threshold=0, slow_request_threshold=0))
+    app.dependency_overrides[get_swapi_service] = lambda: service
+    admin = {"Authorization": f"Bearer {Jwt().create_access_token({'sub': 'admin_1', 'nivel': 'admin'})}"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.delete("/admin/cache/details/people/1", headers=admin)
+        invalid = await client.delete("/admin/cache/details/droids/1", headers=admin)
+
+    assert response.status_code == 204
+    assert invalid.status_code == 422
+    assert local_cache.get("detail:people:1") is None
+    redis.delete.assert_awaited_once_with("detail:people:1", "response:detail:people:1")
+    assert redis.publish.await_count == 2
@@ -0,0 +1,32 @@
+import pytest
+from pydantic import ValidationError
+from app.schemas.sw.sw import SWAnyDetailsRead, DETAILS_MODELS
+from app.schemas.sw.sw_films import SWFilmsDetails
+from app.schemas.sw.sw_resouce import SWResource
+
+
+FILM = {
+    "title": "A New Hope", "episode_id": 4, "opening_crawl": "...", "director": "George Lucas",
+    "producer": "Gary Kurtz", "release_date": "1977-05-25", "created": "2014-12-10T14:23:31.880000Z",
+    "edited": "2014-12-20T19:49:45.256000Z", "url": "https://swapi.dev/api/films/1/",
+    "characters": ["Luke Skywalker"], "planets": ["Tatooine"], "starships": [], "vehicles": [], "species": [],
+}
+
+
+def test_details_union_is_resolved_by_url():
+    details = SWAnyDetailsRead.model_validate(FILM)
+
+    assert isinstance(details.root, SWFilmsDetails)
+
+
+def test_details_union_reports_only_the_tagged_variant():
+    with pytest.raises(ValidationError) as exc:
+        SWAnyDetailsRead.model_validate({**FILM, "url": "https://swapi.dev/api/people/1/"})
+
+    # só o modelo de people é tentado, não as seis variantes
+    assert all(error["loc"][0] == "people" for error in exc.value.errors())
+
+
+def test_every_resource_has_a_details_model():
+    assert set(DETAILS_MODELS) == set(SWResource)
+    assert DETAILS_MODELS[SWResource.films].model_validate(FILM).title == "A New Hope"
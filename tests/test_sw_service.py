@@ -1,9 +1,23 @@
 import pytest
 import json
+import asyncio
+import time
 import httpx
 from unittest.mock import AsyncMock, MagicMock
 from fastapi import HTTPException
 from app.services.starwars_service import StarWarsService
+from app.integration.SwapiClient import NotModified
+from app.schemas.sw.sw import SWPeopleRead, SWAnyDetailsRead
+from app.utils.single_flight import SingleFlight
+from app.utils.local_cache import LocalCache
+from app.utils.circuit_breaker import Permit
+
+
+def _breaker(open_circuit=False):
+    breaker = MagicMock()
+    breaker.acquire = AsyncMock(return_value=None if open_circuit else Permit())
+    breaker.record = AsyncMock()
+    return breaker
 
 @pytest.mark.asyncio
 async def test_get_resources_uses_cache():
@@ -11,52 +25,77 @@ async def test_get_resources_uses_cache():
     mock_swapi = MagicMock()
 
     cached_payload = json.dumps({"results": [{"name": "Luke"}]})
-    mock_redis.get.side_effect = [None, cached_payload] # status=None, cache=data
+    mock_redis.get.side_effect = [cached_payload]
+    breaker = _breaker()
 
-    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis)
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=breaker)
     result = await service.get_resources("people")
 
     assert result["results"][0]["name"] == "Luke"
     mock_swapi.people.assert_not_called()
+    breaker.acquire.assert_not_called() # cache hit não consulta o circuito
 
 @pytest.mark.asyncio
 async def test_circuit_breaker_blocks_when_open():
     mock_redis = AsyncMock()
     mock_swapi = MagicMock()
-    mock_redis.get.return_value = "open"
+    mock_redis.get.return_value = None
+    mock_swapi.people = AsyncMock()
 
-    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis)
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker(open_circuit=True))
 
     with pytest.raises(HTTPException) as exc:
         await service.get_resources("people")
     
     assert exc.value.status_code == 503
     assert "Circuito aberto" in exc.value.detail
+    mock_swapi.people.assert_not_called()
 
 @pytest.mark.asyncio
-async def test_circuit_breaker_opens_on_failures():
+async def test_circuit_breaker_records_upstream_failures():
     mock_redis = AsyncMock()
     mock_swapi = MagicMock()
     
-    mock_redis.get.return_value = None # Circuito fechado e sem cache
-    mock_redis.incr.return_value = 3 
-    
+    mock_redis.get.return_value = None # sem cache
     mock_swapi.people = AsyncMock(side_effect=httpx.RequestError("Timeout"))
+    breaker = _breaker()
 
-    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis)
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=breaker)
 
     with pytest.raises(HTTPException) as exc:
         await service.get_resources("people")
 
     assert exc.value.status_code == 504
-    mock_redis.set.assert_any_call(service.status_key, "open", ex=service.recovery_time)
+    breaker.record.assert_awaited_once()
+    assert breaker.record.await_args.args[1] is False
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_counts_not_found_as_success():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    mock_redis.get.return_value = None
+    not_found = httpx.HTTPStatusError("404", request=MagicMock(), response=MagicMock(status_code=404))
+    mock_swapi.get_detail = AsyncMock(side_effect=not_found)
+    breaker = _breaker()
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=breaker)
+
+    with pytest.raises(HTTPException) as exc:
+        await service.get_details("people", 999)
+
+    assert exc.value.status_code == 404
+    assert breaker.record.await_args.args[1] is True
 
 @pytest.mark.asyncio
 async def test_update_nested_resources_resolution():
     mock_redis = AsyncMock()
     mock_swapi = MagicMock()
     
-    mock_redis.get.return_value = None
+    mock_pipe = MagicMock()
+    mock_pipe.execute = AsyncMock()
+    mock_redis.pipeline = MagicMock(return_value=mock_pipe)
+    mock_redis.mget.return_value = [None]
     mock_swapi.get_url = AsyncMock(return_value={"title": "A New Hope"})
 
     service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis)
@@ -65,4 +104,456 @@ async def test_update_nested_resources_resolution():
     result = await service._update_nested_resources(raw_data)
 
     assert result["films"] == ["A New Hope"]
-    mock_redis.set.assert_called()
\ No newline at end of file
+    mock_pipe.set.assert_called()
+    mock_pipe.execute.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_upstream_call():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    mock_redis.get.return_value = None
+
+    async def slow_people(**kwargs):
+        await asyncio.sleep(0.01)
+        return {"results": [{"name": "Luke"}]}
+
+    mock_swapi.people = AsyncMock(side_effect=slow_people)
+
+    single_flight = SingleFlight()
+    services = [StarWarsService(swapi_client=mock_swapi, redis=mock_redis, single_flight=single_flight) for _ in range(5)]
+    results = await asyncio.gather(*[service.get_resources("people") for service in services])
+
+    assert all(result["results"][0]["name"] == "Luke" for result in results)
+    mock_swapi.people.assert_awaited_once()
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_distributed_lock_waits_for_other_worker():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    cached_payload = json.dumps({"results": [{"name": "Leia"}]})
+    mock_redis.get.side_effect = [None, None, cached_payload] # cache, 1ª espera, 2ª espera
+    mock_redis.set.return_value = False # outro worker tem o lock
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis)
+    service.distributed_lock = True
+    service.lock_poll_interval = 0.001
+
+    result = await service.get_resources("people")
+
+    assert result["results"][0]["name"] == "Leia"
+    mock_swapi.people.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_distributed_lock_is_released_only_by_its_owner():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    mock_redis.get.return_value = None
+    mock_redis.set.return_value = True
+    mock_swapi.people = AsyncMock(return_value={"results": [{"name": "Leia"}]})
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker())
+    service.distributed_lock = True
+    await service.get_resources("people")
+
+    lock_set = mock_redis.set.await_args_list[0]
+    assert lock_set.args[0] == "lock:cache:people:"
+    assert lock_set.kwargs["ex"] > service.request_budget
+    script, numkeys, key, token = mock_redis.eval.await_args.args
+    assert "redis.call('GET', KEYS[1]) == ARGV[1]" in script
+    assert (numkeys, key, token) == (1, "lock:cache:people:", lock_set.args[1])
+    assert all(call.args[0] != "lock:cache:people:" for call in mock_redis.delete.await_args_list)
+
+
+@pytest.mark.asyncio
+async def test_local_cache_hit_skips_redis():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    local_cache = LocalCache()
+    local_cache.set("cache:people:", {"results": [{"name": "Han"}]})
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, local_cache=local_cache)
+    result = await service.get_resources("people")
+
+    assert result["results"][0]["name"] == "Han"
+    mock_redis.get.assert_not_called()
+    mock_swapi.people.assert_not_called()
+
+
+def _cache_entry(data, age):
+    return json.dumps({"data": data, "cached_at": time.time() - age})
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_revalidating():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    stale_payload = _cache_entry({"results": [{"name": "Old Luke"}]}, age=3700)
+    mock_redis.get.side_effect = [stale_payload]
+    mock_swapi.people = AsyncMock(return_value={"results": [{"name": "New Luke"}]})
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker())
+    result = await service.get_resources("people")
+    assert result["results"][0]["name"] == "Old Luke"
+
+    await asyncio.sleep(0) # deixa a revalidação em segundo plano rodar
+    await asyncio.sleep(0)
+    mock_swapi.people.assert_awaited_once()
+    mock_redis.set.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_when_circuit_is_open():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    stale_payload = _cache_entry({"results": [{"name": "Luke"}]}, age=7200)
+    mock_redis.get.side_effect = [stale_payload]
+    mock_swapi.people = AsyncMock()
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker(open_circuit=True))
+    result = await service.get_resources("people")
+
+    assert result["results"][0]["name"] == "Luke"
+    mock_swapi.people.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_on_upstream_timeout():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    stale_payload = _cache_entry({"results": [{"name": "Luke"}]}, age=7200)
+    mock_redis.get.side_effect = [stale_payload]
+    mock_swapi.people = AsyncMock(side_effect=httpx.RequestError("Timeout"))
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker())
+    result = await service.get_resources("people")
+
+    assert result["results"][0]["name"] == "Luke"
+    mock_swapi.people.assert_awaited_once()
+
+
+def _status_error(status_code, text=""):
+    request = httpx.Request("GET", "https://swapi.dev/api/people/")
+    response = httpx.Response(status_code, text=text, request=request)
+    return httpx.HTTPStatusError(str(status_code), request=request, response=response)
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_on_non_json_upstream_error():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    stale_payload = _cache_entry({"results": [{"name": "Luke"}]}, age=7200)
+    mock_redis.get.side_effect = [stale_payload]
+    mock_swapi.people = AsyncMock(side_effect=_status_error(502, "<html><body>Bad Gateway</body></html>"))
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker())
+    result = await service.get_resources("people")
+
+    assert result["results"][0]["name"] == "Luke"
+    mock_swapi.people.assert_awaited_once()
+
+
+def test_upstream_error_never_parses_error_bodies():
+    service = StarWarsService(swapi_client=MagicMock(), redis=AsyncMock())
+
+    assert service._upstream_error(_status_error(503)).status_code == 503
+    assert service._upstream_error(_status_error(400, '{"detail": "bad"}')).detail == {"detail": "bad"}
+    assert service._upstream_error(_status_error(429, "Too Many Requests")).detail == "Too Many Requests"
+
+
+@pytest.mark.asyncio
+async def test_update_nested_resources_batches_redis_and_dedupes_urls():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    mock_pipe = MagicMock()
+    mock_pipe.execute = AsyncMock()
+    mock_redis.pipeline = MagicMock(return_value=mock_pipe)
+    mock_redis.mget.return_value = ["Tatooine", None]
+    mock_swapi.get_url = AsyncMock(return_value={"name": "Luke Skywalker"})
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis)
+    raw_data = {
+        "planets": ["https://swapi.dev/api/planets/1/"],
+        "characters": ["https://swapi.dev/api/people/1/"],
+        "pilots": ["https://swapi.dev/api/people/1/"],
+        "homeworld": "https://swapi.dev/api/planets/1/",
+        "url": "https://swapi.dev/api/films/1/",
+    }
+
+    result = await service._update_nested_resources(raw_data)
+
+    assert result["planets"] == ["Tatooine"]
+    assert result["characters"] == ["Luke Skywalker"]
+    assert result["pilots"] == ["Luke Skywalker"]
+    assert result["homeworld"] == "Tatooine"
+    assert result["url"] == "https://swapi.dev/api/films/1/"
+    mock_redis.mget.assert_awaited_once_with([
+        "resource:https://swapi.dev/api/planets/1/",
+        "resource:https://swapi.dev/api/people/1/",
+    ])
+    mock_redis.get.assert_not_called()
+    mock_swapi.get_url.assert_awaited_once_with("https://swapi.dev/api/people/1/")
+    mock_pipe.set.assert_called_once_with("resource:https://swapi.dev/api/people/1/", "Luke Skywalker", ex=service.cache_expiry_resource)
+    mock_pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_details_many_batches_cache_and_nested_lookups():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    mock_pipe = MagicMock()
+    mock_pipe.execute = AsyncMock()
+    mock_redis.pipeline = MagicMock(return_value=mock_pipe)
+    cached_film = _cache_entry({"title": "A New Hope", "characters": ["Luke Skywalker"]}, age=10)
+    mock_redis.mget.side_effect = [
+        [cached_film, None, None],          # detail:films:1, detail:people:1, detail:people:2
+        ["Tatooine"],                       # resource:https://swapi.dev/api/planets/1/
+    ]
+
+    async def get_detail(resource, id):
+        if id == "2":
+            raise httpx.HTTPStatusError("404", request=MagicMock(), response=MagicMock(status_code=404))
+        return {"name": "Luke Skywalker", "homeworld": "https://swapi.dev/api/planets/1/"}
+
+    mock_swapi.get_detail = AsyncMock(side_effect=get_detail)
+
+    breaker = _breaker()
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=breaker)
+    results = await service.get_details_many([("films", "1"), ("people", "1"), ("people", "2"), ("films", 1)])
+
+    assert len(results) == 3
+    assert results[("films", "1")]["title"] == "A New Hope"
+    assert results[("people", "1")]["homeworld"] == "Tatooine"
+    assert results[("people", "2")].status_code == 404
+    assert mock_redis.mget.await_count == 2
+    mock_redis.get.assert_not_called()
+    assert breaker.record.await_count == 2 # só os itens que foram à SWAPI
+    assert [call.args[0] for call in mock_redis.set.await_args_list] == ["detail:people:1"]
+
+
+@pytest.mark.asyncio
+async def test_get_details_many_isolates_non_json_upstream_errors():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    mock_pipe = MagicMock()
+    mock_pipe.execute = AsyncMock()
+    mock_redis.pipeline = MagicMock(return_value=mock_pipe)
+    stale_person = _cache_entry({"name": "Old Leia"}, age=7200)
+    mock_redis.mget.side_effect = [[None, stale_person, None]] # detail:people:1, detail:people:2, detail:people:3
+
+    async def get_detail(resource, id):
+        if id == "1":
+            return {"name": "Luke Skywalker"}
+        raise _status_error(502, "<html><body>Bad Gateway</body></html>")
+
+    mock_swapi.get_detail = AsyncMock(side_effect=get_detail)
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker())
+    results = await service.get_details_many([("people", "1"), ("people", "2"), ("people", "3")])
+
+    assert results[("people", "1")]["name"] == "Luke Skywalker"
+    assert results[("people", "2")] == {"name": "Old Leia"} # stale-if-error por item
+    assert results[("people", "3")].status_code == 502
+    assert [call.args[0] for call in mock_redis.set.await_args_list] == ["detail:people:1"]
+
+
+@pytest.mark.asyncio
+async def test_get_details_many_shares_flight_and_revalidation_with_get_details():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    stale = {"data": {"name": "Luke"}, "cached_at": time.time() - 7200, "etag": '"v1"'}
+    mock_redis.get.return_value = json.dumps(stale)
+    mock_redis.mget.return_value = [json.dumps(stale)]
+    seen_validators = []
+    release = asyncio.Event()
+
+    async def get_detail(resource, id):
+        from app.integration.SwapiClient import _revalidation
+        seen_validators.append(_revalidation.get().previous)
+        await release.wait()
+        raise NotModified("https://swapi.dev/api/people/1/")
+
+    mock_swapi.get_detail = AsyncMock(side_effect=get_detail)
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker())
+
+    batch = asyncio.create_task(service.get_details_many([("people", "1")]))
+    await asyncio.sleep(0.01)
+    single = asyncio.create_task(service.get_details("people", "1"))
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await single == {"name": "Luke"}
+    assert (await batch)[("people", "1")] == {"name": "Luke"}
+    mock_swapi.get_detail.assert_awaited_once() # lote e detalhe avulso coalescem na mesma chave
+    assert seen_validators == [{"etag": '"v1"'}] # o lote revalida com If-None-Match: 304 só renova o TTL
+
+
+@pytest.mark.asyncio
+async def test_not_modified_extends_ttl_without_refetching_nested():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    stale = {"data": {"name": "Luke", "homeworld": "Tatooine"}, "cached_at": time.time() - 7200, "etag": '"v1"'}
+    mock_redis.get.return_value = json.dumps(stale)
+    mock_swapi.get_detail = AsyncMock(side_effect=NotModified("https://swapi.dev/api/people/1"))
+    mock_swapi.get_url = AsyncMock()
+    breaker = _breaker()
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=breaker)
+    result = await service.get_details("people", "1")
+
+    assert result == {"name": "Luke", "homeworld": "Tatooine"}
+    mock_swapi.get_url.assert_not_called()
+    stored = service.codec.decode(mock_redis.set.await_args.args[1])
+    assert stored["etag"] == '"v1"'
+    assert time.time() - stored["cached_at"] < 5
+    mock_redis.publish.assert_not_called()
+    assert breaker.record.await_args.args[1] is True
+
+
+@pytest.mark.asyncio
+async def test_response_cache_builds_validated_bytes_once():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    mock_redis.get.return_value = None
+    page = {"count": 1, "next": None, "previous": None, "results": [{
+        "name": "Luke Skywalker", "height": "172", "mass": "77", "hair_color": "blond", "skin_color": "fair",
+        "eye_color": "blue", "birth_year": "19BBY", "gender": "male", "created": "2014-12-09T13:50:51.644000Z",
+        "edited": "2014-12-20T21:17:56.891000Z", "url": "https://swapi.dev/api/people/1/"
+    }]}
+    mock_swapi.people = AsyncMock(return_value=page)
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker())
+    etag, body = await service.get_resources_response("people", SWPeopleRead)
+    again = await service.get_resources_response("people", SWPeopleRead)
+
+    assert json.loads(body) == SWPeopleRead.model_validate(page).model_dump(mode="json")
+    assert again == (etag, body)
+    assert etag.startswith('"') and len(etag) == 34
+    mock_swapi.people.assert_awaited_once()
+    mock_redis.set.assert_any_await("response:cache:people:", etag.encode() + body, ex=service.response_ttl)
+
+
+def _redis_store(store: dict) -> AsyncMock:
+    mock_redis = AsyncMock()
+    mock_redis.get.side_effect = lambda key: store.get(key)
+    mock_redis.set.side_effect = lambda key, value, **kwargs: store.__setitem__(key, value)
+    mock_redis.delete.side_effect = lambda *keys: [store.pop(key, None) for key in keys]
+    return mock_redis
+
+
+@pytest.mark.asyncio
+async def test_stale_data_is_not_kept_as_ready_response():
+    store = {"cache:people:": _cache_entry({"count": 1, "next": None, "previous": None, "results": []}, age=3700)}
+    mock_redis = _redis_store(store)
+    mock_swapi = MagicMock()
+    fresh = {"count": 0, "next": None, "previous": None, "results": []}
+    mock_swapi.people = AsyncMock(return_value=fresh)
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker())
+    _, stale_body = await service.get_resources_response("people", SWPeopleRead)
+    assert json.loads(stale_body)["count"] == 1
+    assert "response:cache:people:" not in store # servido velho: sem resposta pronta
+
+    await asyncio.sleep(0.01) # revalidação em segundo plano
+    _, body = await service.get_resources_response("people", SWPeopleRead)
+
+    assert json.loads(body)["count"] == 0
+    mock_swapi.people.assert_awaited_once()
+    assert "response:cache:people:" in store
+
+
+@pytest.mark.asyncio
+async def test_response_cache_ttl_follows_data_age():
+    page = {"count": 1, "next": None, "previous": None, "results": []}
+    store = {"cache:people:": _cache_entry(page, age=3550)} # faltam ~50s para a entrada vencer
+    mock_redis = _redis_store(store)
+
+    service = StarWarsService(swapi_client=MagicMock(), redis=mock_redis, breaker=_breaker())
+    await service.get_resources_response("people", SWPeopleRead)
+
+    response_set = [call for call in mock_redis.set.await_args_list if call.args[0] == "response:cache:people:"]
+    assert 0 < response_set[0].kwargs["ex"] <= 50
+
+
+@pytest.mark.asyncio
+async def test_response_cache_hit_in_redis_skips_data_cache():
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+    mock_redis.get.return_value = b'"' + b"0" * 32 + b'"' + b'{"count":0}'
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker())
+    etag, body = await service.get_details_response("people", "1", SWAnyDetailsRead)
+
+    assert etag == '"' + "0" * 32 + '"'
+    assert body == b'{"count":0}'
+    mock_redis.get.assert_awaited_once_with("response:detail:people:1")
+
+
+@pytest.mark.asyncio
+async def test_stream_resources_prefetches_pages_in_order():
+    mock_redis = AsyncMock()
+    mock_redis.get.return_value = None
+    mock_swapi = MagicMock()
+    inflight = {"now": 0, "max": 0}
+
+    async def people(name=None, page=None):
+        inflight["now"] += 1
+        inflight["max"] = max(inflight["max"], inflight["now"])
+        await asyncio.sleep(0.01 * (7 - page)) # páginas seguintes respondem antes das anteriores
+        inflight["now"] -= 1
+        start = (page - 1) * 10
+        return {"count": 55, "next": "..." if page < 6 else None, "results": [{"name": f"P{i}"} for i in range(start, min(start + 10, 55))]}
+
+    mock_swapi.people = people
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker())
+    service.stream_prefetch = 2
+
+    pages = await service.stream_resources("people")
+    names = [item["name"] for items in [page async for page in pages] for item in items]
+
+    assert names == [f"P{i}" for i in range(55)]
+    assert inflight["max"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_resources_fails_before_streaming_and_stops_prefetch_on_disconnect():
+    mock_redis = AsyncMock()
+    mock_redis.get.return_value = None
+    mock_swapi = MagicMock()
+    mock_swapi.people = AsyncMock(side_effect=httpx.RequestError("Timeout"))
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, breaker=_breaker())
+
+    with pytest.raises(HTTPException) as exc:
+        await service.stream_resources("people")
+    assert exc.value.status_code == 504
+
+    # Cliente desconectou no meio: nenhuma página além das já pedidas pelo prefetch é buscada
+    # (as em voo terminam pelo single flight e ficam no cache para a próxima requisição)
+    release = asyncio.Event()
+    requested = []
+
+    async def slow_page(name=None, page=None):
+        requested.append(page)
+        if page == 1:
+            return {"count": 30, "next": "...", "results": [{"name": "Luke"}]}
+        await release.wait()
+        return {"count": 30, "next": "...", "results": [{"name": f"P{page}"}]}
+
+    mock_swapi.people = slow_page
+    service.local_cache.clear()
+    pages = await service.stream_resources("people")
+    assert await pages.__anext__() == [{"name": "Luke"}]
+    consumer = asyncio.create_task(pages.__anext__())
+    while len(requested) < 5:
+        await asyncio.sleep(0)
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+    await pages.aclose()
+
+    release.set()
+    while len(service.single_flight):
+        await asyncio.sleep(0)
+    assert requested == [1, 2, 3, 4, 5]
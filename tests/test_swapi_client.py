@@ -0,0 +1,187 @@
+import pytest
+import asyncio
+import time
+import httpx
+from unittest.mock import AsyncMock
+from app.integration.SwapiClient import SwapiClient, NotModified, Revalidation, revalidating
+from app.utils.deadline import deadline, remaining
+from app.utils import metrics
+
+
+@pytest.mark.asyncio
+async def test_get_api_reuses_shared_http_client():
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request)
+        return httpx.Response(200, json={"count": 1, "results": [{"name": "Luke"}]})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = SwapiClient(http_client)
+
+    await client.people(name="Luke", page=1)
+    await client.people(name="Luke", page=2)
+
+    assert len(calls) == 2
+    assert calls[0].url.params["search"] == "Luke"
+    assert calls[1].url.params["page"] == "2"
+    assert not http_client.is_closed
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_limiter_is_shared_per_host():
+    client = SwapiClient(httpx.AsyncClient())
+
+    first = client._limiter_for("https://swapi.dev/api/people/1/")
+    second = client._limiter_for("https://swapi.dev/api/films/2/")
+    other = client._limiter_for("https://example.com/api/")
+
+    assert first is second
+    assert first is not other
+
+
+@pytest.mark.asyncio
+async def test_upstream_overload_shrinks_host_limit():
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(429)))
+    token_bucket = AsyncMock()
+    client = SwapiClient(http_client, token_bucket=token_bucket)
+    limiter = client._limiter_for("https://swapi.dev/api/people/")
+    before = limiter.limit
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get_url("https://swapi.dev/api/people/")
+
+    assert limiter.limit < before
+    assert limiter.inflight == 0
+    token_bucket.acquire.assert_awaited_once()
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_when_request_budget_runs_out():
+    def handler(request: httpx.Request):
+        raise httpx.ConnectError("conexão recusada", request=request)
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = SwapiClient(http_client)
+
+    started = time.monotonic()
+    with deadline(0.3):
+        with pytest.raises(httpx.RequestError):
+            await client.get_url("https://swapi.dev/api/people/1/")
+
+    assert time.monotonic() - started < 1 # sem as esperas de 2s entre tentativas
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_returns_fastest_attempt():
+    calls = []
+
+    async def handler(request: httpx.Request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(1) # primeira tentativa presa na cauda
+            return httpx.Response(200, json={"name": "slow"})
+        return httpx.Response(200, json={"name": "fast"})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = SwapiClient(http_client)
+    client.hedge = True
+    client._limiter_for("https://swapi.dev/api/people/1/").samples.extend([0.01] * 50)
+
+    result = await client.get_url("https://swapi.dev/api/people/1/")
+
+    assert result == {"name": "fast"}
+    assert len(calls) == 2
+    assert client.hedged_requests == 1
+    await http_client.aclose()
+
+
+def test_deadline_nesting_keeps_shortest_budget():
+    assert remaining() is None
+    with deadline(1):
+        outer = remaining()
+        with deadline(60):
+            assert remaining() <= outer
+        with deadline(0.1):
+            assert remaining() <= 0.1
+    assert remaining() is None
+
+
+@pytest.mark.asyncio
+async def test_revalidation_sends_validators_and_raises_not_modified():
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request)
+        if request.url.path == "/api/people/1/":
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json={"name": "Tatooine"}, headers={"ETag": '"p1"'})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = SwapiClient(http_client)
+    revalidation = Revalidation({"etag": '"v1"', "last_modified": "Sat, 01 Jan 2000 00:00:00 GMT"})
+
+    with revalidating(revalidation):
+        with pytest.raises(NotModified):
+            await client.get_url("https://swapi.dev/api/people/1/")
+        await client.get_url("https://swapi.dev/api/planets/1/") # busca aninhada não é condicional
+
+    assert calls[0].headers["if-none-match"] == '"v1"'
+    assert calls[0].headers["if-modified-since"] == "Sat, 01 Jan 2000 00:00:00 GMT"
+    assert "if-none-match" not in calls[1].headers
+    assert revalidation.validators["etag"] == '"v1"'
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_hedge_does_not_back_off_limiter(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+    monkeypatch.setattr(metrics.UPSTREAM_SECONDS, "series", {})
+    calls = []
+
+    async def handler(request: httpx.Request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(1) # perde para o hedge e é cancelada
+        return httpx.Response(200, json={"name": "Luke"})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = SwapiClient(http_client)
+    client.hedge = True
+    limiter = client._limiter_for("https://swapi.dev/api/people/1/")
+    limiter.samples.extend([0.01] * 50)
+    limiter.baseline = 0.01
+    limiter.tolerance = 1000 # só o 429/5xx/timeout derrubaria o limite
+    before = limiter.limit
+
+    await client.get_url("https://swapi.dev/api/people/1/")
+    await asyncio.sleep(0.01) # deixa o cancelamento da tentativa perdedora terminar
+
+    assert len(calls) == 2
+    assert limiter.inflight == 0
+    assert limiter.limit > before # só o aumento aditivo da tentativa que respondeu
+    assert list(metrics.UPSTREAM_SECONDS.series) == [("200",)]
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_expired_budget_still_counts_as_overload():
+    async def handler(request: httpx.Request):
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = SwapiClient(http_client)
+    limiter = client._limiter_for("https://swapi.dev/api/people/1/")
+    before = limiter.limit
+
+    with deadline(0.05):
+        with pytest.raises(httpx.TimeoutException):
+            await client._attempt("https://swapi.dev/api/people/1/")
+
+    assert limiter.limit < before
+    assert limiter.inflight == 0
+    await http_client.aclose()
@@ -0,0 +1,135 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI, HTTPException
+from app.services.starwars_service import StarWarsService
+from app.core.lifespan import load_snapshot
+from app.services.swapi_snapshot import SwapiSnapshot
+
+BASE = "https://swapi.dev/api"
+
+
+def _snapshot():
+    people = [
+        {"name": f"Person {i}", "url": f"{BASE}/people/{i}/", "homeworld": f"{BASE}/planets/1/", "films": [f"{BASE}/films/1/"]}
+        for i in range(1, 13)
+    ]
+    people[0]["name"] = "Luke Skywalker"
+    people[1]["name"] = "Anakin Skywalker"
+    planets = [{"name": "Tatooine", "url": f"{BASE}/planets/1/", "residents": [], "films": [f"{BASE}/films/1/"]}]
+    films = [{"title": "A New Hope", "url": f"{BASE}/films/1/", "characters": [f"{BASE}/people/1/"]}]
+    return SwapiSnapshot({"people": people, "planets": planets, "films": films}, base_url=BASE)
+
+
+def test_snapshot_list_page_matches_swapi_format():
+    snapshot = _snapshot()
+
+    first = snapshot.list_page("people")
+    assert first["count"] == 12
+    assert len(first["results"]) == 10
+    assert first["next"] == f"{BASE}/people/?page=2"
+    assert first["previous"] is None
+
+    second = snapshot.list_page("people", page=2)
+    assert [item["name"] for item in second["results"]] == ["Person 11", "Person 12"]
+    assert second["next"] is None
+
+    search = snapshot.list_page("people", name="sky")
+    assert [item["name"] for item in search["results"]] == ["Luke Skywalker", "Anakin Skywalker"]
+
+    with pytest.raises(HTTPException) as exc:
+        snapshot.list_page("people", page=3)
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_mirror_mode_answers_without_redis_or_swapi(monkeypatch):
+    monkeypatch.setattr("app.services.starwars_service.settings.SWAPI_MODE", "mirror")
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, snapshot=_snapshot())
+    page = await service.get_resources("people", name="luke", page=None)
+    details = await service.get_details("people", "1")
+
+    assert page["results"] == [{"name": "Luke Skywalker", "url": f"{BASE}/people/1/"}]
+    assert details["homeworld"] == "Tatooine"
+    assert details["films"] == ["A New Hope"]
+    mock_redis.get.assert_not_called()
+    mock_swapi.get_detail.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_writes_all_keys_in_one_pipeline():
+    mock_redis = AsyncMock()
+    mock_pipe = MagicMock()
+    mock_pipe.execute = AsyncMock()
+    mock_redis.pipeline = MagicMock(return_value=mock_pipe)
+
+    service = StarWarsService(swapi_client=MagicMock(), redis=mock_redis)
+    written = await service.warm_cache(_snapshot())
+
+    keys = [call.args[0] for call in mock_pipe.set.call_args_list]
+    assert written == len(keys)
+    assert f"resource:{BASE}/people/1/" in keys
+    assert "detail:films:1" in keys
+    assert "cache:people:name=None:page=None" in keys
+    assert "cache:people:name=None:page=2" in keys
+    mock_pipe.execute.assert_awaited_once()
+    assert service.snapshot is None
+
+
+def test_resource_index_search_uses_model_for_starships():
+    starships = [
+        {"name": "Death Star", "model": "DS-1 Orbital Battle Station", "url": f"{BASE}/starships/9/"},
+        {"name": "Millennium Falcon", "model": "YT-1300 light freighter", "url": f"{BASE}/starships/10/"},
+        {"name": "X-wing", "model": "T-65 X-wing", "url": f"{BASE}/starships/12/"},
+    ]
+    snapshot = SwapiSnapshot({"starships": starships}, base_url=BASE)
+
+    assert [item["name"] for item in snapshot.list_page("starships", name="FREIGHTER")["results"]] == ["Millennium Falcon"]
+    assert [item["name"] for item in snapshot.list_page("starships", name="x-wing")["results"]] == ["X-wing"]
+    assert snapshot.list_page("starships", name="zz")["count"] == 0
+    assert snapshot.list_page("starships", name="tie fighter")["results"] == []
+    assert snapshot.detail("starships", "10")["name"] == "Millennium Falcon"
+
+
+@pytest.mark.asyncio
+async def test_local_store_serves_search_in_live_mode(monkeypatch):
+    monkeypatch.setattr("app.services.starwars_service.settings.SWAPI_LOCAL_STORE", True)
+    mock_redis = AsyncMock()
+    mock_swapi = MagicMock()
+
+    service = StarWarsService(swapi_client=mock_swapi, redis=mock_redis, snapshot=_snapshot())
+    page = await service.get_resources("people", name="sky", page=1)
+
+    assert page["count"] == 2
+    mock_redis.get.assert_not_called()
+    mock_swapi.people.assert_not_called()
+
+
+def test_snapshot_save_is_atomic(tmp_path, monkeypatch):
+    path = tmp_path / "swapi_snapshot.json.gz"
+    _snapshot().save(str(path))
+    assert SwapiSnapshot.load(str(path)).detail("people", "1")["name"] == "Luke Skywalker"
+
+    # Falha no meio da escrita: o arquivo anterior fica intacto e o temporário some
+    broken = _snapshot()
+    monkeypatch.setattr(broken, "to_dict", MagicMock(side_effect=RuntimeError("disco cheio")))
+    with pytest.raises(RuntimeError):
+        broken.save(str(path))
+
+    assert SwapiSnapshot.load(str(path)).detail("people", "1")["name"] == "Luke Skywalker"
+    assert [p.name for p in tmp_path.iterdir()] == ["swapi_snapshot.json.gz"]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_failure_falls_back_to_live_mode(monkeypatch):
+    monkeypatch.setattr("app.core.lifespan.settings.SWAPI_MODE", "mirror")
+    monkeypatch.setattr("app.core.lifespan.settings.SWAPI_SNAPSHOT_PATH", None)
+    monkeypatch.setattr("app.services.swapi_snapshot.crawl", AsyncMock(side_effect=RuntimeError("SWAPI fora")))
+    app = FastAPI()
+    app.state.swapi_client = MagicMock()
+
+    await load_snapshot(app)
+
+    assert app.state.snapshot is None
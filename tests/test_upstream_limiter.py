@@ -0,0 +1,57 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+from app.utils.upstream_limiter import AdaptiveLimiter, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_limiter_blocks_at_current_limit():
+    limiter = AdaptiveLimiter(max_limit=2, min_limit=1)
+    limiter.limit = 1.0
+
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    await limiter.release(0.1)
+    await asyncio.wait_for(waiter, 1)
+    assert limiter.inflight == 1
+
+
+def test_limiter_grows_on_fast_responses_and_backs_off_on_slow_ones():
+    limiter = AdaptiveLimiter(max_limit=20, min_limit=2, tolerance=2.0)
+    start = limiter.limit
+
+    for _ in range(50):
+        limiter._update(0.1, overloaded=False)
+    assert start < limiter.limit <= 20
+
+    grown = limiter.limit
+    limiter._update(0.5, overloaded=False) # 5x a linha de base
+    assert limiter.limit < grown
+
+    for _ in range(100):
+        limiter._update(0.1, overloaded=True)
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_until_granted():
+    mock_redis = AsyncMock()
+    mock_redis.eval.side_effect = ["0.001", b"0"]
+    bucket = TokenBucket(mock_redis, rate=10, burst=5)
+
+    await bucket.acquire()
+
+    assert mock_redis.eval.await_count == 2
+    assert mock_redis.eval.await_args.args[2] == "ratelimit:{swapi}:bucket"
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_fails_open_without_redis():
+    mock_redis = AsyncMock()
+    mock_redis.eval.side_effect = ConnectionError("redis down")
+    bucket = TokenBucket(mock_redis, rate=10, burst=5)
+
+    await bucket.acquire()
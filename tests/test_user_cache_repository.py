@@ -0,0 +1,105 @@
+import json
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.repository.firestore_repository import FirestoreRepository
+from app.repository.user_cache_repository import CachedUserRepository
+from app.utils.cache_codec import cache_codec
+
+
+def _redis():
+    mock_redis = AsyncMock()
+    mock_pipe = MagicMock()
+    mock_pipe.execute = AsyncMock()
+    mock_redis.pipeline = MagicMock(return_value=mock_pipe)
+    return mock_redis, mock_pipe
+
+
+@pytest.mark.asyncio
+async def test_find_by_id_uses_cache_before_firestore():
+    mock_redis, _ = _redis()
+    mock_redis.get.return_value = json.dumps({"id": "user_1", "is_active": True})
+
+    repository = CachedUserRepository(db=MagicMock(), redis=mock_redis)
+    with patch.object(FirestoreRepository, "find_by_id", new=AsyncMock()) as firestore_find:
+        user = await repository.find_by_id("users", "user_1")
+
+    assert user["is_active"] is True
+    firestore_find.assert_not_called()
+    mock_redis.get.assert_awaited_once_with("user:id:user_1")
+
+
+@pytest.mark.asyncio
+async def test_find_by_email_miss_populates_both_indexes():
+    mock_redis, mock_pipe = _redis()
+    mock_redis.get.return_value = None
+    user = {"id": "user_1", "email": "Luke@example.com", "password": "hash"}
+
+    repository = CachedUserRepository(db=MagicMock(), redis=mock_redis)
+    with patch.object(FirestoreRepository, "find_one_by_field", new=AsyncMock(return_value=user)):
+        result = await repository.find_one_by_field("users", "email", "Luke@example.com")
+
+    assert result["password"] == "hash"
+    keys = [call.args[0] for call in mock_pipe.set.call_args_list]
+    assert keys == ["user:id:user_1", "user:email:luke@example.com"]
+    assert cache_codec.decode(mock_pipe.set.call_args_list[0].args[1]) == {"id": "user_1", "email": "Luke@example.com"}
+
+
+@pytest.mark.asyncio
+async def test_save_user_invalidates_cache():
+    mock_redis, _ = _redis()
+    mock_redis.get.return_value = None
+
+    repository = CachedUserRepository(db=MagicMock(), redis=mock_redis)
+    with patch.object(FirestoreRepository, "save", new=AsyncMock(return_value={"id": "user_1", "email": "a@b.com"})):
+        await repository.save("users", {"email": "a@b.com"})
+
+    mock_redis.delete.assert_awaited_once_with("user:id:user_1", "user:email:a@b.com")
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_back_to_firestore():
+    mock_redis, _ = _redis()
+    mock_redis.get.side_effect = ConnectionError("redis down")
+
+    repository = CachedUserRepository(db=MagicMock(), redis=mock_redis)
+    with patch.object(FirestoreRepository, "find_by_id", new=AsyncMock(return_value={"id": "user_1"})) as firestore_find:
+        user = await repository.find_by_id("users", "user_1")
+
+    assert user["id"] == "user_1"
+    firestore_find.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_find_by_email_index_reads_document_by_id():
+    mock_redis, _ = _redis()
+    stored_user = {"id": "user_1", "email": "a@b.com", "password": "hash"}
+    mock_redis.get.return_value = b"user_1"
+
+    repository = CachedUserRepository(db=MagicMock(), redis=mock_redis)
+    with patch.object(FirestoreRepository, "find_one_by_field", new=AsyncMock()) as firestore_query, \
+         patch.object(FirestoreRepository, "find_by_id", new=AsyncMock(return_value=stored_user)) as firestore_get:
+        user = await repository.find_one_by_field("users", "email", "a@b.com")
+
+    assert user["password"] == "hash" # o login precisa do hash, que não fica no Redis
+    firestore_query.assert_not_called()
+    firestore_get.assert_awaited_once_with("users", "user_1")
+    mock_redis.get.assert_awaited_once_with("user:email:a@b.com")
+
+
+@pytest.mark.asyncio
+async def test_cached_profile_restores_created_at():
+    mock_redis, mock_pipe = _redis()
+    created_at = datetime(2024, 5, 4, 12, 0, tzinfo=timezone.utc)
+    user = {"id": "user_1", "email": "a@b.com", "password": "hash", "is_active": True, "created_at": created_at}
+    mock_redis.get.return_value = None
+
+    repository = CachedUserRepository(db=MagicMock(), redis=mock_redis)
+    with patch.object(FirestoreRepository, "find_by_id", new=AsyncMock(return_value=user)):
+        await repository.find_by_id("users", "user_1")
+
+    mock_redis.get.return_value = mock_pipe.set.call_args_list[0].args[1]
+    cached = await repository.find_by_id("users", "user_1")
+
+    assert "password" not in cached
+    assert cached["created_at"] == created_at